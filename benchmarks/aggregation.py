@@ -0,0 +1,95 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import random
+import subprocess
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+import gitinspector.aggregation as aggregation
+
+# Measures the grouped reductions of the aggregation module with the pure Python backend and with NumPy, over synthetic
+# per-commit columns of increasing length, and prints the crossovers that NUMPY_MIN_LENGTH and NUMPY_IMPORT_MIN_LENGTH
+# are set from: the length from which NumPy is faster once imported, and the length from which the time it saves pays
+# for importing it. The history is reduced twice per analysis (by author and by date and author), so the time saved by
+# both reductions is weighed against the import.
+#
+# Usage: python -m benchmarks.aggregation [REPETITIONS]
+
+LENGTHS = [1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000, 1000000]
+REDUCTIONS_PER_ANALYSIS = 2
+
+def __get_import_time__(repetitions):
+	script = "import time; start = time.time(); import numpy; print(time.time() - start)"
+	return min(float(subprocess.check_output([sys.executable, "-c", script])) for i in range(0, repetitions))
+
+def __get_columns__(length):
+	generator = random.Random(length)
+	groups = [generator.randint(0, 499) for i in range(0, length)]
+	periods = [generator.randint(0, 119) for i in range(0, length)]
+	columns = [[generator.randint(0, 200) for i in range(0, length)] for j in range(0, 3)]
+	return (groups, periods, columns)
+
+def __time__(backend, function, repetitions):
+	(numpy, numpy_min_length) = (aggregation.numpy, aggregation.NUMPY_MIN_LENGTH)
+
+	try:
+		(aggregation.numpy, aggregation.NUMPY_MIN_LENGTH) = (backend, 0)
+		return min(timeit.repeat(function, number=1, repeat=repetitions))
+	finally:
+		(aggregation.numpy, aggregation.NUMPY_MIN_LENGTH) = (numpy, numpy_min_length)
+
+def main():
+	repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+	if not aggregation.has_numpy():
+		sys.exit("NumPy is not installed.")
+
+	import_time = __get_import_time__(repetitions)
+	crossovers = {}
+	print("Importing NumPy: {0:.1f} ms".format(import_time * 1000))
+
+	for length in LENGTHS:
+		(groups, periods, columns) = __get_columns__(length)
+		reductions = [("sums_by_group", lambda: aggregation.sums_by_group(groups, columns, 500)),
+		              ("sums_by_cell", lambda: aggregation.sums_by_cell(groups, periods, columns + [[1] * length],
+		                                                                (500, 120)))]
+
+		for (name, function) in reductions:
+			python_time = __time__(None, function, repetitions)
+			numpy_time = __time__(aggregation.numpy, function, repetitions)
+			print("{0:<14} {1:8} values: python {2:9.2f} ms, numpy {3:9.2f} ms ({4:.1f}x)".format(name, length,
+			      python_time * 1000, numpy_time * 1000, python_time / numpy_time))
+
+			if numpy_time < python_time:
+				crossovers.setdefault((name, "imported"), length)
+			if (python_time - numpy_time) * REDUCTIONS_PER_ANALYSIS > import_time:
+				crossovers.setdefault((name, "import"), length)
+
+	for ((name, kind), length) in sorted(crossovers.items()):
+		print("{0} is faster with NumPy from {1} values on ({2}).".format(name, length, "including the import"
+		      if kind == "import" else "once imported"))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,203 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+import datetime
+import getopt
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+import benchmarks.synthetic as synthetic
+import gitinspector.blame as blame
+import gitinspector.cache as cache
+import gitinspector.changes as changes
+import gitinspector.localization as localization
+import gitinspector.metrics as metrics
+import gitinspector.session as session
+
+# Times the full command line interface, as well as each of the engines (changes, blame and metrics) on their own,
+# against synthetic repositories of a few sizes. The repositories are generated on the first run and then reused. The
+# cache of gitinspector is disabled, so that every run does all of the work. Progress is printed on standard error and
+# the results (every timing, the statistics of the fastest run of the command line interface and a description of the
+# environment) are written as JSON.
+#
+# Usage: python -m benchmarks.end_to_end [--presets=small,medium,large] [--repetitions=N] [--output=FILE]
+#                                        [--work-dir=DIR]
+
+PRESETS = {"small": {"commits": 200, "files": 50, "authors": 5, "lines": 50},
+           "medium": {"commits": 2000, "files": 300, "authors": 20, "lines": 100},
+           "large": {"commits": 10000, "files": 1500, "authors": 50, "lines": 150}}
+
+DEFAULT_PRESETS = ["small", "medium"]
+
+CLI_RUNS = [("default", []), ("hard", ["--hard"]),
+            ("full", ["--metrics", "--responsibilities", "--timeline", "--weeks", "--format=json"])]
+
+ENGINES = [("changes", lambda: changes.Changes(False)), ("changes-hard", lambda: changes.Changes(True)),
+           ("blame", lambda: blame.Blame(False)), ("blame-hard", lambda: blame.Blame(True)),
+           ("metrics", lambda: metrics.MetricsLogic())]
+
+GITINSPECTOR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "gitinspector", "gitinspector.py")
+
+def __get_repository__(work_dir, preset):
+	parameters = dict(synthetic.DEFAULT_PARAMETERS, **PRESETS[preset])
+	directory = os.path.join(work_dir, preset)
+	summary_file_name = os.path.join(work_dir, preset + ".json")
+
+	if os.path.exists(summary_file_name):
+		with open(summary_file_name, "r") as summary_file:
+			summary = json.load(summary_file)
+
+		if summary["parameters"] == parameters:
+			return (directory, summary)
+
+		shutil.rmtree(directory, ignore_errors=True)
+
+	print("Generating the {0} repository in {1}.".format(preset, directory), file=sys.stderr)
+	summary = synthetic.generate(directory, **parameters)
+
+	with open(summary_file_name, "w") as summary_file:
+		json.dump(summary, summary_file, sort_keys=True)
+
+	return (directory, summary)
+
+def __median__(values):
+	values = sorted(values)
+	middle = len(values) // 2
+	return values[middle] if len(values) % 2 == 1 else (values[middle - 1] + values[middle]) / 2.0
+
+def __get_result__(preset, summary, benchmark, times):
+	print("  {0:<20} min {1:8.3f} s  median {2:8.3f} s".format(benchmark, min(times), __median__(times)), file=sys.stderr)
+	return {"repository": preset, "parameters": summary["parameters"], "benchmark": benchmark, "times": times,
+	        "min": min(times), "median": __median__(times)}
+
+def __run_cli__(repository, arguments, stats_file_name):
+	environment = dict(os.environ, PYTHONIOENCODING="utf-8")
+
+	with open(os.devnull, "w") as devnull:
+		start = time.time()
+		subprocess.check_call([sys.executable, GITINSPECTOR, "--cache=false", "--stats=" + stats_file_name] + arguments +
+		                      [repository], stdin=devnull, stdout=devnull, env=environment)
+		elapsed = time.time() - start
+
+	with open(stats_file_name, "r") as stats_file:
+		return (elapsed, json.load(stats_file))
+
+def __benchmark_cli__(repository, preset, summary, repetitions):
+	(handle, stats_file_name) = tempfile.mkstemp(suffix=".json")
+	os.close(handle)
+	results = []
+
+	try:
+		for (name, arguments) in CLI_RUNS:
+			runs = [__run_cli__(repository, arguments, stats_file_name) for i in range(repetitions)]
+			result = __get_result__(preset, summary, "cli/" + name, [i[0] for i in runs])
+			result["stats"] = min(runs, key=lambda i: i[0])[1]
+			results.append(result)
+	finally:
+		os.remove(stats_file_name)
+
+	return results
+
+def __run_engine__(repository, engine):
+	with session.AnalysisSession() as analysis:
+		analysis.directory = repository
+		start = time.time()
+		engine()
+		return time.time() - start
+
+def __benchmark_engines__(repository, preset, summary, repetitions):
+	cache.set_enabled(False)
+	return [__get_result__(preset, summary, "engine/" + name, [__run_engine__(repository, engine)
+	                       for i in range(repetitions)]) for (name, engine) in ENGINES]
+
+def __get_environment__():
+	git_version = subprocess.check_output(["git", "--version"]).decode("utf-8", "replace").strip()
+
+	try:
+		with open(os.devnull, "w") as devnull:
+			revision = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=devnull,
+			                                   cwd=os.path.dirname(GITINSPECTOR)).decode("utf-8", "replace").strip()
+	except subprocess.CalledProcessError:
+		revision = None
+
+	return {"date": datetime.datetime.utcnow().isoformat() + "Z", "git": git_version, "platform": platform.platform(),
+	        "processors": multiprocessing.cpu_count(), "python": platform.python_version(), "revision": revision}
+
+def main():
+	try:
+		opts, args = getopt.gnu_getopt(sys.argv[1:], "", ["output=", "presets=", "repetitions=", "work-dir="])
+	except getopt.error as exception:
+		sys.exit(exception.msg)
+
+	output = None
+	presets = DEFAULT_PRESETS
+	repetitions = 3
+	work_dir = os.path.join(tempfile.gettempdir(), "gitinspector-benchmarks")
+
+	for (o, a) in opts:
+		if o == "--output":
+			output = a
+		elif o == "--presets":
+			presets = [i.strip() for i in a.split(",") if i.strip()]
+		elif o == "--repetitions":
+			repetitions = max(1, int(a))
+		elif o == "--work-dir":
+			work_dir = a
+
+	for preset in presets:
+		if not preset in PRESETS:
+			sys.exit("Unknown preset: {0} (available presets are {1}).".format(preset, ", ".join(sorted(PRESETS))))
+
+	if not os.path.isdir(work_dir):
+		os.makedirs(work_dir)
+
+	localization.init()
+	results = []
+
+	for preset in presets:
+		(repository, summary) = __get_repository__(work_dir, preset)
+		print("{0} ({1} commits, {2} files, {3} authors):".format(preset, summary["commits"], summary["files"],
+		      summary["authors"]), file=sys.stderr)
+
+		results += __benchmark_cli__(repository, preset, summary, repetitions)
+		results += __benchmark_engines__(repository, preset, summary, repetitions)
+
+	report = json.dumps({"environment": __get_environment__(), "results": results}, indent=1, separators=(",", ": "),
+	                    sort_keys=True)
+
+	if output:
+		with open(output, "w") as output_file:
+			output_file.write(report + "\n")
+	else:
+		print(report)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,125 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+import gitinspector.comment as comment
+import gitinspector.metrics as metrics
+
+# Runs the fused metrics scanner and the previous two-pass implementation (kept below as a reference) over large C++
+# and Python buffers, checks that both produce the same values and prints the throughput of each.
+#
+# Usage: python -m benchmarks.metrics_scanner [REPETITIONS]
+
+def __legacy_get_cyclomatic_complexity__(file_r, extension):
+	is_inside_comment = False
+	cc_counter = 0
+
+	entry_tokens = None
+	exit_tokens = None
+
+	for i in metrics.__metric_cc_tokens__:
+		if extension in i[0]:
+			entry_tokens = i[1]
+			exit_tokens = i[2]
+
+	if entry_tokens or exit_tokens:
+		for i in file_r:
+			i = i.decode("utf-8", "replace")
+			(_, is_inside_comment) = comment.handle_comment_block(is_inside_comment, extension, i)
+
+			if not is_inside_comment and not comment.is_comment(extension, i):
+				for j in entry_tokens:
+					if re.search(j, i, re.DOTALL):
+						cc_counter += 2
+				for j in exit_tokens:
+					if re.search(j, i, re.DOTALL):
+						cc_counter += 1
+		return cc_counter
+
+	return -1
+
+def __legacy_get_eloc__(file_r, extension):
+	is_inside_comment = False
+	eloc_counter = 0
+
+	for i in file_r:
+		i = i.decode("utf-8", "replace")
+		(_, is_inside_comment) = comment.handle_comment_block(is_inside_comment, extension, i)
+
+		if not is_inside_comment and not comment.is_comment(extension, i):
+			eloc_counter += 1
+
+	return eloc_counter
+
+def __legacy__(file_r, extension):
+	return (__legacy_get_eloc__(file_r, extension), __legacy_get_cyclomatic_complexity__(file_r, extension))
+
+def __fused__(file_r, extension):
+	return metrics.MetricsLogic.get_eloc_and_cyclomatic_complexity(file_r, extension)
+
+def __read_lines__(*names):
+	base = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+	lines = []
+
+	for name in names:
+		with open(os.path.join(base, name), "rb") as file_r:
+			lines.extend(file_r.readlines())
+
+	return lines
+
+def __python_sources__():
+	base = os.path.join("gitinspector")
+	return [os.path.join(base, i) for i in sorted(os.listdir(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+	        "..", base))) if i.endswith(".py")]
+
+def __benchmark__(title, file_r, extension, number):
+	legacy_result = __legacy__(file_r, extension)
+	fused_result = __fused__(file_r, extension)
+
+	if legacy_result != fused_result:
+		sys.exit("{0}: results differ (legacy {1}, fused {2}).".format(title, legacy_result, fused_result))
+
+	size = sum(len(i) for i in file_r) / (1024.0 * 1024.0)
+	legacy_time = min(timeit.repeat(lambda: __legacy__(file_r, extension), number=1, repeat=number))
+	fused_time = min(timeit.repeat(lambda: __fused__(file_r, extension), number=1, repeat=number))
+
+	print("{0}: {1} lines, {2:.2f} MiB, eloc {3}, cyclomatic complexity {4}".format(title, len(file_r), size,
+	      fused_result[0], fused_result[1]))
+	print("  legacy: {0:8.3f} s {1:8.2f} MiB/s".format(legacy_time, size / legacy_time))
+	print("  fused:  {0:8.3f} s {1:8.2f} MiB/s ({2:.1f}x)".format(fused_time, size / fused_time, legacy_time / fused_time))
+
+def main():
+	repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+	cpp_lines = __read_lines__("tests/resources/commented_file.cpp") * 2000
+	python_lines = __read_lines__(*__python_sources__()) * 40
+
+	__benchmark__("cpp", cpp_lines, "cpp", repetitions)
+	__benchmark__("py", python_lines, "py", repetitions)
+
+if __name__ == "__main__":
+	main()
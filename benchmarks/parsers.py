@@ -0,0 +1,197 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+import getopt
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+import benchmarks.synthetic as synthetic
+import gitinspector.blame as blame
+import gitinspector.changes as changes
+import gitinspector.comment as comment
+import gitinspector.gitcommand as gitcommand
+import gitinspector.localization as localization
+import gitinspector.metrics as metrics
+import gitinspector.session as session
+
+# Measures the throughput of the parsers of gitinspector (git log, git blame --line-porcelain, comments and the metrics
+# scanner) without git in the loop, by running them against recorded git output stored as fixtures. The fixtures are
+# recorded from synthetic repositories with the same git arguments that gitinspector uses, and are listed (along with
+# what they contain) in fixtures/index.json. They only need to be recorded again when the output of git, or the
+# arguments given to it, change.
+#
+# Usage: python -m benchmarks.parsers [--repetitions=N] [--output=FILE]
+#        python -m benchmarks.parsers --record
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "fixtures")
+
+# Each fixture is recorded from a synthetic repository (given by its parameters) as one of: the history (log), the blame
+# of its longest file (blame) or the concatenated sources with one of the given extensions (source).
+
+FIXTURES = [("log-small", "log", {"commits": 200, "files": 50, "authors": 5, "lines": 50}, None),
+            ("log-medium", "log", {"commits": 2000, "files": 300, "authors": 20, "lines": 100}, None),
+            ("blame-small", "blame", {"commits": 200, "files": 50, "authors": 5, "lines": 50}, None),
+            ("blame-medium", "blame", {"commits": 50, "files": 1, "authors": 10, "lines": 500}, None),
+            ("blame-large", "blame", {"commits": 200, "files": 1, "authors": 20, "lines": 2000}, None),
+            ("source-c", "source", {"commits": 2000, "files": 300, "authors": 20, "lines": 100}, ["c", "cpp", "h"]),
+            ("source-java", "source", {"commits": 2000, "files": 300, "authors": 20, "lines": 100}, ["java", "js"]),
+            ("source-py", "source", {"commits": 2000, "files": 300, "authors": 20, "lines": 100}, ["py"])]
+
+def __parse_log__(lines, extension):
+	with session.AnalysisSession():
+		changes.parse_log(lines)
+
+def __handle_comment_blocks__(lines, extension):
+	is_inside_comment = False
+
+	for i in lines:
+		(comments, is_inside_comment) = comment.handle_comment_block(is_inside_comment, extension, i)
+
+PARSERS = {"log": [("changes.parse_log", __parse_log__)],
+           "blame": [("blame.parse_blame", blame.parse_blame)],
+           "source": [("comment.handle_comment_block", __handle_comment_blocks__),
+                      ("comment.classify_lines", lambda lines, extension: comment.classify_lines(extension, lines)),
+                      ("metrics.get_eloc_and_cyclomatic_complexity",
+                       metrics.MetricsLogic.get_eloc_and_cyclomatic_complexity)]}
+
+# Every parser is given the lines of a fixture and its extension. The comment parsers work on decoded lines; the others
+# on the lines as read from git.
+
+DECODED_PARSERS = set(["comment.handle_comment_block", "comment.classify_lines"])
+
+def __write_fixture__(name, data):
+	with open(os.path.join(FIXTURES_DIR, name + ".gz"), "wb") as fixture_file:
+		# A zero modification time keeps the recorded fixtures identical from one recording to the next.
+		with gzip.GzipFile(name + ".gz", "wb", 9, fixture_file, 0) as gzip_file:
+			gzip_file.write(data)
+
+def __read_fixture__(name):
+	with gzip.open(os.path.join(FIXTURES_DIR, name + ".gz"), "rb") as gzip_file:
+		return gzip_file.read()
+
+def __get_longest_file__():
+	files = [i.decode("utf-8").strip() for i in gitcommand.read_lines(["ls-files"])]
+	return max(files, key=lambda i: (os.path.getsize(os.path.join(session.get().directory, i)), i))
+
+def __record__(kind, extensions):
+	if kind == "log":
+		return gitcommand.read(changes.get_log_arguments(False, "HEAD"))
+
+	if kind == "blame":
+		filename = __get_longest_file__()
+		return (gitcommand.read(blame.get_blame_arguments(False, filename)), os.path.splitext(filename)[1][1:])
+
+	files = sorted(i.decode("utf-8").strip() for i in gitcommand.read_lines(["ls-files"]))
+	return b"".join(gitcommand.read(["show", "HEAD:" + i]) for i in files if os.path.splitext(i)[1][1:] in extensions)
+
+def record():
+	work_dir = tempfile.mkdtemp(suffix=".gitinspector")
+	repositories = {}
+	index = {}
+
+	if not os.path.isdir(FIXTURES_DIR):
+		os.makedirs(FIXTURES_DIR)
+
+	try:
+		for (name, kind, parameters, extensions) in FIXTURES:
+			key = json.dumps(parameters, sort_keys=True)
+
+			if not key in repositories:
+				repositories[key] = os.path.join(work_dir, str(len(repositories)))
+				synthetic.generate(repositories[key], **parameters)
+
+			with session.AnalysisSession() as analysis:
+				analysis.directory = repositories[key]
+				data = __record__(kind, extensions)
+
+			(data, extension) = data if kind == "blame" else (data, extensions[0] if extensions else None)
+			__write_fixture__(name, data)
+			index[name] = {"kind": kind, "extension": extension, "parameters": dict(synthetic.DEFAULT_PARAMETERS,
+			               **parameters), "bytes": len(data), "lines": data.count(b"\n")}
+			print("Recorded {0} ({1} bytes).".format(name, len(data)), file=sys.stderr)
+	finally:
+		shutil.rmtree(work_dir, ignore_errors=True)
+
+	with open(os.path.join(FIXTURES_DIR, "index.json"), "w") as index_file:
+		index_file.write(json.dumps(index, indent=1, separators=(",", ": "), sort_keys=True) + "\n")
+
+def run(repetitions):
+	with open(os.path.join(FIXTURES_DIR, "index.json"), "r") as index_file:
+		index = json.load(index_file)
+
+	results = []
+
+	for name in sorted(index):
+		fixture = index[name]
+		data = __read_fixture__(name)
+		lines = data.splitlines(True)
+		decoded_lines = [i.decode("utf-8", "replace") for i in lines]
+		megabytes = len(data) / (1024.0 * 1024.0)
+
+		for (parser, function) in PARSERS[fixture["kind"]]:
+			arguments = (decoded_lines if parser in DECODED_PARSERS else lines, fixture["extension"])
+			elapsed = min(timeit.repeat(lambda: function(*arguments), number=1, repeat=repetitions))
+			results.append({"fixture": name, "parser": parser, "bytes": len(data), "lines": len(lines),
+			                "time": elapsed, "megabytes_per_second": megabytes / elapsed,
+			                "lines_per_second": len(lines) / elapsed})
+			print("{0:<13} {1:<44} {2:8.3f} s {3:8.2f} MiB/s {4:11.0f} lines/s".format(name, parser, elapsed,
+			      megabytes / elapsed, len(lines) / elapsed), file=sys.stderr)
+
+	return results
+
+def main():
+	try:
+		opts, args = getopt.gnu_getopt(sys.argv[1:], "", ["output=", "record", "repetitions="])
+	except getopt.error as exception:
+		sys.exit(exception.msg)
+
+	output = None
+	repetitions = 5
+	localization.init()
+
+	for (o, a) in opts:
+		if o == "--output":
+			output = a
+		elif o == "--record":
+			record()
+			return
+		elif o == "--repetitions":
+			repetitions = max(1, int(a))
+
+	report = json.dumps(run(repetitions), indent=1, separators=(",", ": "), sort_keys=True)
+
+	if output:
+		with open(output, "w") as output_file:
+			output_file.write(report + "\n")
+	else:
+		print(report)
+
+if __name__ == "__main__":
+	main()
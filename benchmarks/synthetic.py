@@ -0,0 +1,284 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+import getopt
+import math
+import os
+import random
+import subprocess
+import sys
+
+# Builds synthetic git repositories for benchmarking. The history is written as a single git fast-import stream, which
+# makes even large repositories quick to build, and it is fully determined by the parameters (including the seed of the
+# random generator); the same parameters therefore always give the same repository.
+#
+# Commits are made by authors chosen with a skewed distribution (a few authors make most of the commits), each commit
+# adding, changing or renaming a few source files. Merges are topic branches of a few commits each, merged back with a
+# merge commit of their own.
+#
+# Usage: python -m benchmarks.synthetic [OPTIONS] DIRECTORY
+
+DEFAULT_PARAMETERS = {"commits": 1000, "files": 100, "authors": 10, "lines": 100, "renames": 0.02, "merges": 0.05,
+                      "seed": 0}
+
+AUTHOR_NAMES = ["Alice Andersson", "Bob Berg", "Åsa Öberg", "Carlos Núñez", "Dmitri Petrov", "Emma Ekström",
+                "François Dubois", "Grace Hopper", "Hiroshi Tanaka", "Ingrid Lund", "José García", "Karin Nilsson"]
+
+COMMIT_MESSAGES = ["Fix off-by-one error", "Add missing checks", "Refactor the parser", "Update documentation",
+                   "Improve performance", "Clean up", "Handle empty input", "Rename variables", "Add tests"]
+
+START_DATE = 1262304000 # 2010-01-01
+
+__c_lines__ = ["#include <stdio.h>", "int function_{0}(int value) {{", "\tif (value > {0}) {{", "\t\treturn value * {0};",
+               "\t}}", "\tfor (int i = 0; i < {0}; i++) {{", "\t\tvalue += i;", "\t}} else {{", "\t/* Adjust the value by {0}. */",
+               "\t// Count down from {0}.", "\twhile (value > {0}) {{", "\t\tvalue--;", "\treturn value;", "}}", "",
+               "/*", " * Comment block {0}.", " */"]
+
+__python_lines__ = ["import os", "def function_{0}(value):", "\tif value > {0}:", "\t\treturn value * {0}",
+                    "\tfor i in range({0}):", "\t\tvalue += i", "\t# Adjust the value by {0}.", "\twhile value > {0}:",
+                    "\t\tvalue -= 1", "\telif value < {0}:", "\treturn value", "", "\"\"\"", "Documentation {0}.", "\"\"\""]
+
+__java_lines__ = ["import java.util.List;", "public int method{0}(int value) {{", "\tif (value > {0}) {{",
+                  "\t\treturn value * {0};", "\t}}", "\tfor (int i = 0; i < {0}; i++) {{", "\t\tvalue += i;",
+                  "\t}} else {{", "\t/* Adjust the value by {0}. */", "\t// Count down from {0}.", "\tswitch (value) {{",
+                  "\tcase {0}:", "\tdefault:", "\treturn value;", "}}", ""]
+
+SOURCE_LINES = {"c": __c_lines__, "cpp": __c_lines__, "h": __c_lines__, "java": __java_lines__, "js": __java_lines__,
+                "py": __python_lines__}
+
+EXTENSIONS = ["c", "cpp", "h", "java", "js", "py"]
+
+class Generator(object):
+	def __init__(self, stream, branch, parameters):
+		self.stream = stream
+		self.branch = branch
+		self.parameters = parameters
+		self.random = random.Random(parameters["seed"])
+		self.files = {}
+		self.created_files = 0
+		self.date = START_DATE
+		self.marks = 0
+		self.summary = {"commits": 0, "merge_commits": 0, "renamed_files": 0}
+
+		names = AUTHOR_NAMES + ["Author {0}".format(i) for i in range(len(AUTHOR_NAMES), parameters["authors"])]
+		self.authors = names[0:max(1, parameters["authors"])]
+		self.author_weights = [1.0 / (i + 1) for i in range(len(self.authors))]
+		self.directories = max(1, int(math.sqrt(parameters["files"]) / 2))
+
+	def __write__(self, string):
+		self.stream.write(string.encode("utf-8"))
+
+	def __write_data__(self, string):
+		data = string.encode("utf-8")
+		self.stream.write("data {0}\n".format(len(data)).encode("utf-8") + data + b"\n")
+
+	def __pick_author__(self):
+		value = self.random.uniform(0, sum(self.author_weights))
+
+		for (author, weight) in zip(self.authors, self.author_weights):
+			value -= weight
+
+			if value <= 0:
+				break
+
+		return author
+
+	def __get_line__(self, extension):
+		return self.random.choice(SOURCE_LINES[extension]).format(self.random.randint(0, 1000))
+
+	def __get_average_lines__(self):
+		return max(1, self.parameters["lines"])
+
+	def __add_file__(self):
+		extension = self.random.choice(EXTENSIONS)
+		path = "src/module{0}/file{1}.{2}".format(self.created_files % self.directories, self.created_files, extension)
+		length = self.random.randint(max(1, self.__get_average_lines__() // 2), self.__get_average_lines__() * 3 // 2)
+		self.files[path] = [self.__get_line__(extension) for i in range(length)]
+		self.created_files += 1
+		return [("M", path)]
+
+	def __change_file__(self, path):
+		lines = self.files[path]
+		extension = path.rsplit(".", 1)[1]
+
+		for i in range(self.random.randint(1, max(1, len(lines) // 20))):
+			operation = self.random.random()
+			position = self.random.randint(0, len(lines))
+
+			if operation < 0.4 or not lines:
+				lines.insert(position, self.__get_line__(extension))
+			elif operation < 0.8:
+				lines[min(position, len(lines) - 1)] = self.__get_line__(extension)
+			elif len(lines) > 1:
+				del lines[min(position, len(lines) - 1)]
+
+		return [("M", path)]
+
+	def __rename_file__(self, path):
+		self.created_files += 1
+		new_path = "src/module{0}/renamed{1}.{2}".format(self.random.randint(0, self.directories - 1), self.created_files,
+		                                               path.rsplit(".", 1)[1])
+		self.files[new_path] = self.files.pop(path)
+		self.summary["renamed_files"] += 1
+		return [("R", path, new_path)]
+
+	def __get_changes__(self, remaining_commits):
+		missing_files = self.parameters["files"] - len(self.files)
+		changes = []
+		touched = set()
+
+		for i in range(self.random.randint(1, 3)):
+			if not self.files or self.random.random() < min(1.0, missing_files * 2.0 / max(1, remaining_commits)):
+				changes += self.__add_file__()
+				missing_files -= 1
+				continue
+
+			path = self.random.choice(sorted(self.files))
+
+			if path in touched:
+				continue
+
+			touched.add(path)
+
+			if self.random.random() < self.parameters["renames"]:
+				changes += self.__rename_file__(path)
+			else:
+				changes += self.__change_file__(path)
+
+		return changes
+
+	def __commit__(self, branch, changes, parents=[], message=None):
+		self.marks += 1
+		self.date += self.random.randint(600, 172800)
+		author = self.__pick_author__()
+		email = author.split(" ")[0].lower().encode("ascii", "ignore").decode("ascii") + "@example.com"
+		signature = "{0} <{1}> {2} +0000\n".format(author, email, self.date)
+
+		self.__write__("commit {0}\nmark :{1}\nauthor {2}committer {2}".format(branch, self.marks, signature))
+		self.__write_data__(message if message else self.random.choice(COMMIT_MESSAGES))
+
+		for (i, parent) in enumerate(parents):
+			self.__write__("{0} :{1}\n".format("merge" if i > 0 else "from", parent))
+
+		for change in changes:
+			if change[0] == "M" and change[1] in self.files:
+				self.__write__("M 100644 inline {0}\n".format(change[1]))
+				self.__write_data__("\n".join(self.files[change[1]]) + "\n")
+			elif change[0] == "R":
+				self.__write__("R {0} {1}\n".format(change[1], change[2]))
+			else:
+				self.__write__("D {0}\n".format(change[1]))
+
+		self.__write__("\n")
+		self.summary["commits"] += 1
+		return self.marks
+
+	# A topic branch is forked from the tip of the main branch and merged back with a merge commit (as with git merge
+	# --no-ff), which brings in the files that were changed on the topic branch.
+
+	def __topic__(self, head, length, remaining_commits):
+		touched = set()
+		tip = head
+
+		for i in range(length):
+			changes = self.__get_changes__(remaining_commits - i)
+			touched.update(j for change in changes for j in change[1:])
+			tip = self.__commit__("refs/heads/topic", changes, [tip])
+
+		changes = [("M", i) if i in self.files else ("D", i) for i in sorted(touched)]
+		self.summary["merge_commits"] += 1
+		return self.__commit__(self.branch, changes, [head, tip], "Merge branch 'topic'")
+
+	def generate(self):
+		head = None
+		remaining_commits = self.parameters["commits"]
+
+		while remaining_commits > 0:
+			if head and remaining_commits >= 3 and self.random.random() < self.parameters["merges"]:
+				length = self.random.randint(1, min(4, remaining_commits - 1))
+				head = self.__topic__(head, length, remaining_commits)
+				remaining_commits -= length + 1
+			else:
+				head = self.__commit__(self.branch, self.__get_changes__(remaining_commits), [head] if head else [])
+				remaining_commits -= 1
+
+		self.summary["files"] = len(self.files)
+		self.summary["authors"] = len(self.authors)
+		return self.summary
+
+def __git__(args, directory):
+	subprocess.check_call(["git"] + args, cwd=directory)
+
+# Builds a repository with the given parameters (see DEFAULT_PARAMETERS) in directory, which must not exist or be empty.
+# Returns a summary of what was generated, along with the parameters used.
+
+def generate(directory, **parameters):
+	unknown_parameters = set(parameters).difference(DEFAULT_PARAMETERS)
+
+	if unknown_parameters:
+		raise TypeError("unknown parameters: " + ", ".join(sorted(unknown_parameters)))
+
+	parameters = dict(DEFAULT_PARAMETERS, **parameters)
+
+	if not os.path.isdir(directory):
+		os.makedirs(directory)
+
+	__git__(["init", "-q"], directory)
+	branch = subprocess.check_output(["git", "symbolic-ref", "HEAD"], cwd=directory).decode("utf-8").strip()
+	fast_import = subprocess.Popen(["git", "fast-import", "--quiet"], stdin=subprocess.PIPE, cwd=directory)
+	generator = Generator(fast_import.stdin, branch, parameters)
+
+	try:
+		summary = generator.generate()
+	finally:
+		fast_import.stdin.close()
+
+	if fast_import.wait() != 0:
+		raise RuntimeError("git fast-import failed in " + directory)
+
+	if summary["merge_commits"] > 0:
+		__git__(["branch", "-q", "-D", "topic"], directory)
+
+	__git__(["reset", "-q", "--hard"], directory)
+	summary["parameters"] = parameters
+	return summary
+
+def main():
+	try:
+		opts, args = getopt.gnu_getopt(sys.argv[1:], "", [i + "=" for i in sorted(DEFAULT_PARAMETERS)])
+	except getopt.error as exception:
+		sys.exit(exception.msg)
+
+	if len(args) != 1:
+		sys.exit("Usage: python -m benchmarks.synthetic [--{0}=VALUE]... DIRECTORY".format("=VALUE] [--".join(
+		         sorted(DEFAULT_PARAMETERS))))
+
+	parameters = {}
+
+	for (o, a) in opts:
+		parameters[o[2:]] = type(DEFAULT_PARAMETERS[o[2:]])(a)
+
+	summary = generate(args[0], **parameters)
+	print(", ".join("{0}: {1}".format(i, summary[i]) for i in sorted(summary) if i != "parameters"))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,142 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+
+NUMPY_MIN_LENGTH = 10000
+NUMPY_IMPORT_MIN_LENGTH = 100000
+
+numpy = None
+__numpy_imported__ = False
+
+# Grouped reductions used when aggregating the history of a repository. NumPy is used when it is available and the input
+# is large, in which case the values are kept in arrays and reduced with bincount(); otherwise the same figures are
+# computed in pure Python. Several columns of values can be reduced by the same groups (or cells), which only converts
+# the groups to an array once. All functions return plain lists of integers, whichever backend that was used.
+#
+# The thresholds are the crossovers measured by benchmarks/aggregation.py: once NumPy is imported, it is faster from
+# NUMPY_MIN_LENGTH values on; importing it only pays off from NUMPY_IMPORT_MIN_LENGTH values on. Indexing the keys stays
+# in pure Python, since numpy.unique() is slower than a dictionary for the (string) keys of the history.
+
+def __import_numpy__():
+	global numpy
+	global __numpy_imported__
+
+	if not __numpy_imported__:
+		__numpy_imported__ = True
+
+		try:
+			import numpy
+		except ImportError:
+			numpy = None
+
+def __get_numpy__(length):
+	if length < NUMPY_MIN_LENGTH or (length < NUMPY_IMPORT_MIN_LENGTH and not __numpy_imported__):
+		return None
+
+	__import_numpy__()
+	return numpy
+
+def has_numpy():
+	__import_numpy__()
+	return numpy != None
+
+def index(keys):
+	indices = {}
+	groups = []
+
+	for key in keys:
+		group = indices.get(key, None)
+
+		if group == None:
+			group = len(indices)
+			indices[key] = group
+
+		groups.append(group)
+
+	return (sorted(indices, key=indices.get), groups)
+
+def sums_by_group(groups, columns, length):
+	numpy = __get_numpy__(len(groups))
+
+	if numpy != None:
+		groups = numpy.asarray(groups, dtype=numpy.intp)
+		return [numpy.bincount(groups, weights=numpy.asarray(values, dtype=numpy.float64),
+		                       minlength=length).astype(numpy.int64).tolist() for values in columns]
+
+	result = []
+
+	for values in columns:
+		sums = [0] * length
+
+		for group, value in zip(groups, values):
+			sums[group] += value
+
+		result.append(sums)
+
+	return result
+
+def sum_by_group(groups, values, length):
+	return sums_by_group(groups, [values], length)[0]
+
+# The cells of a matrix are reduced as the groups of its flattened form.
+
+def sums_by_cell(rows, columns, value_columns, shape):
+	numpy = __get_numpy__(len(rows))
+
+	if numpy != None:
+		cells = numpy.asarray(rows, dtype=numpy.intp) * shape[1] + numpy.asarray(columns, dtype=numpy.intp)
+		return [numpy.bincount(cells, weights=numpy.asarray(values, dtype=numpy.float64),
+		                       minlength=shape[0] * shape[1]).astype(numpy.int64).reshape(shape).tolist()
+		        for values in value_columns]
+
+	result = []
+
+	for values in value_columns:
+		matrix = [[0] * shape[1] for _unused in range(0, shape[0])]
+
+		for row, column, value in zip(rows, columns, values):
+			matrix[row][column] += value
+
+		result.append(matrix)
+
+	return result
+
+def sum_by_cell(rows, columns, values, shape):
+	return sums_by_cell(rows, columns, [values], shape)[0]
+
+def column_sums(matrix, length):
+	numpy = __get_numpy__(len(matrix) * length)
+
+	if numpy != None:
+		return numpy.asarray(matrix, dtype=numpy.int64).reshape(-1, length).sum(axis=0).tolist()
+
+	return [sum(column) for column in zip(*matrix)] if matrix else [0] * length
+
+def column_maxima(matrix, length):
+	numpy = __get_numpy__(len(matrix) * length)
+
+	if numpy != None:
+		if len(matrix) == 0:
+			return [0] * length
+
+		return numpy.asarray(matrix, dtype=numpy.int64).reshape(-1, length).max(axis=0).tolist()
+
+	return [max(column) for column in zip(*matrix)] if matrix else [0] * length
@@ -17,8 +17,8 @@
 # You should have received a copy of the GNU General Public License
 # along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
 
+import gitcommand
 import os
-import subprocess
 import sys
 
 def get_basedir():
@@ -27,31 +27,26 @@ def get_basedir():
 	else:
 		return os.path.dirname(os.path.realpath(__file__))
 
-__git_basedir__ = None
+# Gathers what is needed to know about the git repository at (or containing) the given directory, using a single git
+# process: whether it is bare, its absolute path and the commit that HEAD points to (None in an empty repository). A
+# bare repository has no work tree, so git leaves out the (relative) path to the top of the work tree in that case.
 
-def get_basedir_git():
-	global __git_basedir__
+def get_repository_info(path=None):
+	path = path if path else os.getcwd()
+	(returncode, output) = gitcommand.run(["rev-parse", "--is-bare-repository", "--absolute-git-dir", "--show-cdup",
+	                                       "--verify", "-q", "HEAD"], cwd=path, quiet=True)
+	output = output.decode("utf-8", "replace").split("\n")
 
-	if not __git_basedir__:
-		sp = subprocess.Popen(["git", "rev-parse", "--is-bare-repository"], bufsize=1,
-		                          stdout=subprocess.PIPE, stderr=open(os.devnull, "w"))
-		isbare = sp.stdout.readlines()
-		sp.wait()
-		if sp.returncode != 0:
-			sys.exit(_("Error processing git repository at \"%s\"." % os.getcwd()))
-		isbare = (isbare[0].decode("utf-8", "replace").strip() == "true")
-		absolute_path = None
+	if len(output) < 3 or not output[0] in ("true", "false"):
+		sys.exit(_("Error processing git repository at \"%s\"." % os.path.abspath(path)))
 
-		if isbare:
-			absolute_path = subprocess.Popen(["git", "rev-parse", "--git-dir"], bufsize=1, stdout=subprocess.PIPE).stdout
-		else:
-			absolute_path = subprocess.Popen(["git", "rev-parse", "--show-toplevel"], bufsize=1,
-			                                 stdout=subprocess.PIPE).stdout
+	if output[0] == "true":
+		return (True, output[1], output[2] if output[2] else None)
 
-		absolute_path = absolute_path.readlines()
-		if len(absolute_path) == 0:
-			sys.exit(_("Unable to determine absolute path of git repository."))
+	head = output[3] if len(output) > 3 and output[3] else None
+	return (False, os.path.realpath(os.path.join(path, output[2])), head)
 
-		__git_basedir__ = absolute_path[0].decode("utf-8", "replace").strip()
+# Returns the absolute path of the git repository at (or containing) the given directory.
 
-	return __git_basedir__
+def get_basedir_git(path=None):
+	return get_repository_info(path)[1]
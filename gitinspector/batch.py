@@ -0,0 +1,187 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from localization import N_
+import blame
+import cache
+import changes
+import clone
+import codecs
+import format
+import gitcommand
+import io
+import json
+import metrics
+import multiprocessing
+import os
+import stats
+import sys
+import terminal
+import textwrap
+import tracing
+import writer
+
+REPORT_EXTENSIONS = {"html": "html", "htmlembedded": "html", "htmllite": "html", "json": "json", "ndjson": "ndjson",
+                     "text": "txt", "xml": "xml"}
+
+BATCH_INFO_TEXT = N_("The following repositories were analysed; the reports of each repository were written to")
+
+# In batch mode, many repositories are analysed by a single, bounded pool of worker processes (one repository at a time
+# per worker), and each report is written to a file of its own in the output directory. Every repository is analysed by
+# a runner and an analysis session of its own, configured by the repository and then by the command line, so the workers
+# are reused from one repository to the next. The settings that are kept by the worker itself are restored afterwards.
+# The workers compute metrics on their own, and share the available processors out among their history parsing and
+# blame threads, since the pool itself already keeps the processors busy. When statistics are gathered, those of each
+# repository are included in its summary. The trace events recorded by the workers are passed back along with the
+# summaries, and merged into the trace of the batch; so is the number of git commands that were missing from a
+# replayed transcript.
+
+def read_manifest(file_name):
+	manifest_file = io.open(file_name, "r", encoding="utf-8")
+	repositories = [i.strip() for i in manifest_file.readlines()]
+	manifest_file.close()
+
+	return [i for i in repositories if i and not i.startswith("#")]
+
+def __get_report_names__(repositories):
+	report_names = []
+
+	for repository in repositories:
+		name = os.path.basename(repository.rstrip("/\\")) or "repository"
+
+		if name.endswith(".git"):
+			name = name[:-4]
+
+		report_name = name
+		i = 2
+
+		while report_name in report_names:
+			report_name = "{0}-{1}".format(name, i)
+			i += 1
+
+		report_names.append(report_name)
+
+	return report_names
+
+def __init_worker__(num_threads):
+	changes.set_num_threads(num_threads)
+	blame.set_num_threads(num_threads)
+
+def __analyse__(task):
+	(batch_runner, repository, directory, report_name) = task
+	summary = {"repository": repository, "report": report_name}
+	cache_enabled = cache.is_enabled()
+	missing_count = gitcommand.get_missing_count()
+	runner = None
+
+	try:
+		if stats.is_enabled():
+			stats.reset()
+		if tracing.is_enabled():
+			tracing.reset()
+
+		runner = batch_runner.create_runner(repository)
+		metrics.set_num_workers(1)
+
+		with runner.session:
+			targets = runner.outputs if runner.outputs else [(format.get_selected(), None)]
+			runner.outputs = [(i[0], os.path.join(directory, report_name + "." +
+			                                      (i[1] if i[1] else REPORT_EXTENSIONS[i[0]]))) for i in targets]
+			runner.output()
+
+			summary["head"] = runner.session.head
+			authorinfo_list = changes.get(runner.hard).get_authorinfo_list()
+			summary["authors"] = len(authorinfo_list)
+			summary["commits"] = sum(i.commits for i in authorinfo_list.values())
+			summary["insertions"] = sum(i.insertions for i in authorinfo_list.values())
+			summary["deletions"] = sum(i.deletions for i in authorinfo_list.values())
+			summary["rows"] = sum(i.rows for i in blame.get(runner.hard, runner.useweeks, changes.get(runner.hard)).
+			                      get_summed_blames().values()) if summary["commits"] > 0 else 0
+
+		if stats.is_enabled():
+			summary["stats"] = stats.get()
+	except (Exception, SystemExit) as exception:
+		summary["error"] = "{0}".format(exception)
+	finally:
+		if runner != None:
+			with runner.session:
+				clone.delete()
+
+		cache.set_enabled(cache_enabled)
+
+	if tracing.is_enabled():
+		summary["trace"] = tracing.get_events()
+	if gitcommand.get_missing_count() > missing_count:
+		summary["missing_commands"] = gitcommand.get_missing_count() - missing_count
+
+	return summary
+
+def __output_summary_text__(summaries, directory):
+	out = writer.get()
+	out.writeln(textwrap.fill(_(BATCH_INFO_TEXT) + " " + directory + ":", width=terminal.get_size()[0]) + "\n")
+	out.writeln(terminal.bold(terminal.ljust(_("Repository"), 21) + terminal.rjust(_("Authors"), 8) +
+	                          terminal.rjust(_("Commits"), 9) + terminal.rjust(_("Insertions"), 12) +
+	                          terminal.rjust(_("Deletions"), 11) + terminal.rjust(_("Rows"), 10)))
+
+	for i in summaries:
+		out.write(terminal.ljust(i["report"], 20)[0:20 - terminal.get_excess_column_count(i["report"])] + " ")
+
+		if "error" in i:
+			out.writeln(i["error"])
+		else:
+			out.write(str(i["authors"]).rjust(7) + " ")
+			out.write(str(i["commits"]).rjust(8) + " ")
+			out.write(str(i["insertions"]).rjust(11) + " ")
+			out.write(str(i["deletions"]).rjust(10) + " ")
+			out.writeln(str(i["rows"]).rjust(9))
+
+	out.flush()
+
+def run(runner, repositories, directory):
+	directory = os.path.abspath(directory)
+
+	if not os.path.isdir(directory):
+		os.makedirs(directory)
+
+	tasks = [(runner, os.path.abspath(i) if os.path.exists(i) else i, directory, j)
+	         for (i, j) in zip(repositories, __get_report_names__(repositories))]
+	num_workers = max(1, min(metrics.get_num_workers(), len(tasks)))
+	pool = multiprocessing.Pool(num_workers, __init_worker__, (max(1, multiprocessing.cpu_count() // num_workers),))
+
+	try:
+		summaries = pool.map(__analyse__, tasks, 1)
+	finally:
+		pool.close()
+		pool.join()
+
+	for i in summaries:
+		tracing.add_events(i.pop("trace", []))
+		gitcommand.add_missing_count(i.pop("missing_commands", 0))
+
+	summary_file = codecs.open(os.path.join(directory, "summary.json"), "w", "utf-8")
+	summary_file.write(json.dumps(summaries, indent=1, separators=(",", ": "), sort_keys=True, ensure_ascii=False) + "\n")
+	summary_file.close()
+
+	terminal.skip_escapes(not sys.stdout.isatty())
+	__output_summary_text__(summaries, directory)
+
+	return summaries
@@ -26,16 +26,21 @@ import comment
 import datetime
 import filtering
 import format
+import gitcommand
 import gravatar
 import interval
 import json
 import multiprocessing
 import re
-import subprocess
+import records
+import session
+import stats
 import sys
 import terminal
 import textwrap
 import threading
+import tracing
+import writer
 
 NUM_THREADS = multiprocessing.cpu_count()
 
@@ -47,95 +52,96 @@ class BlameEntry:
 __thread_lock__ = threading.BoundedSemaphore(NUM_THREADS)
 __blame_lock__ = threading.Lock()
 
+# The number of threads can only be changed while none are running.
+
+def get_num_threads():
+	return NUM_THREADS
+
+def set_num_threads(num_threads):
+	global NUM_THREADS
+	global __thread_lock__
+	NUM_THREADS = max(1, num_threads)
+	__thread_lock__ = threading.BoundedSemaphore(NUM_THREADS)
+
 AVG_DAYS_PER_MONTH = 30.4167
 
+def get_blame_arguments(hard, filename):
+	return filter(None, ["blame", "--line-porcelain", "-w"] + (["-C", "-C", "-M"] if hard else []) +
+	              [interval.get_since(), interval.get_ref(), "--", filename])
+
+# Parses the output of git blame --line-porcelain (a sequence of lines, as byte strings) into blame chunks; one tuple of
+# the email of the author, the date, the revision, whether the row precedes the interval and the number of comments on
+# it, per row. The comments of the whole file are classified at once, as that is all that is needed of the content of
+# a row when it is attributed to its author.
+
+def parse_blame(rows, extension):
+	blamechunks = []
+	(email, date, revision, is_prior, is_last) = (None, None, None, False, False)
+
+	for row in rows:
+		row = row.decode("utf-8", "replace").strip()
+		keyval = row.split(" ", 2)
+
+		if is_last:
+			blamechunks.append((email, date, revision, is_prior, row))
+			(email, date, revision, is_prior, is_last) = (None, None, None, False, False)
+		elif keyval[0] == "boundary":
+			is_prior = True
+		elif keyval[0] == "author-mail":
+			email = keyval[1].lstrip("<").rstrip(">")
+		elif keyval[0] == "author-time":
+			date = datetime.date.fromtimestamp(int(keyval[1]))
+		elif keyval[0] == "filename":
+			is_last = True
+		elif Blame.is_revision(keyval[0]):
+			revision = keyval[0]
+
+	flags = comment.classify_lines(extension, [i[4] for i in blamechunks])
+	return [i[0:4] + (comment.count_comments(flags[j]),) for j, i in enumerate(blamechunks)]
+
 class BlameThread(threading.Thread):
-	def __init__(self, useweeks, changes, blame_command, extension, blames, filename):
-		__thread_lock__.acquire() # Lock controlling the number of threads running
+	def __init__(self, blame_command, extension, blamechunks, filename):
+		tracing.acquire(__thread_lock__, "wait for thread") # Lock controlling the number of threads running
 		threading.Thread.__init__(self)
 
-		self.useweeks = useweeks
-		self.changes = changes
 		self.blame_command = blame_command
 		self.extension = extension
-		self.blames = blames
+		self.blamechunks = blamechunks
 		self.filename = filename
+		self.session = session.get()
+		self.stage = stats.get_stage()
 
-		self.is_inside_comment = False
-
-	def __clear_blamechunk_info__(self):
-		self.blamechunk_email = None
-		self.blamechunk_is_last = False
-		self.blamechunk_is_prior = False
-		self.blamechunk_revision = None
-		self.blamechunk_time = None
-
-	def __handle_blamechunk_content__(self, content):
-		author = None
-		(comments, self.is_inside_comment) = comment.handle_comment_block(self.is_inside_comment, self.extension, content)
-
-		if self.blamechunk_is_prior and interval.get_since():
-			return
-		try:
-			author = self.changes.get_latest_author_by_email(self.blamechunk_email)
-		except KeyError:
-			return
-
-		if not filtering.set_filtered(author, "author") and not \
-		       filtering.set_filtered(self.blamechunk_email, "email") and not \
-		       filtering.set_filtered(self.blamechunk_revision, "revision"):
-
-			__blame_lock__.acquire() # Global lock used to protect calls from here...
-
-			if self.blames.get((author, self.filename), None) == None:
-				self.blames[(author, self.filename)] = BlameEntry()
-
-			self.blames[(author, self.filename)].comments += comments
-			self.blames[(author, self.filename)].rows += 1
+	def run(self):
+		with self.session:
+			with stats.worker(self.stage, NUM_THREADS):
+				self.__parse__()
 
-			if (self.blamechunk_time - self.changes.first_commit_date).days > 0:
-				self.blames[(author, self.filename)].skew += ((self.changes.last_commit_date - self.blamechunk_time).days /
-				                                             (7.0 if self.useweeks else AVG_DAYS_PER_MONTH))
+	def __parse__(self):
+		rows = gitcommand.read_lines(self.blame_command)
 
-			__blame_lock__.release() # ...to here.
+		with tracing.span("parse blame", "parse", {"file": self.filename, "lines": len(rows)}):
+			blamechunks = parse_blame(rows, self.extension)
 
-	def run(self):
-		git_blame_r = subprocess.Popen(self.blame_command, bufsize=1, stdout=subprocess.PIPE).stdout
-		rows = git_blame_r.readlines()
-		git_blame_r.close()
-
-		self.__clear_blamechunk_info__()
-
-		#pylint: disable=W0201
-		for j in range(0, len(rows)):
-			row = rows[j].decode("utf-8", "replace").strip()
-			keyval = row.split(" ", 2)
-
-			if self.blamechunk_is_last:
-				self.__handle_blamechunk_content__(row)
-				self.__clear_blamechunk_info__()
-			elif keyval[0] == "boundary":
-				self.blamechunk_is_prior = True
-			elif keyval[0] == "author-mail":
-				self.blamechunk_email = keyval[1].lstrip("<").rstrip(">")
-			elif keyval[0] == "author-time":
-				self.blamechunk_time = datetime.date.fromtimestamp(int(keyval[1]))
-			elif keyval[0] == "filename":
-				self.blamechunk_is_last = True
-			elif Blame.is_revision(keyval[0]):
-				self.blamechunk_revision = keyval[0]
+		tracing.acquire(__blame_lock__, "wait for blame lock")
+		self.blamechunks.append((self.filename, blamechunks))
+		__blame_lock__.release()
 
 		__thread_lock__.release() # Lock controlling the number of threads running
 
 PROGRESS_TEXT = N_("Checking how many rows belong to each author (Progress): {0:.0f}%")
 
+# Blaming is done in two steps. The output of git blame is fetched and parsed for all files first, which does not depend
+# on the history of the repository. Each row is then attributed to an author, which requires the (fully parsed) changes;
+# this allows the blame processes to run at the same time as the history is being parsed.
+
 class Blame:
-	def __init__(self, hard, useweeks, changes):
+	# The fetched output of the files in reusable_blamechunks (a dictionary of file names and their blame chunks) is
+	# reused as it is, instead of running git blame on them once again.
+	def __init__(self, hard, reusable_blamechunks={}):
 		self.blames = {}
-		ls_tree_r = subprocess.Popen(["git", "ls-tree", "--name-only", "-r", interval.get_ref()], bufsize=1,
-		                             stdout=subprocess.PIPE).stdout
-		lines = ls_tree_r.readlines()
-		ls_tree_r.close()
+		self.blamechunks = []
+		lines = gitcommand.read_lines(["ls-tree", "--name-only", "-r", interval.get_ref()])
+		threads = []
 
 		for i, row in enumerate(lines):
 			row = row.strip().decode("unicode_escape", "ignore")
@@ -143,19 +149,50 @@ class Blame:
 			row = row.decode("utf-8", "replace").strip("\"").strip("'").strip()
 
 			if FileDiff.is_valid_extension(row) and not filtering.set_filtered(FileDiff.get_filename(row)):
-				blame_command = filter(None, ["git", "blame", "--line-porcelain", "-w"] + \
-						(["-C", "-C", "-M"] if hard else []) +
-				                [interval.get_since(), interval.get_ref(), "--", row])
-				thread = BlameThread(useweeks, changes, blame_command, FileDiff.get_extension(row), self.blames, row.strip())
+				if row.strip() in reusable_blamechunks:
+					self.blamechunks.append((row.strip(), reusable_blamechunks[row.strip()]))
+					continue
+
+				thread = BlameThread(get_blame_arguments(hard, row), FileDiff.get_extension(row), self.blamechunks, row.strip())
 				thread.daemon = True
 				thread.start()
+				threads.append(thread)
 
 				if hard:
 					Blame.output_progress(i, len(lines))
 
-		# Make sure all threads have completed.
-		for i in range(0, NUM_THREADS):
-			__thread_lock__.acquire()
+		for thread in threads:
+			thread.join()
+
+	def __handle_blamechunk__(self, useweeks, changes, filename, blamechunk):
+		(email, time, revision, is_prior, comments) = blamechunk
+		author = None
+
+		if is_prior and interval.get_since():
+			return
+		try:
+			author = changes.get_latest_author_by_email(email)
+		except KeyError:
+			return
+
+		if not filtering.set_filtered(author, "author") and not \
+		       filtering.set_filtered(email, "email") and not \
+		       filtering.set_filtered(revision, "revision"):
+
+			if self.blames.get((author, filename), None) == None:
+				self.blames[(author, filename)] = BlameEntry()
+
+			self.blames[(author, filename)].comments += comments
+			self.blames[(author, filename)].rows += 1
+
+			if (time - changes.first_commit_date).days > 0:
+				self.blames[(author, filename)].skew += ((changes.last_commit_date - time).days /
+				                                        (7.0 if useweeks else AVG_DAYS_PER_MONTH))
+
+	def attribute(self, useweeks, changes):
+		for (filename, blamechunks) in self.blamechunks:
+			for blamechunk in blamechunks:
+				self.__handle_blamechunk__(useweeks, changes, filename, blamechunk)
 
 	@staticmethod
 	def output_progress(pos, length):
@@ -197,37 +234,61 @@ class Blame:
 
 		return summed_blames
 
-__blame__ = None
+def fetch(hard):
+	if session.get().blame == None:
+		session.get().blame = Blame(hard, session.get().reusable_blamechunks)
+
+	return session.get().blame
 
 def get(hard, useweeks, changes):
-	global __blame__
-	if __blame__ == None:
-		__blame__ = Blame(hard, useweeks, changes)
+	fetch(hard)
+
+	if not session.get().attributed:
+		session.get().blame.attribute(useweeks, changes)
+		session.get().attributed = True
 
-	return __blame__
+	return session.get().blame
+
+# Forgets the blame. Unless changed_files is None, the fetched output of all other files is kept and reused by the next
+# fetch; this is only valid if none of the commits made since the last fetch touched those files.
+def reset(changed_files=None):
+	previous_blame = session.get().blame
+	session.get().reusable_blamechunks = {}
+
+	if previous_blame != None and changed_files != None:
+		session.get().reusable_blamechunks = dict(i for i in previous_blame.blamechunks if not i[0] in changed_files)
+
+	session.get().blame = None
+	session.get().attributed = False
 
 BLAME_INFO_TEXT = N_("Below are the number of rows from each author that have survived and are still "
                      "intact in the current revision")
+BLAME_REVISION_INFO_TEXT = N_("Below are the number of rows from each author that have survived and are still "
+                              "intact in revision {0}")
 
-class BlameOutput(Outputable):
-	def __init__(self, changes, hard, useweeks):
-		if format.is_interactive_format():
-			print("")
+# When a revision is given, the output states that the rows are those of that revision rather than of the current one.
 
+class BlameOutput(Outputable):
+	def __init__(self, changes, hard, useweeks, revision=None):
 		self.changes = changes
 		self.hard = hard
 		self.useweeks = useweeks
-		get(self.hard, self.useweeks, self.changes)
+		self.revision = revision
+		self.blame = get(self.hard, self.useweeks, self.changes)
 		Outputable.__init__(self)
 
+	def __get_info_text__(self):
+		return _(BLAME_INFO_TEXT) if self.revision == None else _(BLAME_REVISION_INFO_TEXT).format(self.revision)
+
 	def output_html(self):
-		blame_xml = "<div><div class=\"box\">"
-		blame_xml += "<p>" + _(BLAME_INFO_TEXT) + ".</p><div><table id=\"blame\" class=\"git\">"
-		blame_xml += "<thead><tr> <th>{0}</th> <th>{1}</th> <th>{2}</th> <th>{3}</th> <th>{4}</th> </tr></thead>".format(
-		             _("Author"), _("Rows"), _("Stability"), _("Age"), _("% in comments"))
-		blame_xml += "<tbody>"
-		chart_data = ""
-		blames = sorted(__blame__.get_summed_blames().items())
+		out = writer.get()
+		out.write("<div><div class=\"box\">")
+		out.write("<p>" + self.__get_info_text__() + ".</p><div><table id=\"blame\" class=\"git\">")
+		out.write("<thead><tr> <th>{0}</th> <th>{1}</th> <th>{2}</th> <th>{3}</th> <th>{4}</th> </tr></thead>".format(
+		          _("Author"), _("Rows"), _("Stability"), _("Age"), _("% in comments")))
+		out.write("<tbody>")
+		chart_data = []
+		blames = sorted(self.blame.get_summed_blames().items())
 		total_blames = 0
 
 		for i in blames:
@@ -235,77 +296,90 @@ class BlameOutput(Outputable):
 
 		for i, entry in enumerate(blames):
 			work_percentage = str("{0:.2f}".format(100.0 * entry[1].rows / total_blames))
-			blame_xml += "<tr " + ("class=\"odd\">" if i % 2 == 1 else ">")
+			out.write("<tr " + ("class=\"odd\">" if i % 2 == 1 else ">"))
 
 			if format.get_selected() == "html":
 				author_email = self.changes.get_latest_email_by_author(entry[0])
-				blame_xml += "<td><img src=\"{0}\"/>{1}</td>".format(gravatar.get_url(author_email), entry[0])
+				out.write("<td><img src=\"{0}\"/>{1}</td>".format(gravatar.get_url(author_email), entry[0]))
 			else:
-				blame_xml += "<td>" + entry[0] + "</td>"
-
-			blame_xml += "<td>" + str(entry[1].rows) + "</td>"
-			blame_xml += "<td>" + ("{0:.1f}".format(Blame.get_stability(entry[0], entry[1].rows, self.changes)) + "</td>")
-			blame_xml += "<td>" + "{0:.1f}".format(float(entry[1].skew) / entry[1].rows) + "</td>"
-			blame_xml += "<td>" + "{0:.2f}".format(100.0 * entry[1].comments / entry[1].rows) + "</td>"
-			blame_xml += "<td style=\"display: none\">" + work_percentage + "</td>"
-			blame_xml += "</tr>"
-			chart_data += "{{label: {0}, data: {1}}}".format(json.dumps(entry[0]), work_percentage)
-
-			if blames[-1] != entry:
-				chart_data += ", "
-
-		blame_xml += "<tfoot><tr> <td colspan=\"5\">&nbsp;</td> </tr></tfoot></tbody></table>"
-		blame_xml += "<div class=\"chart\" id=\"blame_chart\"></div></div>"
-		blame_xml += "<script type=\"text/javascript\">"
-		blame_xml += "    blame_plot = $.plot($(\"#blame_chart\"), [{0}], {{".format(chart_data)
-		blame_xml += "        series: {"
-		blame_xml += "            pie: {"
-		blame_xml += "                innerRadius: 0.4,"
-		blame_xml += "                show: true,"
-		blame_xml += "                combine: {"
-		blame_xml += "                    threshold: 0.01,"
-		blame_xml += "                    label: \"" + _("Minor Authors") + "\""
-		blame_xml += "                }"
-		blame_xml += "            }"
-		blame_xml += "        }, grid: {"
-		blame_xml += "            hoverable: true"
-		blame_xml += "        }"
-		blame_xml += "    });"
-		blame_xml += "</script></div></div>"
-
-		print(blame_xml)
+				out.write("<td>" + entry[0] + "</td>")
+
+			out.write("<td>" + str(entry[1].rows) + "</td>")
+			out.write("<td>" + ("{0:.1f}".format(Blame.get_stability(entry[0], entry[1].rows, self.changes)) + "</td>"))
+			out.write("<td>" + "{0:.1f}".format(float(entry[1].skew) / entry[1].rows) + "</td>")
+			out.write("<td>" + "{0:.2f}".format(100.0 * entry[1].comments / entry[1].rows) + "</td>")
+			out.write("<td style=\"display: none\">" + work_percentage + "</td>")
+			out.write("</tr>")
+			chart_data.append("{{label: {0}, data: {1}}}".format(json.dumps(entry[0]), work_percentage))
+
+		out.write("<tfoot><tr> <td colspan=\"5\">&nbsp;</td> </tr></tfoot></tbody></table>")
+		out.write("<div class=\"chart\" id=\"blame_chart\"></div></div>")
+		out.write("<script type=\"text/javascript\">")
+		out.write("    blame_plot = $.plot($(\"#blame_chart\"), [{0}], {{".format(", ".join(chart_data)))
+		out.write("        series: {"
+		          "            pie: {"
+		          "                innerRadius: 0.4,"
+		          "                show: true,"
+		          "                combine: {"
+		          "                    threshold: 0.01,"
+		          "                    label: \"" + _("Minor Authors") + "\""
+		          "                }"
+		          "            }"
+		          "        }, grid: {"
+		          "            hoverable: true"
+		          "        }"
+		          "    });")
+		out.writeln("</script></div></div>")
 
 	def output_text(self):
 		if sys.stdout.isatty() and format.is_interactive_format():
 			terminal.clear_row()
 
-		print(textwrap.fill(_(BLAME_INFO_TEXT) + ":", width=terminal.get_size()[0]) + "\n")
-		terminal.printb(terminal.ljust(_("Author"), 21) + terminal.rjust(_("Rows"), 10) + terminal.rjust(_("Stability"), 15) +
-		                terminal.rjust(_("Age"), 13) + terminal.rjust(_("% in comments"), 20))
+		out = writer.get()
+		out.writeln()
+		out.writeln(textwrap.fill(self.__get_info_text__() + ":", width=terminal.get_size()[0]) + "\n")
+		out.writeln(terminal.bold(terminal.ljust(_("Author"), 21) + terminal.rjust(_("Rows"), 10) +
+		                          terminal.rjust(_("Stability"), 15) + terminal.rjust(_("Age"), 13) +
+		                          terminal.rjust(_("% in comments"), 20)))
 
-		for i in sorted(__blame__.get_summed_blames().items()):
-			print(terminal.ljust(i[0], 20)[0:20 - terminal.get_excess_column_count(i[0])], end=" ")
-			print(str(i[1].rows).rjust(10), end=" ")
-			print("{0:.1f}".format(Blame.get_stability(i[0], i[1].rows, self.changes)).rjust(14), end=" ")
-			print("{0:.1f}".format(float(i[1].skew) / i[1].rows).rjust(12), end=" ")
-			print("{0:.2f}".format(100.0 * i[1].comments / i[1].rows).rjust(19))
+		for i in sorted(self.blame.get_summed_blames().items()):
+			out.write(terminal.ljust(i[0], 20)[0:20 - terminal.get_excess_column_count(i[0])] + " ")
+			out.write(str(i[1].rows).rjust(10) + " ")
+			out.write("{0:.1f}".format(Blame.get_stability(i[0], i[1].rows, self.changes)).rjust(14) + " ")
+			out.write("{0:.1f}".format(float(i[1].skew) / i[1].rows).rjust(12) + " ")
+			out.writeln("{0:.2f}".format(100.0 * i[1].comments / i[1].rows).rjust(19))
 
 	def output_xml(self):
-		message_xml = "\t\t<message>" + _(BLAME_INFO_TEXT) + "</message>\n"
-		blame_xml = ""
+		out = writer.get()
+		out.write("\t<blame>\n\t\t<message>" + self.__get_info_text__() + "</message>\n\t\t<authors>\n")
 
-		for i in sorted(__blame__.get_summed_blames().items()):
+		for i in sorted(self.blame.get_summed_blames().items()):
 			author_email = self.changes.get_latest_email_by_author(i[0])
 
-			name_xml = "\t\t\t\t<name>" + i[0] + "</name>\n"
-			gravatar_xml = "\t\t\t\t<gravatar>" + gravatar.get_url(author_email) + "</gravatar>\n"
-			rows_xml = "\t\t\t\t<rows>" + str(i[1].rows) + "</rows>\n"
-			stability_xml = ("\t\t\t\t<stability>" + "{0:.1f}".format(Blame.get_stability(i[0], i[1].rows,
-			                 self.changes)) + "</stability>\n")
-			age_xml = ("\t\t\t\t<age>" + "{0:.1f}".format(float(i[1].skew) / i[1].rows) + "</age>\n")
-			percentage_in_comments_xml = ("\t\t\t\t<percentage-in-comments>" + "{0:.2f}".format(100.0 * i[1].comments / i[1].rows) +
-			                              "</percentage-in-comments>\n")
-			blame_xml += ("\t\t\t<author>\n" + name_xml + gravatar_xml + rows_xml + stability_xml + age_xml +
-			             percentage_in_comments_xml + "\t\t\t</author>\n")
-
-		print("\t<blame>\n" + message_xml + "\t\t<authors>\n" + blame_xml + "\t\t</authors>\n\t</blame>")
+			out.write("\t\t\t<author>\n")
+			out.write("\t\t\t\t<name>" + i[0] + "</name>\n")
+			out.write("\t\t\t\t<gravatar>" + gravatar.get_url(author_email) + "</gravatar>\n")
+			out.write("\t\t\t\t<rows>" + str(i[1].rows) + "</rows>\n")
+			out.write("\t\t\t\t<stability>" + "{0:.1f}".format(Blame.get_stability(i[0], i[1].rows,
+			          self.changes)) + "</stability>\n")
+			out.write("\t\t\t\t<age>" + "{0:.1f}".format(float(i[1].skew) / i[1].rows) + "</age>\n")
+			out.write("\t\t\t\t<percentage-in-comments>" + "{0:.2f}".format(100.0 * i[1].comments / i[1].rows) +
+			          "</percentage-in-comments>\n")
+			out.write("\t\t\t</author>\n")
+
+		out.writeln("\t\t</authors>\n\t</blame>")
+
+	def output_json(self):
+		records.begin("blame")
+
+		for i in sorted(self.blame.get_summed_blames().items()):
+			record = {"name": i[0], "email": self.changes.get_latest_email_by_author(i[0]), "rows": i[1].rows,
+			          "stability": Blame.get_stability(i[0], i[1].rows, self.changes),
+			          "age": float(i[1].skew) / i[1].rows, "percentage_in_comments": 100.0 * i[1].comments / i[1].rows}
+
+			if self.revision != None:
+				record["revision"] = self.revision
+
+			records.output(record)
+
+		records.end()
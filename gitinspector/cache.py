@@ -0,0 +1,178 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import errno
+import json
+import os
+import tempfile
+import time
+
+__enabled__ = True
+
+def is_enabled():
+	return __enabled__
+
+def set_enabled(enabled):
+	global __enabled__
+	__enabled__ = enabled
+
+def get_cache_dir():
+	cache_dir = os.environ.get("GITINSPECTOR_CACHE_DIR", None)
+
+	if not cache_dir:
+		cache_dir = os.environ.get("XDG_CACHE_HOME", None)
+		cache_dir = os.path.join(cache_dir if cache_dir else os.path.join(os.path.expanduser("~"), ".cache"), "gitinspector")
+
+	return cache_dir
+
+# A persistent mapping stored in a directory of the cache. The keys start with the (hexadecimal) sha of a blob, by the
+# first two characters of which the entries are split into shards; one JSON file each. A shard is only read once one of
+# its entries is looked up, and only the shards to which entries were added are written back.
+#
+# Each shard holds at most max_entries entries, along with when they were last used; the least recently used ones are
+# evicted first. Entries that are looked up are only marked as used again once a day, so that reading the cache does not
+# cause it to be rewritten on every run.
+#
+# Saving a shard merges what is already on disk with the entries of this run before atomically replacing the file. This
+# is done while holding a lock file, so that several gitinspector processes can share the same cache without losing each
+# other's entries. Should the lock not be acquired in time, the entries are simply not saved.
+
+MAX_ENTRIES_PER_SHARD = 2048
+LOCK_TIMEOUT = 10
+USE_INTERVAL = 24 * 60 * 60
+
+class BlobCache(object):
+	def __init__(self, name, cache_dir=None, max_entries=MAX_ENTRIES_PER_SHARD):
+		self.directory = os.path.join(cache_dir if cache_dir else get_cache_dir(), name)
+		self.max_entries = max_entries
+		self.shards = {}
+		self.added = {}
+
+	@staticmethod
+	def __get_shard_name__(key):
+		return key[0:2].lower()
+
+	def __get_path__(self, shard_name):
+		return os.path.join(self.directory, shard_name + ".json")
+
+	def __load__(self, shard_name):
+		try:
+			with open(self.__get_path__(shard_name), "rb") as shard_file:
+				entries = json.loads(shard_file.read().decode("utf-8"))
+		except (IOError, OSError, ValueError):
+			return {}
+
+		if not isinstance(entries, dict):
+			return {}
+
+		return dict(i for i in entries.items() if isinstance(i[1], list) and len(i[1]) == 2)
+
+	def __get_shard__(self, key):
+		shard_name = BlobCache.__get_shard_name__(key)
+
+		if not shard_name in self.shards:
+			self.shards[shard_name] = self.__load__(shard_name)
+
+		return self.shards[shard_name]
+
+	def get(self, key):
+		entry = self.__get_shard__(key).get(key, None)
+
+		if entry == None:
+			return None
+		elif entry[1] < time.time() - USE_INTERVAL:
+			self.put(key, entry[0])
+
+		return entry[0]
+
+	def put(self, key, value):
+		entry = [value, int(time.time())]
+		self.__get_shard__(key)[key] = entry
+		self.added.setdefault(BlobCache.__get_shard_name__(key), {})[key] = entry
+
+	def __lock__(self, shard_name):
+		lock_path = self.__get_path__(shard_name) + ".lock"
+		deadline = time.time() + LOCK_TIMEOUT
+
+		while True:
+			try:
+				os.close(os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+				return lock_path
+			except OSError as exception:
+				if exception.errno != errno.EEXIST:
+					return None
+
+			try:
+				# A lock older than the timeout was left behind by a process that did not get to release it.
+				if os.path.getmtime(lock_path) < time.time() - LOCK_TIMEOUT:
+					os.remove(lock_path)
+					continue
+			except OSError:
+				continue
+
+			if time.time() > deadline:
+				return None
+
+			time.sleep(0.01)
+
+	def __save_shard__(self, shard_name, added):
+		lock_path = self.__lock__(shard_name)
+
+		if lock_path == None:
+			return
+
+		try:
+			entries = self.__load__(shard_name)
+			entries.update(added)
+
+			if len(entries) > self.max_entries:
+				entries = dict(sorted(entries.items(), key=lambda i: (i[1][1], i[0]), reverse=True)[0:self.max_entries])
+
+			(handle, temporary_path) = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+			try:
+				with os.fdopen(handle, "wb") as shard_file:
+					shard_file.write(json.dumps(entries, separators=(",", ":")).encode("utf-8"))
+
+				os.rename(temporary_path, self.__get_path__(shard_name))
+				self.shards[shard_name] = entries
+			except (IOError, OSError):
+				os.remove(temporary_path)
+		finally:
+			os.remove(lock_path)
+
+	def save(self):
+		if not self.added:
+			return
+
+		try:
+			os.makedirs(self.directory)
+		except OSError:
+			if not os.path.isdir(self.directory):
+				return
+
+		for (shard_name, added) in self.added.items():
+			try:
+				self.__save_shard__(shard_name, added)
+			except (IOError, OSError):
+				pass
+
+		self.added = {}
@@ -21,19 +21,26 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from localization import N_
 from outputable import Outputable
+import aggregation
+import copy
 import datetime
 import extensions
 import filtering
 import format
+import gitcommand
 import gravatar
 import interval
 import json
 import multiprocessing
 import os
-import subprocess
+import records
+import session
+import stats
 import terminal
 import textwrap
 import threading
+import tracing
+import writer
 
 CHANGES_PER_THREAD = 200
 NUM_THREADS = multiprocessing.cpu_count()
@@ -41,6 +48,17 @@ NUM_THREADS = multiprocessing.cpu_count()
 __thread_lock__ = threading.BoundedSemaphore(NUM_THREADS)
 __changes_lock__ = threading.Lock()
 
+# The number of threads can only be changed while none are running.
+
+def get_num_threads():
+	return NUM_THREADS
+
+def set_num_threads(num_threads):
+	global NUM_THREADS
+	global __thread_lock__
+	NUM_THREADS = max(1, num_threads)
+	__thread_lock__ = threading.BoundedSemaphore(NUM_THREADS)
+
 class FileDiff:
 	def __init__(self, string):
 		commit_line = string.split("|")
@@ -76,6 +94,8 @@ class FileDiff:
 class Commit:
 	def __init__(self, string):
 		self.filediffs = []
+		self.insertions = 0
+		self.deletions = 0
 		commit_line = string.split("|")
 
 		if commit_line.__len__() == 4:
@@ -86,6 +106,8 @@ class Commit:
 
 	def add_filediff(self, filediff):
 		self.filediffs.append(filediff)
+		self.insertions += filediff.insertions
+		self.deletions += filediff.deletions
 
 	def get_filediffs(self):
 		return self.filediffs
@@ -107,9 +129,62 @@ class AuthorInfo:
 	deletions = 0
 	commits = 0
 
+def get_log_arguments(hard, revisions):
+	return filter(None, ["log", "--reverse", "--pretty=%cd|%H|%aN|%aE", "--stat=100000,8192", "--no-merges", "-w",
+	                     interval.get_since(), interval.get_until(), "--date=short"] +
+	                     (["-C", "-C", "-M"] if hard else []) + [revisions])
+
+# Parses the output of git log (a list of lines, as byte strings, as produced by the arguments above) into the commits
+# touching files of the selected types, along with the emails of their authors (and the other way around). Commits,
+# authors and files are filtered, and the extensions of the files are recorded as located, in the current session.
+
+def parse_log(lines):
+	commit = None
+	found_valid_extension = False
+	is_filtered = False
+	commits = []
+	emails_by_author = {}
+	authors_by_email = {}
+
+	for i in lines:
+		j = i.strip().decode("unicode_escape", "ignore")
+		j = j.encode("latin-1", "replace")
+		j = j.decode("utf-8", "replace")
+
+		if Commit.is_commit_line(j):
+			(author, email) = Commit.get_author_and_email(j)
+			emails_by_author[author] = email
+			authors_by_email[email] = author
+
+		if Commit.is_commit_line(j) or i is lines[-1]:
+			if found_valid_extension:
+				commits.append(commit)
+
+			found_valid_extension = False
+			is_filtered = False
+			commit = Commit(j)
+
+			if Commit.is_commit_line(j) and \
+			   (filtering.set_filtered(commit.author, "author") or \
+			   filtering.set_filtered(commit.email, "email") or \
+			   filtering.set_filtered(commit.sha, "revision") or \
+			   filtering.set_filtered(commit.sha, "message")):
+				is_filtered = True
+
+		if FileDiff.is_filediff_line(j) and not \
+		   filtering.set_filtered(FileDiff.get_filename(j)) and not is_filtered:
+			extensions.add_located(FileDiff.get_extension(j))
+
+			if FileDiff.is_valid_extension(j):
+				found_valid_extension = True
+				filediff = FileDiff(j)
+				commit.add_filediff(filediff)
+
+	return (commits, emails_by_author, authors_by_email)
+
 class ChangesThread(threading.Thread):
 	def __init__(self, hard, changes, first_hash, second_hash, offset):
-		__thread_lock__.acquire() # Lock controlling the number of threads running
+		tracing.acquire(__thread_lock__, "wait for thread") # Lock controlling the number of threads running
 		threading.Thread.__init__(self)
 
 		self.hard = hard
@@ -117,6 +192,8 @@ class ChangesThread(threading.Thread):
 		self.first_hash = first_hash
 		self.second_hash = second_hash
 		self.offset = offset
+		self.session = session.get()
+		self.stage = stats.get_stage()
 
 	@staticmethod
 	def create(hard, changes, first_hash, second_hash, offset):
@@ -124,103 +201,98 @@ class ChangesThread(threading.Thread):
 		thread.daemon = True
 		thread.start()
 
+		return thread
+
 	def run(self):
-		git_log_r = subprocess.Popen(filter(None, ["git", "log", "--reverse", "--pretty=%cd|%H|%aN|%aE",
-		                             "--stat=100000,8192", "--no-merges", "-w", interval.get_since(),
-		                             interval.get_until(), "--date=short"] + (["-C", "-C", "-M"] if self.hard else []) +
-		                             [self.first_hash + self.second_hash]), bufsize=1, stdout=subprocess.PIPE).stdout
-		lines = git_log_r.readlines()
-		git_log_r.close()
-
-		commit = None
-		found_valid_extension = False
-		is_filtered = False
-		commits = []
-
-		__changes_lock__.acquire() # Global lock used to protect calls from here...
-
-		for i in lines:
-			j = i.strip().decode("unicode_escape", "ignore")
-			j = j.encode("latin-1", "replace")
-			j = j.decode("utf-8", "replace")
-
-			if Commit.is_commit_line(j):
-				(author, email) = Commit.get_author_and_email(j)
-				self.changes.emails_by_author[author] = email
-				self.changes.authors_by_email[email] = author
-
-			if Commit.is_commit_line(j) or i is lines[-1]:
-				if found_valid_extension:
-					commits.append(commit)
-
-				found_valid_extension = False
-				is_filtered = False
-				commit = Commit(j)
-
-				if Commit.is_commit_line(j) and \
-				   (filtering.set_filtered(commit.author, "author") or \
-				   filtering.set_filtered(commit.email, "email") or \
-				   filtering.set_filtered(commit.sha, "revision") or \
-				   filtering.set_filtered(commit.sha, "message")):
-					is_filtered = True
-
-			if FileDiff.is_filediff_line(j) and not \
-			   filtering.set_filtered(FileDiff.get_filename(j)) and not is_filtered:
-				extensions.add_located(FileDiff.get_extension(j))
-
-				if FileDiff.is_valid_extension(j):
-					found_valid_extension = True
-					filediff = FileDiff(j)
-					commit.add_filediff(filediff)
+		with self.session:
+			with stats.worker(self.stage, NUM_THREADS):
+				self.__parse__()
+
+	def __parse__(self):
+		lines = gitcommand.read_lines(get_log_arguments(self.hard, self.first_hash + self.second_hash))
+		tracing.acquire(__changes_lock__, "wait for changes lock") # Global lock used to protect calls from here...
+
+		with tracing.span("parse log", "parse", {"lines": len(lines)}):
+			(commits, emails_by_author, authors_by_email) = parse_log(lines)
 
+		self.changes.emails_by_author.update(emails_by_author)
+		self.changes.authors_by_email.update(authors_by_email)
 		self.changes.commits[self.offset // CHANGES_PER_THREAD] = commits
 		__changes_lock__.release() # ...to here.
 		__thread_lock__.release() # Lock controlling the number of threads running
 
 class Changes:
-	authors = {}
-	authors_dateinfo = {}
-	authors_by_email = {}
-	emails_by_author = {}
-
-	def __init__(self, hard):
+	# When a base revision is given, only the commits made after it (up to HEAD) are parsed.
+	def __init__(self, hard, base=None):
+		self.authors = {}
+		self.authors_dateinfo = {}
+		self.authors_by_email = {}
+		self.emails_by_author = {}
 		self.commits = []
-		git_log_hashes_r = subprocess.Popen(filter(None, ["git", "rev-list", "--reverse", "--no-merges",
-		                                    interval.get_since(), interval.get_until(), "HEAD"]), bufsize=1,
-		                                    stdout=subprocess.PIPE).stdout
-		lines = git_log_hashes_r.readlines()
-		git_log_hashes_r.close()
+		self.commit_totals = None
+		lines = gitcommand.read_lines(filter(None, ["rev-list", "--reverse", "--no-merges", interval.get_since(),
+		                              interval.get_until(), base + "..HEAD" if base else "HEAD"]))
+		threads = []
 
 		if len(lines) > 0:
-			self.commits = [None] * (len(lines) // CHANGES_PER_THREAD + 1)
-			first_hash = ""
+			self.commits = [None] * ((len(lines) + CHANGES_PER_THREAD - 1) // CHANGES_PER_THREAD)
+			first_hash = base + ".." if base else ""
 
 			for i, entry in enumerate(lines):
 				if i % CHANGES_PER_THREAD == CHANGES_PER_THREAD - 1:
 					entry = entry.decode("utf-8", "replace").strip()
 					second_hash = entry
-					ChangesThread.create(hard, self, first_hash, second_hash, i)
+					threads.append(ChangesThread.create(hard, self, first_hash, second_hash, i))
 					first_hash = entry + ".."
-			else:
+			if len(lines) % CHANGES_PER_THREAD != 0:
 				entry = entry.decode("utf-8", "replace").strip()
 				second_hash = entry
-				ChangesThread.create(hard, self, first_hash, second_hash, i)
+				threads.append(ChangesThread.create(hard, self, first_hash, second_hash, i))
 
-		# Make sure all threads have completed.
-		for i in range(0, NUM_THREADS):
-			__thread_lock__.acquire()
+		for thread in threads:
+			thread.join()
 
 		self.commits = [item for sublist in self.commits for item in sublist]
 
-		if len(self.commits) > 0:
-			if interval.has_interval() and len(self.commits) > 0:
-				interval.set_ref(self.commits[-1].sha)
+		if len(self.commits) > 0 and interval.has_interval():
+			interval.set_ref(self.commits[-1].sha)
+
+		self.__set_commit_dates__()
 
+	def __set_commit_dates__(self):
+		if len(self.commits) > 0:
 			self.first_commit_date = datetime.date(int(self.commits[0].date[0:4]), int(self.commits[0].date[5:7]),
 			                                       int(self.commits[0].date[8:10]))
 			self.last_commit_date = datetime.date(int(self.commits[-1].date[0:4]), int(self.commits[-1].date[5:7]),
 			                                      int(self.commits[-1].date[8:10]))
 
+	def prepend(self, changes):
+		self.commits = changes.commits + self.commits
+		self.commit_totals = None
+		self.authors = {}
+		self.authors_dateinfo = {}
+
+		for (email, author) in changes.authors_by_email.items():
+			self.authors_by_email.setdefault(email, author)
+
+		for (author, email) in changes.emails_by_author.items():
+			self.emails_by_author.setdefault(author, email)
+
+		self.__set_commit_dates__()
+
+	# Returns the changes made between two dates (in the YYYY-MM-DD format, both inclusive, either of which can be None),
+	# taken from the commits already parsed.
+	def get_window(self, since, until):
+		window = copy.copy(self)
+		window.commits = [i for i in self.commits if (since == None or i.date >= since) and
+		                                             (until == None or i.date <= until)]
+		window.commit_totals = None
+		window.authors = {}
+		window.authors_dateinfo = {}
+		window.__set_commit_dates__()
+
+		return window
+
 	def get_commits(self):
 		return self.commits
 
@@ -236,20 +308,44 @@ class Changes:
 			authors[key].insertions += j.insertions
 			authors[key].deletions += j.deletions
 
+	def __get_commit_totals__(self):
+		if self.commit_totals == None:
+			self.commit_totals = ([i.insertions for i in self.commits], [i.deletions for i in self.commits],
+			                      [1 if i.get_filediffs() else 0 for i in self.commits])
+
+		return self.commit_totals
+
+	def __get_authorinfo__(self, keys):
+		(commit_insertions, commit_deletions, commit_counts) = self.__get_commit_totals__()
+		(keys, groups) = aggregation.index(keys)
+		(insertions, deletions, commits) = aggregation.sums_by_group(groups, [commit_insertions, commit_deletions,
+		                                                                      commit_counts], len(keys))
+		authors = {}
+
+		for i, key in enumerate(keys):
+			authors[key] = AuthorInfo()
+			authors[key].insertions = insertions[i]
+			authors[key].deletions = deletions[i]
+			authors[key].commits = commits[i]
+
+		return authors
+
 	def get_authorinfo_list(self):
 		if not self.authors:
-			for i in self.commits:
-				Changes.modify_authorinfo(self.authors, i.author, i)
+			self.authors = self.__get_authorinfo__(i.author for i in self.commits)
 
 		return self.authors
 
 	def get_authordateinfo_list(self):
 		if not self.authors_dateinfo:
-			for i in self.commits:
-				Changes.modify_authorinfo(self.authors_dateinfo, (i.date, i.author), i)
+			self.authors_dateinfo = self.__get_authorinfo__((i.date, i.author) for i in self.commits)
 
 		return self.authors_dateinfo
 
+	def get_total_changes(self):
+		(commit_insertions, commit_deletions, _unused) = self.__get_commit_totals__()
+		return sum(commit_insertions) + sum(commit_deletions)
+
 	def get_latest_author_by_email(self, name):
 		if not hasattr(name, "decode"):
 			name = str.encode(name)
@@ -260,14 +356,22 @@ class Changes:
 	def get_latest_email_by_author(self, name):
 		return self.emails_by_author[name]
 
-__changes__ = None
-
 def get(hard):
-	global __changes__
-	if __changes__ == None:
-		__changes__ = Changes(hard)
+	if session.get().changes == None:
+		session.get().changes = Changes(hard)
+
+	return session.get().changes
 
-	return __changes__
+def reset():
+	session.get().changes = None
+
+# Extends the parsed history with the commits made after base, which has to be an ancestor of HEAD.
+def update(hard, base):
+	previous_changes = get(hard)
+	session.get().changes = Changes(hard, base)
+	session.get().changes.prepend(previous_changes)
+
+	return session.get().changes
 
 HISTORICAL_INFO_TEXT = N_("The following historical commit information, by author, was found in the repository")
 NO_COMMITED_FILES_TEXT = N_("No commited files with the specified extensions were found")
@@ -279,117 +383,117 @@ class ChangesOutput(Outputable):
 
 	def output_html(self):
 		authorinfo_list = self.changes.get_authorinfo_list()
-		total_changes = 0.0
-		changes_xml = "<div><div class=\"box\">"
-		chart_data = ""
-
-		for i in authorinfo_list:
-			total_changes += authorinfo_list.get(i).insertions
-			total_changes += authorinfo_list.get(i).deletions
+		total_changes = float(self.changes.get_total_changes())
+		out = writer.get()
+		out.write("<div><div class=\"box\">")
+		chart_data = []
 
 		if authorinfo_list:
-			changes_xml += "<p>" + _(HISTORICAL_INFO_TEXT) + ".</p><div><table id=\"changes\" class=\"git\">"
-			changes_xml += "<thead><tr> <th>{0}</th> <th>{1}</th> <th>{2}</th> <th>{3}</th> <th>{4}</th>".format(
-			               _("Author"), _("Commits"), _("Insertions"), _("Deletions"), _("% of changes"))
-			changes_xml += "</tr></thead><tbody>"
+			out.write("<p>" + _(HISTORICAL_INFO_TEXT) + ".</p><div><table id=\"changes\" class=\"git\">")
+			out.write("<thead><tr> <th>{0}</th> <th>{1}</th> <th>{2}</th> <th>{3}</th> <th>{4}</th>".format(
+			          _("Author"), _("Commits"), _("Insertions"), _("Deletions"), _("% of changes")))
+			out.write("</tr></thead><tbody>")
 
 			for i, entry in enumerate(sorted(authorinfo_list)):
 				authorinfo = authorinfo_list.get(entry)
 				percentage = 0 if total_changes == 0 else (authorinfo.insertions + authorinfo.deletions) / total_changes * 100
 
-				changes_xml += "<tr " + ("class=\"odd\">" if i % 2 == 1 else ">")
+				out.write("<tr " + ("class=\"odd\">" if i % 2 == 1 else ">"))
 
 				if format.get_selected() == "html":
-					changes_xml += "<td><img src=\"{0}\"/>{1}</td>".format(
-					               gravatar.get_url(self.changes.get_latest_email_by_author(entry)), entry)
+					out.write("<td><img src=\"{0}\"/>{1}</td>".format(
+					          gravatar.get_url(self.changes.get_latest_email_by_author(entry)), entry))
 				else:
-					changes_xml += "<td>" + entry + "</td>"
-
-				changes_xml += "<td>" + str(authorinfo.commits) + "</td>"
-				changes_xml += "<td>" + str(authorinfo.insertions) + "</td>"
-				changes_xml += "<td>" + str(authorinfo.deletions) + "</td>"
-				changes_xml += "<td>" + "{0:.2f}".format(percentage) + "</td>"
-				changes_xml += "</tr>"
-				chart_data += "{{label: {0}, data: {1}}}".format(json.dumps(entry), "{0:.2f}".format(percentage))
-
-				if sorted(authorinfo_list)[-1] != entry:
-					chart_data += ", "
-
-			changes_xml += ("<tfoot><tr> <td colspan=\"5\">&nbsp;</td> </tr></tfoot></tbody></table>")
-			changes_xml += "<div class=\"chart\" id=\"changes_chart\"></div></div>"
-			changes_xml += "<script type=\"text/javascript\">"
-			changes_xml += "    changes_plot = $.plot($(\"#changes_chart\"), [{0}], {{".format(chart_data)
-			changes_xml += "        series: {"
-			changes_xml += "            pie: {"
-			changes_xml += "                innerRadius: 0.4,"
-			changes_xml += "                show: true,"
-			changes_xml += "                combine: {"
-			changes_xml += "                    threshold: 0.01,"
-			changes_xml += "                    label: \"" + _("Minor Authors") + "\""
-			changes_xml += "                }"
-			changes_xml += "            }"
-			changes_xml += "        }, grid: {"
-			changes_xml += "            hoverable: true"
-			changes_xml += "        }"
-			changes_xml += "    });"
-			changes_xml += "</script>"
+					out.write("<td>" + entry + "</td>")
+
+				out.write("<td>" + str(authorinfo.commits) + "</td>")
+				out.write("<td>" + str(authorinfo.insertions) + "</td>")
+				out.write("<td>" + str(authorinfo.deletions) + "</td>")
+				out.write("<td>" + "{0:.2f}".format(percentage) + "</td>")
+				out.write("</tr>")
+				chart_data.append("{{label: {0}, data: {1}}}".format(json.dumps(entry), "{0:.2f}".format(percentage)))
+
+			out.write("<tfoot><tr> <td colspan=\"5\">&nbsp;</td> </tr></tfoot></tbody></table>")
+			out.write("<div class=\"chart\" id=\"changes_chart\"></div></div>")
+			out.write("<script type=\"text/javascript\">")
+			out.write("    changes_plot = $.plot($(\"#changes_chart\"), [{0}], {{".format(", ".join(chart_data)))
+			out.write("        series: {"
+			          "            pie: {"
+			          "                innerRadius: 0.4,"
+			          "                show: true,"
+			          "                combine: {"
+			          "                    threshold: 0.01,"
+			          "                    label: \"" + _("Minor Authors") + "\""
+			          "                }"
+			          "            }"
+			          "        }, grid: {"
+			          "            hoverable: true"
+			          "        }"
+			          "    });")
+			out.write("</script>")
 		else:
-			changes_xml += "<p>" + _(NO_COMMITED_FILES_TEXT) + ".</p>"
+			out.write("<p>" + _(NO_COMMITED_FILES_TEXT) + ".</p>")
 
-		changes_xml += "</div></div>"
-		print(changes_xml)
+		out.writeln("</div></div>")
 
 	def output_text(self):
 		authorinfo_list = self.changes.get_authorinfo_list()
-		total_changes = 0.0
-
-		for i in authorinfo_list:
-			total_changes += authorinfo_list.get(i).insertions
-			total_changes += authorinfo_list.get(i).deletions
+		total_changes = float(self.changes.get_total_changes())
+		out = writer.get()
 
 		if authorinfo_list:
-			print(textwrap.fill(_(HISTORICAL_INFO_TEXT) + ":", width=terminal.get_size()[0]) + "\n")
-			terminal.printb(terminal.ljust(_("Author"), 21) + terminal.rjust(_("Commits"), 13) +
-			                terminal.rjust(_("Insertions"), 14) + terminal.rjust(_("Deletions"), 15) +
-					terminal.rjust(_("% of changes"), 16))
+			out.writeln(textwrap.fill(_(HISTORICAL_INFO_TEXT) + ":", width=terminal.get_size()[0]) + "\n")
+			out.writeln(terminal.bold(terminal.ljust(_("Author"), 21) + terminal.rjust(_("Commits"), 13) +
+			                          terminal.rjust(_("Insertions"), 14) + terminal.rjust(_("Deletions"), 15) +
+			                          terminal.rjust(_("% of changes"), 16)))
 
 			for i in sorted(authorinfo_list):
 				authorinfo = authorinfo_list.get(i)
 				percentage = 0 if total_changes == 0 else (authorinfo.insertions + authorinfo.deletions) / total_changes * 100
 
-				print(terminal.ljust(i, 20)[0:20 - terminal.get_excess_column_count(i)], end=" ")
-				print(str(authorinfo.commits).rjust(13), end=" ")
-				print(str(authorinfo.insertions).rjust(13), end=" ")
-				print(str(authorinfo.deletions).rjust(14), end=" ")
-				print("{0:.2f}".format(percentage).rjust(15))
+				out.write(terminal.ljust(i, 20)[0:20 - terminal.get_excess_column_count(i)] + " ")
+				out.write(str(authorinfo.commits).rjust(13) + " ")
+				out.write(str(authorinfo.insertions).rjust(13) + " ")
+				out.write(str(authorinfo.deletions).rjust(14) + " ")
+				out.writeln("{0:.2f}".format(percentage).rjust(15))
 		else:
-			print(_(NO_COMMITED_FILES_TEXT) + ".")
+			out.writeln(_(NO_COMMITED_FILES_TEXT) + ".")
 
 	def output_xml(self):
 		authorinfo_list = self.changes.get_authorinfo_list()
-		total_changes = 0.0
-
-		for i in authorinfo_list:
-			total_changes += authorinfo_list.get(i).insertions
-			total_changes += authorinfo_list.get(i).deletions
+		total_changes = float(self.changes.get_total_changes())
+		out = writer.get()
 
 		if authorinfo_list:
-			message_xml = "\t\t<message>" + _(HISTORICAL_INFO_TEXT) + "</message>\n"
-			changes_xml = ""
+			out.write("\t<changes>\n\t\t<message>" + _(HISTORICAL_INFO_TEXT) + "</message>\n\t\t<authors>\n")
 
 			for i in sorted(authorinfo_list):
 				authorinfo = authorinfo_list.get(i)
 				percentage = 0 if total_changes == 0 else (authorinfo.insertions + authorinfo.deletions) / total_changes * 100
-				name_xml = "\t\t\t\t<name>" + i + "</name>\n"
-				gravatar_xml = "\t\t\t\t<gravatar>" + gravatar.get_url(self.changes.get_latest_email_by_author(i)) + "</gravatar>\n"
-				commits_xml = "\t\t\t\t<commits>" + str(authorinfo.commits) + "</commits>\n"
-				insertions_xml = "\t\t\t\t<insertions>" + str(authorinfo.insertions) + "</insertions>\n"
-				deletions_xml = "\t\t\t\t<deletions>" + str(authorinfo.deletions) + "</deletions>\n"
-				percentage_xml = "\t\t\t\t<percentage-of-changes>" + "{0:.2f}".format(percentage) + "</percentage-of-changes>\n"
 
-				changes_xml += ("\t\t\t<author>\n" + name_xml + gravatar_xml + commits_xml + insertions_xml +
-				                deletions_xml + percentage_xml + "\t\t\t</author>\n")
+				out.write("\t\t\t<author>\n")
+				out.write("\t\t\t\t<name>" + i + "</name>\n")
+				out.write("\t\t\t\t<gravatar>" + gravatar.get_url(self.changes.get_latest_email_by_author(i)) + "</gravatar>\n")
+				out.write("\t\t\t\t<commits>" + str(authorinfo.commits) + "</commits>\n")
+				out.write("\t\t\t\t<insertions>" + str(authorinfo.insertions) + "</insertions>\n")
+				out.write("\t\t\t\t<deletions>" + str(authorinfo.deletions) + "</deletions>\n")
+				out.write("\t\t\t\t<percentage-of-changes>" + "{0:.2f}".format(percentage) + "</percentage-of-changes>\n")
+				out.write("\t\t\t</author>\n")
 
-			print("\t<changes>\n" + message_xml + "\t\t<authors>\n" + changes_xml + "\t\t</authors>\n\t</changes>")
+			out.writeln("\t\t</authors>\n\t</changes>")
 		else:
-			print("\t<changes>\n\t\t<exception>" + _(NO_COMMITED_FILES_TEXT) + "</exception>\n\t</changes>")
+			out.writeln("\t<changes>\n\t\t<exception>" + _(NO_COMMITED_FILES_TEXT) + "</exception>\n\t</changes>")
+
+	def output_json(self):
+		authorinfo_list = self.changes.get_authorinfo_list()
+		total_changes = float(self.changes.get_total_changes())
+		records.begin("changes")
+
+		for i in sorted(authorinfo_list):
+			authorinfo = authorinfo_list.get(i)
+			percentage = 0 if total_changes == 0 else (authorinfo.insertions + authorinfo.deletions) / total_changes * 100
+			records.output({"name": i, "email": self.changes.get_latest_email_by_author(i), "commits": authorinfo.commits,
+			                "insertions": authorinfo.insertions, "deletions": authorinfo.deletions,
+			                "percentage_of_changes": percentage})
+
+		records.end()
@@ -17,31 +17,131 @@
 # You should have received a copy of the GNU General Public License
 # along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
 
+from __future__ import print_function
 from __future__ import unicode_literals
 
-import shutil
-import subprocess
+import cache
+import gitcommand
+import os
+import session
 import sys
-import tempfile
 
-__cloned_path__ = None
+# Repositories given as URLs are cloned before being analysed; either to a temporary directory removed at exit or, when
+# mirroring is enabled, to a mirror kept in the cache directory that later runs update with a fetch.
+#
+# A partial clone leaves out every file content (which git then fetches on demand, when blaming or computing metrics).
+# A shallow clone only holds the commits made since the start of the interval, along with their parents; these are
+# older than the interval, so neither the changes nor the blame of the interval are affected.
+#
+# The way of cloning applies to every repository, while the temporary clone belongs to the current analysis session.
+
+MODES = ["full", "partial", "shallow"]
+
+__mode__ = "full"
+__mirror__ = False
+__since__ = None
+
+def set_mode(mode):
+	global __mode__
+	__mode__ = mode
+
+def set_mirror(mirror):
+	global __mirror__
+	__mirror__ = mirror
+
+def is_shallow():
+	return __mode__ == "shallow"
+
+def get_since():
+	return __since__
+
+def set_since(since):
+	global __since__
+	__since__ = since
+
+def is_url(url):
+	return url.startswith("file://") or url.startswith("git://") or url.startswith("http://") or \
+	       url.startswith("https://") or url.startswith("ssh://")
+
+def __get_clone_arguments__():
+	if __mode__ == "partial":
+		return ["--filter=blob:none"]
+	elif __mode__ == "shallow":
+		return ["--shallow-since=" + __since__]
+	return []
+
+def __git__(args):
+	returncode = gitcommand.GitProcess(args, stdout=sys.stderr).close()
+
+	if returncode != 0:
+		sys.exit(returncode)
+
+def __deepen__(location):
+	if __mode__ == "shallow":
+		__git__(["-C", location, "fetch", "-q", "--deepen=1"])
+
+# Mirrors are named after the URL and the kind of clone, so that full, partial and shallow mirrors of the same
+# repository are kept apart. A new mirror is cloned next to its final location and then renamed into place; should
+# another process have created the same mirror meanwhile, that one is used instead.
+
+def get_mirror_path(url):
+	import hashlib
+	name = os.path.basename(url.rstrip("/"))
+	name = name[:-len(".git")] if name.endswith(".git") else name
+	digest = hashlib.sha1((url + "\0" + __mode__).encode("utf-8")).hexdigest()[0:16]
+	return os.path.join(cache.get_cache_dir(), "mirrors", "{0}-{1}.git".format(name, digest))
+
+def __create_mirror__(url):
+	location = get_mirror_path(url)
+
+	if os.path.isdir(location):
+		fetch = ["-C", location, "fetch", "-q", "--prune", "origin"]
+		fetch += ["--shallow-since=" + __since__] if __mode__ == "shallow" else []
+
+		if gitcommand.GitProcess(fetch, stdout=sys.stderr).close() != 0:
+			print(_("Unable to update the mirror of \"{0}\"; analysing the mirrored repository as it is.").format(url),
+			      file=sys.stderr)
+		else:
+			__deepen__(location)
+		return location
+
+	import shutil
+	import tempfile
+
+	if not os.path.isdir(os.path.dirname(location)):
+		os.makedirs(os.path.dirname(location))
+
+	temporary_location = tempfile.mkdtemp(suffix=".tmp", dir=os.path.dirname(location))
+
+	try:
+		__git__(["clone", "--mirror"] + __get_clone_arguments__() + [url, temporary_location])
+		__deepen__(temporary_location)
+		os.rename(temporary_location, location)
+	except OSError:
+		if not os.path.isdir(location):
+			raise
+	finally:
+		shutil.rmtree(temporary_location, ignore_errors=True)
+
+	return location
 
 def create(url):
-	if url.startswith("file://") or url.startswith("git://") or url.startswith("http://") or \
-	   url.startswith("https://") or url.startswith("ssh://"):
-		global __cloned_path__
+	if is_url(url):
+		if __mirror__:
+			return __create_mirror__(url)
 
-		location = tempfile.mkdtemp(suffix=".gitinspector")
-		git_clone = subprocess.Popen(["git", "clone", url, location], bufsize=1, stdout=sys.stderr)
-		git_clone.wait()
+		import tempfile
 
-		if git_clone.returncode != 0:
-			sys.exit(git_clone.returncode)
+		location = tempfile.mkdtemp(suffix=".gitinspector")
+		session.get().cloned_path = location
+		__git__(["clone"] + __get_clone_arguments__() + [url, location])
+		__deepen__(location)
 
-		__cloned_path__ = location
 		return location
 	return url
 
 def delete():
-	if __cloned_path__:
-		shutil.rmtree(__cloned_path__, ignore_errors=True)
+	if session.get().cloned_path:
+		import shutil
+		shutil.rmtree(session.get().cloned_path, ignore_errors=True)
+		session.get().cloned_path = None
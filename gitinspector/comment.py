@@ -74,3 +74,85 @@ def handle_comment_block(is_inside_comment, extension, content):
 		is_inside_comment = True
 
 	return (comments, is_inside_comment)
+
+# Flags describing each line in the bitmap returned by classify() and classify_lines(). A line is a COMMENT if it is a
+# comment by itself (see is_comment()), INSIDE_COMMENT if a comment block is still open at the end of the line and
+# CONTINUED_COMMENT if the line is inside a comment block that neither begins nor ends on it.
+
+COMMENT = 1
+INSIDE_COMMENT = 2
+CONTINUED_COMMENT = 4
+
+__scanners__ = {}
+
+def __create_scanner__(extension):
+	begining = __comment_begining__.get(extension, None)
+	end = __comment_end__.get(extension, None)
+	markers = tuple(i for i in [begining, __comment__.get(extension, None)] if i != None)
+	at_begining = __comment_markers_must_be_at_begining__.get(extension, None) == True
+
+	def scan(lines):
+		flags = bytearray(len(lines))
+
+		if not markers and end == None:
+			return flags
+
+		is_inside_comment = False
+
+		for i, line in enumerate(lines):
+			stripped = line.strip()
+			value = COMMENT if (markers and stripped.startswith(markers)) or (end != None and stripped.endswith(end)) else 0
+
+			if at_begining:
+				has_end = line.startswith(end)
+			else:
+				has_end = end != None and end in line
+
+			if is_inside_comment:
+				if has_end:
+					is_inside_comment = False
+				else:
+					value |= INSIDE_COMMENT | CONTINUED_COMMENT
+			elif not has_end and begining != None:
+				if at_begining:
+					has_begining = line.startswith(begining)
+				else:
+					has_begining = line.find(end, 2) == -1 and begining in line
+
+				if has_begining:
+					is_inside_comment = True
+					value |= INSIDE_COMMENT
+
+			flags[i] = value
+
+		return flags
+
+	return scan
+
+def __get_scanner__(extension):
+	scanner = __scanners__.get(extension, None)
+
+	if scanner == None:
+		scanner = __create_scanner__(extension)
+		__scanners__[extension] = scanner
+
+	return scanner
+
+def classify_lines(extension, lines):
+	return __get_scanner__(extension)(lines)
+
+def classify(extension, buffer):
+	if isinstance(buffer, bytes):
+		buffer = buffer.decode("utf-8", "replace")
+
+	lines = buffer.split("\n")
+	last_line = lines.pop()
+	lines = [i + "\n" for i in lines]
+
+	if last_line:
+		lines.append(last_line)
+
+	return classify_lines(extension, lines)
+
+def count_comments(flags):
+	return (flags & COMMENT) + (1 if flags & CONTINUED_COMMENT else 0)
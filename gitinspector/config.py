@@ -18,70 +18,101 @@
 # along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import unicode_literals
+import cache
 import extensions
 import filtering
 import format
+import gitcommand
 import interval
 import optval
-import os
-import subprocess
 
-def __read_git_config__(repo, variable):
-	previous_directory = os.getcwd()
-	os.chdir(repo)
-	setting = subprocess.Popen(["git", "config", "inspector." + variable], bufsize=1, stdout=subprocess.PIPE).stdout
-	os.chdir(previous_directory)
+# All of the inspector.* settings of the repository are read at once, by a single git process.
 
-	try:
-		setting = setting.readlines()[0]
-		setting = setting.decode("utf-8", "replace").strip()
-	except IndexError:
-		setting = ""
+def __read_git_config__(repo):
+	settings = {}
+	output = gitcommand.run(["config", "-z", "--get-regexp", "^inspector\\."], cwd=repo, quiet=True)[1]
+
+	for i in output.decode("utf-8", "replace").split("\0"):
+		if i:
+			(variable, value) = (i.split("\n", 1) + [""])[0:2]
+			settings[variable[len("inspector."):]] = value.strip()
 
-	return setting
+	return settings
 
-def __read_git_config_bool__(repo, variable):
+def __read_git_config_bool__(settings, variable):
 	try:
-		variable = __read_git_config__(repo, variable)
+		variable = settings.get(variable, "")
 		return optval.get_boolean_argument(False if variable == "" else variable)
 	except optval.InvalidOptionArgument:
 		return False
 
-def __read_git_config_string__(repo, variable):
-	string = __read_git_config__(repo, variable)
+def __read_git_config_string__(settings, variable):
+	string = settings.get(variable, "")
 	return (True, string) if len(string) > 0 else (False, None)
 
 def init(run):
-	var = __read_git_config_string__(run.repo, "file-types")
+	settings = __read_git_config__(run.repo)
+
+	if __read_git_config_string__(settings, "cache")[0]:
+		cache.set_enabled(__read_git_config_bool__(settings, "cache"))
+
+	var = __read_git_config_string__(settings, "file-types")
 	if var[0]:
 		extensions.define(var[1])
 
-	var = __read_git_config_string__(run.repo, "exclude")
+	var = __read_git_config_string__(settings, "exclude")
 	if var[0]:
 		filtering.add(var[1])
 
-	var = __read_git_config_string__(run.repo, "format")
+	var = __read_git_config_string__(settings, "format")
 	if var[0] and not format.select(var[1]):
 		raise format.InvalidFormatError(_("specified output format not supported."))
 
-	run.hard = __read_git_config_bool__(run.repo, "hard")
-	run.list_file_types = __read_git_config_bool__(run.repo, "list-file-types")
-	run.localize_output = __read_git_config_bool__(run.repo, "localize-output")
-	run.metrics = __read_git_config_bool__(run.repo, "metrics")
-	run.responsibilities = __read_git_config_bool__(run.repo, "responsibilities")
-	run.useweeks = __read_git_config_bool__(run.repo, "weeks")
+	var = __read_git_config_string__(settings, "jobs")
+	if var[0]:
+		import metrics
+		metrics.set_num_workers(optval.get_positive_integer_argument(var[1]))
+
+	var = __read_git_config_string__(settings, "granularity")
+	if var[0]:
+		import timeline
+		if not var[1] in timeline.GRANULARITIES:
+			raise optval.InvalidOptionArgument(_("specified timeline granularity not supported."))
+		run.granularity = var[1]
+
+	run.hard = __read_git_config_bool__(settings, "hard")
+	run.list_file_types = __read_git_config_bool__(settings, "list-file-types")
+	run.localize_output = __read_git_config_bool__(settings, "localize-output")
+	run.metrics = __read_git_config_bool__(settings, "metrics")
+	run.responsibilities = __read_git_config_bool__(settings, "responsibilities")
+
+	var = __read_git_config_string__(settings, "metrics-trend")
+	if var[0]:
+		run.metrics_trend = var[1]
+
+	var = __read_git_config_string__(settings, "output")
+	if var[0]:
+		run.outputs = format.parse_targets(var[1])
+
+	run.useweeks = __read_git_config_bool__(settings, "weeks")
+
+	var = __read_git_config_string__(settings, "windows")
+	if var[0]:
+		import windows
+		windows.parse(var[1])
+		run.windows = var[1]
 
-	var = __read_git_config_string__(run.repo, "since")
+	var = __read_git_config_string__(settings, "since")
 	if var[0]:
 		interval.set_since(var[1])
 
-	var = __read_git_config_string__(run.repo, "until")
+	var = __read_git_config_string__(settings, "until")
 	if var[0]:
 		interval.set_until(var[1])
 
-	run.timeline = __read_git_config_bool__(run.repo, "timeline")
+	run.timeline = __read_git_config_bool__(settings, "timeline")
 
-	if __read_git_config_bool__(run.repo, "grading"):
+	if __read_git_config_bool__(settings, "grading"):
 		run.hard = True
 		run.list_file_types = True
 		run.metrics = True
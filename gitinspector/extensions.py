@@ -21,26 +21,31 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from localization import N_
 from outputable import Outputable
+import records
+import session
 import terminal
 import textwrap
+import writer
 
 DEFAULT_EXTENSIONS = ["java", "c", "cc", "cpp", "h", "hh", "hpp", "py", "glsl", "rb", "js", "sql"]
 
-__extensions__ = DEFAULT_EXTENSIONS
-__located_extensions__ = set()
-
 def get():
-	return __extensions__
+	return session.get().extensions if session.get().extensions else DEFAULT_EXTENSIONS
 
 def define(string):
-	global __extensions__
-	__extensions__ = string.split(",")
+	session.get().extensions = string.split(",")
+
+def get_located():
+	return session.get().located_extensions
+
+def reset_located():
+	get_located().clear()
 
 def add_located(string):
 	if len(string) == 0:
-		__located_extensions__.add("*")
+		get_located().add("*")
 	else:
-		__located_extensions__.add(string)
+		get_located().add(string)
 
 EXTENSIONS_INFO_TEXT = N_("The extensions below were found in the repository history")
 EXTENSIONS_MARKED_TEXT = N_("(extensions used during statistical analysis are marked)")
@@ -48,49 +53,60 @@ EXTENSIONS_MARKED_TEXT = N_("(extensions used during statistical analysis are ma
 class Extensions(Outputable):
 	@staticmethod
 	def is_marked(extension):
-		if extension in __extensions__ or "**" in __extensions__:
+		if extension in get() or "**" in get():
 			return True
 
 		return False
 
 	def output_html(self):
-		if __located_extensions__:
-			extensions_xml = "<div><div class=\"box\">"
-			extensions_xml += "<p>{0} {1}.</p><p>".format(_(EXTENSIONS_INFO_TEXT), _(EXTENSIONS_MARKED_TEXT))
+		if get_located():
+			out = writer.get()
+			out.write("<div><div class=\"box\">")
+			out.write("<p>{0} {1}.</p><p>".format(_(EXTENSIONS_INFO_TEXT), _(EXTENSIONS_MARKED_TEXT)))
 
-			for i in sorted(__located_extensions__):
+			for i in sorted(get_located()):
 				if Extensions.is_marked(i):
-					extensions_xml += "<strong>" + i + "</strong>"
+					out.write("<strong>" + i + "</strong>")
 				else:
-					extensions_xml += i
-				extensions_xml += " "
+					out.write(i)
+				out.write(" ")
 
-			extensions_xml += "</p></div></div>"
-			print(extensions_xml)
+			out.writeln("</p></div></div>")
 
 	def output_text(self):
-		if __located_extensions__:
-			print("\n" + textwrap.fill("{0} {1}:".format(_(EXTENSIONS_INFO_TEXT), _(EXTENSIONS_MARKED_TEXT)),
-			      width=terminal.get_size()[0]))
+		if get_located():
+			out = writer.get()
+			out.writeln("\n" + textwrap.fill("{0} {1}:".format(_(EXTENSIONS_INFO_TEXT), _(EXTENSIONS_MARKED_TEXT)),
+			            width=terminal.get_size()[0]))
 
-			for i in sorted(__located_extensions__):
+			for i in sorted(get_located()):
 				if Extensions.is_marked(i):
-					print("[" + terminal.__bold__ + i + terminal.__normal__ + "]", end=" ")
+					out.write("[" + terminal.bold(i) + "] ")
 				else:
-					print (i, end=" ")
-			print("")
+					out.write(i + " ")
+			out.writeln()
 
 	def output_xml(self):
-		if __located_extensions__:
+		if get_located():
+			out = writer.get()
 			message_xml = "\t\t<message>" + _(EXTENSIONS_INFO_TEXT) + "</message>\n"
-			used_extensions_xml = ""
-			unused_extensions_xml = ""
+			used_extensions_xml = []
+			unused_extensions_xml = []
 
-			for i in sorted(__located_extensions__):
+			for i in sorted(get_located()):
 				if Extensions.is_marked(i):
-					used_extensions_xml += "\t\t\t<extension>" + i + "</extension>\n"
+					used_extensions_xml.append("\t\t\t<extension>" + i + "</extension>\n")
 				else:
-					unused_extensions_xml += "\t\t\t<extension>" + i + "</extension>\n"
+					unused_extensions_xml.append("\t\t\t<extension>" + i + "</extension>\n")
+
+			out.writeln("\t<extensions>\n" + message_xml + "\t\t<used>\n" + "".join(used_extensions_xml) + "\t\t</used>\n" +
+			            "\t\t<unused>\n" + "".join(unused_extensions_xml) + "\t\t</unused>\n" + "\t</extensions>")
+
+	def output_json(self):
+		if get_located():
+			records.begin("extensions")
+
+			for i in sorted(get_located()):
+				records.output({"extension": i, "used": Extensions.is_marked(i)})
 
-			print("\t<extensions>\n" + message_xml + "\t\t<used>\n" + used_extensions_xml + "\t\t</used>\n" +
-			      "\t\t<unused>\n" + unused_extensions_xml + "\t\t</unused>\n" + "\t</extensions>")
+			records.end()
@@ -21,13 +21,13 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from localization import N_
 from outputable import Outputable
+import gitcommand
 import re
-import subprocess
+import records
+import session
 import terminal
 import textwrap
-
-__filters__ = {"file": [set(), set()], "author": [set(), set()], "email": [set(), set()], "revision": [set(), set()],
-               "message" : [set(), None]}
+import writer
 
 class InvalidRegExpError(ValueError):
 	def __init__(self, msg):
@@ -35,14 +35,14 @@ class InvalidRegExpError(ValueError):
 		self.msg = msg
 
 def get():
-	return __filters__
+	return session.get().filters
 
 def __add_one__(string):
-	for i in __filters__:
+	for i in get():
 		if (i + ":").lower() == string[0:len(i) + 1].lower():
-			__filters__[i][0].add(string[len(i) + 1:])
+			get()[i][0].add(string[len(i) + 1:])
 			return
-	__filters__["file"][0].add(string)
+	get()["file"][0].add(string)
 
 def add(string):
 	rules = string.split(",")
@@ -50,24 +50,25 @@ def add(string):
 		__add_one__(rule)
 
 def clear():
-	for i in __filters__:
-		__filters__[i][0] = set()
+	for i in get():
+		get()[i][0] = set()
+
+def reset_filtered():
+	for i in get():
+		if get()[i][1] != None:
+			get()[i][1] = set()
 
 def get_filered(filter_type="file"):
-	return __filters__[filter_type][1]
+	return get()[filter_type][1]
 
 def has_filtered():
-	for i in __filters__:
-		if __filters__[i][1]:
+	for i in get():
+		if get()[i][1]:
 			return True
 	return False
 
 def __find_commit_message__(sha):
-	git_show_r = subprocess.Popen(filter(None, ["git", "show", "-s", "--pretty=%B", "-w", sha]), bufsize=1,
-	                              stdout=subprocess.PIPE).stdout
-
-	commit_message = git_show_r.read()
-	git_show_r.close()
+	commit_message = gitcommand.read(filter(None, ["show", "-s", "--pretty=%B", "-w", sha]))
 
 	commit_message = commit_message.strip().decode("unicode_escape", "ignore")
 	commit_message = commit_message.encode("latin-1", "replace")
@@ -77,7 +78,7 @@ def set_filtered(string, filter_type="file"):
 	string = string.strip()
 
 	if len(string) > 0:
-		for i in __filters__[filter_type][0]:
+		for i in get()[filter_type][0]:
 			search_for = string
 
 			if filter_type == "message":
@@ -87,7 +88,7 @@ def set_filtered(string, filter_type="file"):
 					if filter_type == "message":
 						__add_one__("revision:" + string)
 					else:
-						__filters__[filter_type][1].add(string)
+						get()[filter_type][1].add(string)
 					return True
 			except:
 				raise InvalidRegExpError(_("invalid regular expression specified"))
@@ -103,60 +104,68 @@ FILTERING_COMMIT_INFO_TEXT = N_("The following commit revisions were excluded fr
 class Filtering(Outputable):
 	@staticmethod
 	def __output_html_section__(info_string, filtered):
-		filtering_xml = ""
-
 		if filtered:
-			filtering_xml += "<p>" + info_string + "."+ "</p>"
+			out = writer.get()
+			out.write("<p>" + info_string + "."+ "</p>")
 
 			for i in filtered:
-				filtering_xml += "<p>" + i + "</p>"
-
-		return filtering_xml
+				out.write("<p>" + i + "</p>")
 
 	def output_html(self):
 		if has_filtered():
-			filtering_xml = "<div><div class=\"box\">"
-			Filtering.__output_html_section__(_(FILTERING_INFO_TEXT), __filters__["file"][1])
-			Filtering.__output_html_section__(_(FILTERING_AUTHOR_INFO_TEXT), __filters__["author"][1])
-			Filtering.__output_html_section__(_(FILTERING_EMAIL_INFO_TEXT), __filters__["email"][1])
-			Filtering.__output_html_section__(_(FILTERING_COMMIT_INFO_TEXT), __filters__["revision"][1])
-			filtering_xml += "</div></div>"
-
-			print(filtering_xml)
+			out = writer.get()
+			out.write("<div><div class=\"box\">")
+			Filtering.__output_html_section__(_(FILTERING_INFO_TEXT), get()["file"][1])
+			Filtering.__output_html_section__(_(FILTERING_AUTHOR_INFO_TEXT), get()["author"][1])
+			Filtering.__output_html_section__(_(FILTERING_EMAIL_INFO_TEXT), get()["email"][1])
+			Filtering.__output_html_section__(_(FILTERING_COMMIT_INFO_TEXT), get()["revision"][1])
+			out.writeln("</div></div>")
 
 	@staticmethod
 	def __output_text_section__(info_string, filtered):
 		if filtered:
-			print("\n" + textwrap.fill(info_string + ":", width=terminal.get_size()[0]))
+			out = writer.get()
+			out.writeln("\n" + textwrap.fill(info_string + ":", width=terminal.get_size()[0]))
 
 			for i in filtered:
 				(width, _unused) = terminal.get_size()
-				print("...%s" % i[-width+3:] if len(i) > width else i)
+				out.writeln("...%s" % i[-width+3:] if len(i) > width else i)
 
 	def output_text(self):
-		Filtering.__output_text_section__(_(FILTERING_INFO_TEXT), __filters__["file"][1])
-		Filtering.__output_text_section__(_(FILTERING_AUTHOR_INFO_TEXT), __filters__["author"][1])
-		Filtering.__output_text_section__(_(FILTERING_EMAIL_INFO_TEXT), __filters__["email"][1])
-		Filtering.__output_text_section__(_(FILTERING_COMMIT_INFO_TEXT), __filters__["revision"][1])
+		Filtering.__output_text_section__(_(FILTERING_INFO_TEXT), get()["file"][1])
+		Filtering.__output_text_section__(_(FILTERING_AUTHOR_INFO_TEXT), get()["author"][1])
+		Filtering.__output_text_section__(_(FILTERING_EMAIL_INFO_TEXT), get()["email"][1])
+		Filtering.__output_text_section__(_(FILTERING_COMMIT_INFO_TEXT), get()["revision"][1])
 
 	@staticmethod
 	def __output_xml_section__(info_string, filtered, container_tagname):
 		if filtered:
-			message_xml = "\t\t\t<message>" +info_string + "</message>\n"
-			filtering_xml = ""
+			out = writer.get()
+			out.writeln("\t\t<{0}>".format(container_tagname))
+			out.write("\t\t\t<message>" +info_string + "</message>\n\t\t\t<entries>\n")
 
 			for i in filtered:
-				filtering_xml += "\t\t\t\t<entry>".format(container_tagname) + i + "</entry>\n".format(container_tagname)
+				out.write("\t\t\t\t<entry>" + i + "</entry>\n")
 
-			print("\t\t<{0}>".format(container_tagname))
-			print(message_xml + "\t\t\t<entries>\n" + filtering_xml + "\t\t\t</entries>\n")
-			print("\t\t</{0}>".format(container_tagname))
+			out.writeln("\t\t\t</entries>\n")
+			out.writeln("\t\t</{0}>".format(container_tagname))
 
 	def output_xml(self):
 		if has_filtered():
-			print("\t<filtering>")
-			Filtering.__output_xml_section__(_(FILTERING_INFO_TEXT), __filters__["file"][1], "files")
-			Filtering.__output_xml_section__(_(FILTERING_AUTHOR_INFO_TEXT), __filters__["author"][1], "authors")
-			Filtering.__output_xml_section__(_(FILTERING_EMAIL_INFO_TEXT), __filters__["email"][1], "emails")
-			Filtering.__output_xml_section__(_(FILTERING_COMMIT_INFO_TEXT), __filters__["revision"][1], "revision")
-			print("\t</filtering>")
+			out = writer.get()
+			out.writeln("\t<filtering>")
+			Filtering.__output_xml_section__(_(FILTERING_INFO_TEXT), get()["file"][1], "files")
+			Filtering.__output_xml_section__(_(FILTERING_AUTHOR_INFO_TEXT), get()["author"][1], "authors")
+			Filtering.__output_xml_section__(_(FILTERING_EMAIL_INFO_TEXT), get()["email"][1], "emails")
+			Filtering.__output_xml_section__(_(FILTERING_COMMIT_INFO_TEXT), get()["revision"][1], "revision")
+			out.writeln("\t</filtering>")
+
+	def output_json(self):
+		if has_filtered():
+			records.begin("filtering")
+
+			for filter_type in ["file", "author", "email", "revision"]:
+				for i in sorted(get()[filter_type][1]):
+					records.output({"type": filter_type, "entry": i})
+
+			records.end()
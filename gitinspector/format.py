@@ -20,20 +20,18 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 import localization
-import version
-import base64
 import basedir
 import os
+import records
+import session
 import terminal
 import textwrap
 import time
-import zipfile
+import writer
 
-__available_formats__ = ["html", "htmlembedded", "text", "xml"]
+__available_formats__ = ["html", "htmlembedded", "htmllite", "json", "ndjson", "text", "xml"]
 
-DEFAULT_FORMAT = __available_formats__[2]
-
-__selected_format__ = DEFAULT_FORMAT
+DEFAULT_FORMAT = __available_formats__[5]
 
 class InvalidFormatError(Exception):
 	def __init__(self, msg):
@@ -41,30 +39,59 @@ class InvalidFormatError(Exception):
 		self.msg = msg
 
 def select(format):
-	global __selected_format__
-	__selected_format__ = format
+	session.get().selected_format = format
 
 	return format in __available_formats__
 
 def get_selected():
-	return __selected_format__
+	return session.get().selected_format if session.get().selected_format else DEFAULT_FORMAT
+
+# Parses a comma separated list of FORMAT:FILE pairs, as given to --output. A format without a file name is written to
+# the standard output.
+
+def parse_targets(spec):
+	targets = []
+
+	for i in spec.split(","):
+		(target_format, _unused, file_name) = i.strip().partition(":")
+
+		if not target_format in __available_formats__:
+			raise InvalidFormatError(_("specified output format not supported."))
+
+		targets.append((target_format, file_name if file_name else None))
+
+	return targets
+
+def __get_repository_name__():
+	return os.path.basename(session.get().directory if session.get().directory else basedir.get_basedir_git())
 
 def is_interactive_format():
-	return __selected_format__ == "text"
+	return get_selected() == "text"
 
 def __output_html_template__(name):
 	template_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), name)
 	file_r = open(template_path, "rb")
 	return file_r.read().decode("utf-8", "replace")
 
+# The modules needed to embed the HTML assets are only imported when an HTML report is written.
+
 def __get_zip_file_content__(name, file_name="/html/flot.zip"):
+	import zipfile
 	zip_file = zipfile.ZipFile(basedir.get_basedir() + file_name, "r")
 	content = zip_file.read(name)
 	zip_file.close()
 	return content.decode("utf-8", "replace")
 
+# The version is only stated by the headers of the formats other than text.
+
+def __get_version__():
+	import version
+	return version.__version__
+
 def output_header():
-	if __selected_format__ == "html" or __selected_format__ == "htmlembedded":
+	out = writer.get()
+
+	if get_selected() == "html" or get_selected() == "htmlembedded":
 		base = basedir.get_basedir()
 		html_header = __output_html_template__(base + "/html/html.header")
 		tablesorter_js = __get_zip_file_content__("jquery.tablesorter.min.js",
@@ -77,43 +104,70 @@ def output_header():
 		logo_file = open(base + "/html/gitinspector_piclet.png", "rb")
 		logo = logo_file.read()
 		logo_file.close()
+		import base64
 		logo = base64.b64encode(logo)
 
-		if __selected_format__ == "htmlembedded":
+		if get_selected() == "htmlembedded":
 			jquery_js = ">" + __get_zip_file_content__("jquery.js")
 		else:
 			jquery_js = " src=\"https://ajax.googleapis.com/ajax/libs/jquery/1.8.3/jquery.min.js\">"
 
-		print(html_header.format(title = _("Repository statistics for {0}").format(os.path.basename(basedir.get_basedir_git())),
-		                         jquery = jquery_js,
-		                         jquery_tablesorter = tablesorter_js,
-		                         jquery_flot = flot_js,
-		                         jquery_flot_pie = pie_js,
-		                         jquery_flot_resize = resize_js,
-		                         logo = logo.decode("utf-8", "replace"),
-		                         logo_text = _("The output has been generated by {0} {1}. The statistical analysis tool"
-		                                       " for git repositories.").format(
-					               "<a href=\"https://github.com/ejwa/gitinspector\">gitinspector</a>",
-		                                       version.__version__),
-		                         repo_text = _("Statistical information for the repository '{0}' was gathered on {1}.").format(
-		                                       os.path.basename(basedir. get_basedir_git()), localization.get_date()),
-		                         show_minor_authors = _("Show minor authors"),
-		                         hide_minor_authors = _("Hide minor authors"),
-		                         show_minor_rows = _("Show rows with minor work"),
-		                         hide_minor_rows = _("Hide rows with minor work")))
-	elif __selected_format__ == "xml":
-		print("<gitinspector>")
-		print("\t<version>" + version.__version__ + "</version>")
-		print("\t<repository>" + os.path.basename(basedir. get_basedir_git()) + "</repository>")
-		print("\t<report-date>" + time.strftime("%Y/%m/%d") + "</report-date>")
+		out.writeln(html_header.format(title = _("Repository statistics for {0}").format(__get_repository_name__()),
+		                               jquery = jquery_js,
+		                               jquery_tablesorter = tablesorter_js,
+		                               jquery_flot = flot_js,
+		                               jquery_flot_pie = pie_js,
+		                               jquery_flot_resize = resize_js,
+		                               logo = logo.decode("utf-8", "replace"),
+		                               logo_text = _("The output has been generated by {0} {1}. The statistical analysis tool"
+		                                             " for git repositories.").format(
+					                     "<a href=\"https://github.com/ejwa/gitinspector\">gitinspector</a>",
+		                                             __get_version__()),
+		                               repo_text = _("Statistical information for the repository '{0}' was gathered on {1}.").format(
+		                                             __get_repository_name__(), localization.get_date()),
+		                               show_minor_authors = _("Show minor authors"),
+		                               hide_minor_authors = _("Hide minor authors"),
+		                               show_minor_rows = _("Show rows with minor work"),
+		                               hide_minor_rows = _("Hide rows with minor work")))
+	elif get_selected() == "xml":
+		out.writeln("<gitinspector>")
+		out.writeln("\t<version>" + __get_version__() + "</version>")
+		out.writeln("\t<repository>" + __get_repository_name__() + "</repository>")
+		out.writeln("\t<report-date>" + time.strftime("%Y/%m/%d") + "</report-date>")
+	elif records.is_record_format():
+		header = {"version": __get_version__(), "repository": __get_repository_name__(),
+		          "report_date": time.strftime("%Y-%m-%d")}
+
+		if get_selected() == "htmllite":
+			htmllite_header = __output_html_template__(basedir.get_basedir() + "/html/htmllite.header")
+			out.write(htmllite_header.format(title = _("Repository statistics for {0}").format(header["repository"]),
+			                                 repo_text = _("Statistical information for the repository '{0}' was gathered "
+			                                               "on {1}.").format(header["repository"], localization.get_date())))
+
+		if records.is_document_format():
+			out.write("{\n\t" + ",\n\t".join(records.dumps(i) + ": " + records.dumps(header[i]) for i in sorted(header)))
+		else:
+			header["section"] = "gitinspector"
+			out.writeln(records.dumps(header))
 	else:
-		print(textwrap.fill(_("Statistical information for the repository '{0}' was gathered on {1}.").format(
-		      os.path.basename(basedir.get_basedir_git()), localization.get_date()), width=terminal.get_size()[0]))
+		out.writeln(textwrap.fill(_("Statistical information for the repository '{0}' was gathered on {1}.").format(
+		            __get_repository_name__(), localization.get_date()), width=terminal.get_size()[0]))
+
+	out.flush()
 
 def output_footer():
-	if __selected_format__ == "html" or __selected_format__ == "htmlembedded":
+	out = writer.get()
+
+	if get_selected() == "html" or get_selected() == "htmlembedded":
 		base = basedir.get_basedir()
 		html_footer = __output_html_template__(base + "/html/html.footer")
-		print(html_footer)
-	elif __selected_format__ == "xml":
-		print("</gitinspector>")
+		out.writeln(html_footer)
+	elif get_selected() == "xml":
+		out.writeln("</gitinspector>")
+	elif get_selected() == "htmllite":
+		out.write("\n}")
+		out.write(__output_html_template__(basedir.get_basedir() + "/html/htmllite.footer"))
+	elif get_selected() == "json":
+		out.writeln("\n}")
+
+	out.flush()
@@ -0,0 +1,232 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+import io
+import json
+import os
+import session
+import stats
+import subprocess
+import sys
+import threading
+import time
+import tracing
+
+# Every git command run by gitinspector goes through this module, which accounts the processes spawned and the output
+# read from them to the stage that started them (and traces them). Commands run in the directory of the current analysis
+# session, unless another one is given.
+#
+# The commands can also be recorded to a transcript, along with their output, exit status and timing, and replayed from
+# it later on without running git at all.
+
+__recorder__ = None
+__replayer__ = None
+
+# A transcript is a file of JSON lines, one per git command. Each line is written in a single system call to a file
+# opened for appending, so that the worker processes of batch mode can share the transcript of their parent.
+
+class Recorder(object):
+	def __init__(self, file_name):
+		self.handle = os.open(file_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+		self.start = time.time()
+
+	def add(self, args, cwd, returncode, start, end, output):
+		import base64
+		entry = {"args": args, "cwd": cwd, "returncode": returncode, "start": round(start - self.start, 6),
+		         "duration": round(end - start, 6), "stdout": base64.b64encode(output).decode("ascii")}
+		os.write(self.handle, (json.dumps(entry, sort_keys=True) + "\n").encode("utf-8"))
+
+class ReplayedProcess(object):
+	def __init__(self, returncode, output):
+		self.pid = None
+		self.returncode = returncode
+		self.stdin = io.BytesIO()
+		self.stdout = io.BytesIO(output)
+
+	def wait(self):
+		return self.returncode
+
+# Commands are looked up by their arguments and directory, or by their arguments alone when the repository was recorded
+# elsewhere. Each command (arguments and directory) has a single queue of recordings, whichever way it is looked up;
+# commands run more than once are replayed in the order they were recorded, the last recording repeating. Commands that
+# are not found in the transcript fail, and are counted so that the replay as a whole can fail too.
+
+class Replayer(object):
+	def __init__(self, file_name):
+		self.lock = threading.Lock()
+		self.queues = {}
+		self.queues_by_args = {}
+		self.missing_count = 0
+
+		with open(file_name, "rb") as transcript:
+			for line in transcript:
+				entry = json.loads(line.decode("utf-8"))
+				key = (tuple(entry["args"]), entry["cwd"])
+
+				if not key in self.queues:
+					self.queues[key] = []
+					self.queues_by_args.setdefault(key[0], []).append(self.queues[key])
+
+				self.queues[key].append(entry)
+
+	# A command looked up by its arguments alone is taken from the first directory with recordings left to replay.
+
+	def __get_queue__(self, args, cwd):
+		queue = self.queues.get((tuple(args), cwd), None)
+
+		if queue == None:
+			queues = self.queues_by_args.get(tuple(args), [])
+			queue = next((i for i in queues if len(i) > 1), queues[-1] if queues else None)
+
+		return queue
+
+	def get(self, args, cwd):
+		with self.lock:
+			queue = self.__get_queue__(args, cwd)
+
+			if not queue:
+				self.missing_count += 1
+				print(_("git command not found in the transcript") + ": git " + " ".join(args), file=sys.stderr)
+				return ReplayedProcess(128, b"")
+
+			import base64
+			entry = queue.pop(0) if len(queue) > 1 else queue[0]
+			return ReplayedProcess(entry["returncode"], base64.b64decode(entry["stdout"]))
+
+def record(file_name):
+	global __recorder__
+	__recorder__ = Recorder(file_name) if file_name else None
+
+def replay(file_name):
+	global __replayer__
+	__replayer__ = Replayer(file_name) if file_name else None
+
+def get_missing_count():
+	return __replayer__.missing_count if __replayer__ else 0
+
+# Commands found missing by other processes (the workers of batch mode) are added to those of this one.
+
+def add_missing_count(count):
+	if __replayer__:
+		with __replayer__.lock:
+			__replayer__.missing_count += count
+
+class GitProcess(object):
+	def __init__(self, args, cwd=None, stdin=None, stdout=subprocess.PIPE, quiet=False, bufsize=1):
+		self.args = args
+		self.cwd = cwd if cwd else session.get().directory
+		self.start = time.time()
+		self.output = [] if __recorder__ else None
+
+		if __replayer__:
+			self.process = __replayer__.get(args, self.cwd)
+		else:
+			stderr = open(os.devnull, "w") if quiet else None
+
+			try:
+				self.process = subprocess.Popen(["git"] + args, bufsize=bufsize, stdin=stdin, stdout=stdout, stderr=stderr,
+				                                cwd=self.cwd)
+			finally:
+				if stderr:
+					stderr.close()
+
+		self.stdin = self.process.stdin
+		self.stdout = self.process.stdout
+		self.stage = stats.get_stage()
+		self.bytes_read = 0
+		self.lines_read = 0
+
+	def __add_output__(self, chunks):
+		self.bytes_read += sum(len(i) for i in chunks)
+
+		if self.output != None:
+			self.output.extend(chunks)
+
+	def read(self, size=-1):
+		data = self.stdout.read(size) if size >= 0 else self.stdout.read()
+		self.__add_output__([data])
+		self.lines_read += data.count(b"\n")
+		return data
+
+	def readline(self):
+		line = self.stdout.readline()
+		self.__add_output__([line])
+		self.lines_read += 1 if line else 0
+		return line
+
+	def readlines(self):
+		lines = self.stdout.readlines()
+		self.__add_output__(lines)
+		self.lines_read += len(lines)
+		return lines
+
+	# When statistics are gathered, the process is waited for with wait4(), which also gives its resource usage.
+
+	def __wait__(self):
+		if stats.is_enabled() and hasattr(os, "wait4") and self.process.pid:
+			try:
+				(pid, status, rusage) = os.wait4(self.process.pid, 0)
+				self.process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+				return rusage
+			except OSError:
+				pass
+
+		self.process.wait()
+		return None
+
+	def close(self):
+		if self.stdin and not self.stdin.closed:
+			self.stdin.close()
+		if self.stdout:
+			self.stdout.close()
+
+		rusage = self.__wait__()
+
+		if stats.is_enabled():
+			stats.add_git_process(self.stage, self.bytes_read, self.lines_read, rusage)
+		if tracing.is_enabled():
+			tracing.add_span("git " + self.args[0], "git", self.start, time.time(),
+			                 {"command": " ".join(["git"] + self.args), "bytes_read": self.bytes_read,
+			                  "returncode": self.process.returncode})
+		if __recorder__:
+			__recorder__.add(self.args, self.cwd, self.process.returncode, self.start, time.time(), b"".join(self.output))
+
+		return self.process.returncode
+
+def read(args, cwd=None, quiet=False):
+	process = GitProcess(args, cwd=cwd, quiet=quiet)
+	output = process.read()
+	process.close()
+	return output
+
+def read_lines(args, cwd=None, quiet=False):
+	process = GitProcess(args, cwd=cwd, quiet=quiet)
+	lines = process.readlines()
+	process.close()
+	return lines
+
+# Like read(), but also returns the exit status of the command.
+
+def run(args, cwd=None, quiet=False):
+	process = GitProcess(args, cwd=cwd, quiet=quiet)
+	output = process.read()
+	return (process.close(), output)
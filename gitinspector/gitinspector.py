@@ -27,70 +27,297 @@ localization.init()
 import atexit
 import basedir
 import blame
+import cache
 import changes
 import clone
+import codecs
 import config
 import extensions
 import filtering
 import format
-import help
 import interval
 import getopt
-import metrics
+import gitcommand
 import os
 import optval
 import outputable
-import responsibilities
+import scheduler
+import session
+import stats
 import sys
 import terminal
-import timeline
-import version
+import tracing
+import writer
+
+# The modules behind optional sections (metrics, responsibilities and timeline) and modes of operation (batch, help,
+# server and version) are only imported when they are asked for, which keeps the start-up time of ordinary runs down.
+
+# A runner analyses a repository and renders reports of it. The state of the analysis is kept in an analysis session;
+# by default the session of the calling thread, to which the command line options are applied. Runners given sessions
+# of their own can be used side by side in the same process.
 
 class Runner:
-	def __init__(self):
+	def __init__(self, analysis_session=None):
+		self.session = analysis_session if analysis_session else session.get()
+		self.batch = None
+		self.granularity = None
 		self.hard = False
 		self.include_metrics = False
+		self.metrics_trend = None
 		self.list_file_types = False
 		self.localize_output = False
+		self.manifest = None
+		self.options = []
+		self.outputs = None
 		self.repo = "."
 		self.responsibilities = False
+		self.serve = None
+		self.stats = None
+		self.trace = None
 		self.grading = False
 		self.timeline = False
 		self.useweeks = False
+		self.windows = None
 
-	def output(self):
-		if not self.localize_output:
-			localization.disable()
+	# History parsing, blame fetching and metrics are independent of each other and run concurrently; blamed rows are
+	# attributed to their authors once the history has been parsed. When an interval is given, the revision to blame is
+	# the last commit found in the history, so blame fetching has to wait for it. Likewise, when time windows are given,
+	# the revision to blame is the last commit of the last window. The metrics are computed for the same revision.
+
+	def __schedule__(self):
+		stages = scheduler.Scheduler()
+		stages.add("changes", lambda: changes.get(self.hard))
+		revision_stages = ["changes"] if interval.has_interval() else []
+
+		if self.windows:
+			import windows
+			stages.add("windows", lambda: windows.get(self.windows, changes.get(self.hard)), ["changes"])
+			revision_stages = ["windows"]
+
+		stages.add("blame", lambda: blame.fetch(self.hard), revision_stages)
+
+		stages.add("attribution", lambda: blame.get(self.hard, self.useweeks, self.__get_blamed_changes__(stages)),
+		           ["changes", "blame"])
+
+		if self.include_metrics or self.metrics_trend:
+			import metrics
+
+		if self.include_metrics:
+			stages.add("metrics", metrics.MetricsLogic, revision_stages)
+
+		if self.metrics_trend:
+			# Runs after the metrics (if any) so that it benefits from the blob metrics they stored in the cache.
+			stages.add("metrics_trend", lambda: metrics.MetricsTrend(self.metrics_trend),
+			           ["metrics"] if self.include_metrics else [])
+
+		return stages
+
+	# The age and stability of rows blamed at the end of the last time window are relative to the changes made until then.
 
-		terminal.skip_escapes(not sys.stdout.isatty())
-		terminal.set_stdout_encoding()
-		previous_directory = os.getcwd()
+	def __get_blamed_changes__(self, stages):
+		if self.windows:
+			import windows
+			return changes.get(self.hard).get_window(None, windows.get_until(stages.get("windows")))
 
-		os.chdir(self.repo)
-		absolute_path = basedir.get_basedir_git()
-		os.chdir(absolute_path)
-		format.output_header()
-		outputable.output(changes.ChangesOutput(self.hard))
+		return changes.get(self.hard)
+
+	def __get_outputables__(self, stages):
+		yield changes.ChangesOutput(self.hard)
 
 		if changes.get(self.hard).get_commits():
-			outputable.output(blame.BlameOutput(changes.get(self.hard), self.hard, self.useweeks))
+			revision = None
+
+			if self.windows:
+				import windows
+				yield windows.WindowsOutput(stages.get("windows"))
+				revision = windows.get_revision()
+
+			yield blame.BlameOutput(self.__get_blamed_changes__(stages), self.hard, self.useweeks, revision)
 
 			if self.timeline:
-				outputable.output(timeline.Timeline(changes.get(self.hard), self.useweeks))
+				import timeline
+				yield timeline.Timeline(changes.get(self.hard), self.useweeks, self.granularity)
 
 			if self.include_metrics:
-				outputable.output(metrics.Metrics())
+				import metrics
+				yield metrics.Metrics(stages.get("metrics"))
+
+			if self.metrics_trend:
+				import metrics
+				yield metrics.MetricsTrendOutput(self.metrics_trend, stages.get("metrics_trend"))
 
 			if self.responsibilities:
-				outputable.output(responsibilities.ResponsibilitiesOutput(self.hard, self.useweeks))
+				import responsibilities
+				yield responsibilities.ResponsibilitiesOutput(self.hard, self.useweeks, revision)
 
-			outputable.output(filtering.Filtering())
+			yield filtering.Filtering()
 
 			if self.list_file_types:
-				outputable.output(extensions.Extensions())
+				yield extensions.Extensions()
+
+	def analyse(self):
+		with self.session:
+			stages = self.__schedule__()
+			stages.wait()
+
+			return list(self.__get_outputables__(stages))
+
+	def render(self, outputables, target_format, stream=None):
+		with self.session:
+			with stats.stage("render"):
+				terminal.skip_escapes(stream != None or not sys.stdout.isatty())
+				format.select(target_format)
+				writer.set_stream(stream)
+				format.output_header()
+
+				for i in outputables:
+					with tracing.span(i.__class__.__name__, "render", {"format": target_format}):
+						outputable.output(i)
+
+				format.output_footer()
+				writer.set_stream(None)
+
+	# Returns a runner of another repository, with a session of its own. The repository is cloned (when given as a URL)
+	# and its configuration read, which the command line options given to this runner then override.
+
+	def create_runner(self, repo):
+		runner = Runner(session.AnalysisSession())
+		runner.options = self.options
 
-		format.output_footer()
-		os.chdir(previous_directory)
+		with runner.session:
+			try:
+				runner.repo = clone.create(repo)
+				config.init(runner)
+				__apply_options__(runner, self.options)
+			except (Exception, SystemExit):
+				clone.delete()
+				raise
+
+		return runner
+
+	def prepare(self):
+		with stats.stage("prepare"):
+			if not self.localize_output:
+				localization.disable()
+
+			terminal.set_stdout_encoding()
+			repository = basedir.get_repository_info(self.repo)
+			self.session.directory = repository[1]
+			self.session.head = repository[2]
+
+	def output(self):
+		self.prepare()
+
+		# The statistics are gathered once; every report is then rendered from the very same outputables.
+		with self.session:
+			targets = self.outputs if self.outputs else [(format.get_selected(), None)]
+			outputables = self.analyse()
+
+			for (target_format, file_name) in targets:
+				stream = codecs.open(file_name, "w", "utf-8") if file_name else None
+				self.render(outputables, target_format, stream)
+
+				if stream:
+					stream.close()
+
+# The options given on the command line are applied to a runner and to the session it analyses in. They are applied
+# after the configuration of the repository has been read, which they thereby override.
+
+def __apply_options__(run, opts):
+	clear_x_on_next_pass = True
+
+	for o, a in opts:
+		if o in("-h", "--help"):
+			import help
+			help.output()
+			sys.exit(0)
+		elif o == "--batch":
+			run.batch = a
+		elif o == "--cache":
+			cache.set_enabled(optval.get_boolean_argument(a))
+		elif o in("-f", "--file-types"):
+			extensions.define(a)
+		elif o in("-F", "--format"):
+			if not format.select(a):
+				raise format.InvalidFormatError(_("specified output format not supported."))
+		elif o == "--granularity":
+			import timeline
+			if not a in timeline.GRANULARITIES:
+				raise optval.InvalidOptionArgument(_("specified timeline granularity not supported."))
+			run.granularity = a
+		elif o == "-H":
+			run.hard = True
+		elif o == "--hard":
+			run.hard = optval.get_boolean_argument(a)
+		elif o in("-j", "--jobs"):
+			import metrics
+			metrics.set_num_workers(optval.get_positive_integer_argument(a))
+		elif o == "-l":
+			run.list_file_types = True
+		elif o == "--list-file-types":
+			run.list_file_types = optval.get_boolean_argument(a)
+		elif o == "-L":
+			run.localize_output = True
+		elif o == "--localize-output":
+			run.localize_output = optval.get_boolean_argument(a)
+		elif o == "--manifest":
+			run.manifest = a
+		elif o == "-m":
+			run.include_metrics = True
+		elif o == "--metrics":
+			run.include_metrics = optval.get_boolean_argument(a)
+		elif o == "--metrics-trend":
+			run.metrics_trend = a
+		elif o == "--output":
+			run.outputs = format.parse_targets(a)
+		elif o == "-r":
+			run.responsibilities = True
+		elif o == "--responsibilities":
+			run.responsibilities = optval.get_boolean_argument(a)
+		elif o == "--serve":
+			import server
+			server.parse_address(a)
+			run.serve = a
+		elif o == "--since":
+			interval.set_since(a)
+		elif o == "--stats":
+			stats.set_enabled(True)
+			run.stats = a
+		elif o == "--version":
+			import version
+			version.output()
+			sys.exit(0)
+		elif o == "--grading":
+			grading = optval.get_boolean_argument(a)
+			run.include_metrics = grading
+			run.list_file_types = grading
+			run.responsibilities = grading
+			run.grading = grading
+			run.hard = grading
+			run.timeline = grading
+			run.useweeks = grading
+		elif o == "-T":
+			run.timeline = True
+		elif o == "--timeline":
+			run.timeline = optval.get_boolean_argument(a)
+		elif o == "--trace":
+			tracing.set_enabled(True)
+			run.trace = a
+		elif o == "--until":
+			interval.set_until(a)
+		elif o == "-w":
+			run.useweeks = True
+		elif o == "--weeks":
+			run.useweeks = optval.get_boolean_argument(a)
+		elif o == "--windows":
+			import windows
+			windows.parse(a)
+			run.windows = a
+		elif o in("-x", "--exclude"):
+			if clear_x_on_next_pass:
+				clear_x_on_next_pass = False
+				filtering.clear()
+			filtering.add(a)
 
 def __check_python_version__():
 	if sys.version_info < (2, 6):
@@ -104,82 +331,75 @@ def main():
 	__run__ = Runner()
 
 	try:
-		__opts__, __args__ = optval.gnu_getopt(argv[1:], "f:F:hHlLmrTwx:", ["exclude=", "file-types=", "format=",
-		                                                 "hard:true", "help", "list-file-types:true",
-		                                                 "localize-output:true", "metrics:true", "responsibilities:true",
-		                                                 "since=", "grading:true", "timeline:true", "until=", "version",
-		                                                 "weeks:true"])
+		__opts__, __args__ = optval.gnu_getopt(argv[1:], "f:F:hHj:lLmrTwx:", ["batch=", "cache:true", "clone=", "exclude=",
+		                                                 "file-types=", "format=", "granularity=", "hard:true", "help",
+		                                                 "jobs=", "list-file-types:true", "localize-output:true",
+		                                                 "manifest=", "metrics:true", "metrics-trend=", "mirror:true",
+		                                                 "output=", "record-transcript=", "replay-transcript=",
+		                                                 "responsibilities:true", "serve=", "since=", "stats:-",
+		                                                 "grading:true", "timeline:true", "trace=", "until=", "version",
+		                                                 "weeks:true", "windows="])
 		for arg in __args__:
 			__run__.repo = arg
 
-		#Try to clone the repo or return the same directory and bail out.
-		__run__.repo = clone.create(__run__.repo)
-
-		#We need the repo above to be set before we read the git config.
-		config.init(__run__)
-		clear_x_on_next_pass = True
-
+		#The git transcript and the way of cloning are set up first, since the repository is cloned and its configuration
+		#read below.
 		for o, a in __opts__:
-			if o in("-h", "--help"):
-				help.output()
-				sys.exit(0)
-			elif o in("-f", "--file-types"):
-				extensions.define(a)
-			elif o in("-F", "--format"):
-				if not format.select(a):
-					raise format.InvalidFormatError(_("specified output format not supported."))
-			elif o == "-H":
-				__run__.hard = True
-			elif o == "--hard":
-				__run__.hard = optval.get_boolean_argument(a)
-			elif o == "-l":
-				__run__.list_file_types = True
-			elif o == "--list-file-types":
-				__run__.list_file_types = optval.get_boolean_argument(a)
-			elif o == "-L":
-				__run__.localize_output = True
-			elif o == "--localize-output":
-				__run__.localize_output = optval.get_boolean_argument(a)
-			elif o == "-m":
-				__run__.include_metrics = True
-			elif o == "--metrics":
-				__run__.include_metrics = optval.get_boolean_argument(a)
-			elif o == "-r":
-				__run__.responsibilities = True
-			elif o == "--responsibilities":
-				__run__.responsibilities = optval.get_boolean_argument(a)
+			try:
+				if o == "--record-transcript":
+					gitcommand.record(a)
+				elif o == "--replay-transcript":
+					gitcommand.replay(a)
+			except (IOError, OSError, ValueError):
+				raise optval.InvalidOptionArgument(_("unable to use the specified git transcript."))
+
+			if o == "--clone":
+				if not a in clone.MODES:
+					raise optval.InvalidOptionArgument(_("specified clone mode not supported."))
+				clone.set_mode(a)
+			elif o == "--mirror":
+				clone.set_mirror(optval.get_boolean_argument(a))
 			elif o == "--since":
-				interval.set_since(a)
-			elif o == "--version":
-				version.output()
-				sys.exit(0)
-			elif o == "--grading":
-				grading = optval.get_boolean_argument(a)
-				__run__.include_metrics = grading
-				__run__.list_file_types = grading
-				__run__.responsibilities = grading
-				__run__.grading = grading
-				__run__.hard = grading
-				__run__.timeline = grading
-				__run__.useweeks = grading
-			elif o == "-T":
-				__run__.timeline = True
-			elif o == "--timeline":
-				__run__.timeline = optval.get_boolean_argument(a)
-			elif o == "--until":
-				interval.set_until(a)
-			elif o == "-w":
-				__run__.useweeks = True
-			elif o == "--weeks":
-				__run__.useweeks = optval.get_boolean_argument(a)
-			elif o in("-x", "--exclude"):
-				if clear_x_on_next_pass:
-					clear_x_on_next_pass = False
-					filtering.clear()
-				filtering.add(a)
+				clone.set_since(a)
+
+		if clone.is_shallow() and (not clone.get_since() or "--metrics-trend" in dict(__opts__)):
+			raise optval.InvalidOptionArgument(_("a shallow clone requires --since and cannot be used with --metrics-trend."))
+
+		#In batch mode, each repository is cloned and configured on its own, right before it is analysed.
+		if not dict(__opts__).get("--batch", None):
+			#Try to clone the repo or return the same directory and bail out.
+			__run__.repo = clone.create(__run__.repo)
+
+			#We need the repo above to be set before we read the git config.
+			config.init(__run__)
+
+		__run__.options = __opts__
+		__apply_options__(__run__, __opts__)
 
 		__check_python_version__()
-		__run__.output()
+
+		# The revisions of the metrics trend are checked up front; in batch mode, they are checked for each repository.
+		if __run__.metrics_trend and not __run__.batch:
+			import metrics
+			metrics.MetricsTrend.get_revisions(__run__.metrics_trend, __run__.repo)
+
+		if __run__.batch:
+			import batch
+			batch.run(__run__, __args__ + (batch.read_manifest(__run__.manifest) if __run__.manifest else []), __run__.batch)
+		elif __run__.serve:
+			import server
+			server.serve(__run__, __run__.serve)
+		else:
+			__run__.output()
+
+		if __run__.stats:
+			stats.output(__run__.stats)
+		if __run__.trace:
+			tracing.output(__run__.trace)
+
+		# A replay that had to make up the output of git commands does not reflect the recorded run.
+		if gitcommand.get_missing_count() > 0:
+			sys.exit(1)
 
 	except (filtering.InvalidRegExpError, format.InvalidFormatError, optval.InvalidOptionArgument, getopt.error) as exception:
 		print(sys.argv[0], "\b:", exception.msg, file=sys.stderr)
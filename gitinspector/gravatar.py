@@ -18,14 +18,17 @@
 # along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import unicode_literals
-try:
-	from urllib.parse import urlencode
-except:
-	from urllib import urlencode
 import format
 import hashlib
 
+# urllib is imported on first use, as it pulls in networking modules that most runs (using no gravatars) never need.
+
 def get_url(email, size=20):
+	try:
+		from urllib.parse import urlencode
+	except:
+		from urllib import urlencode
+
 	md5hash = hashlib.md5(email.encode("utf-8").lower().strip()).hexdigest()
 	base_url = "https://www.gravatar.com/avatar/" + md5hash
 	params = None
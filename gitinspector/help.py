@@ -30,6 +30,19 @@ given, information will be fetched from the last repository specified.
 
 Mandatory arguments to long options are mandatory for short options too.
 Boolean arguments can only be given to long options.
+      --batch=DIRECTORY          analyse every repository given (as well as
+                                   those listed in the file given to
+                                   --manifest) and write their reports to
+                                   DIRECTORY, followed by a summary; the number
+                                   of repositories analysed at the same time
+                                   is set with --jobs
+      --cache[=BOOL]             remember the metrics computed for each file
+                                   content between runs; enabled by default
+      --clone=MODE               how repositories given as URLs are cloned;
+                                   'full' (the default), 'partial' (file
+                                   contents are fetched when needed) or
+                                   'shallow' (only the history since the date
+                                   given to --since is fetched)
   -f, --file-types=EXTENSIONS    a comma separated list of file extensions to
                                    include when computing statistics. The
                                    default extensions used are:
@@ -44,24 +57,67 @@ Boolean arguments can only be given to long options.
                                    is formatted for grading of student
                                    projects; this is the same as supplying the
                                    options -HlmrTw
+      --granularity=PERIOD       the length of the periods shown in the
+                                   timeline; one of day, week, month, quarter
+                                   or year (defaults to month, or week if -w
+                                   is given)
   -H, --hard[=BOOL]              track rows and look for duplicates harder;
                                    this can be quite slow with big repositories
+  -j, --jobs=NUM                 the number of worker processes to use when
+                                   computing metrics (or when analysing
+                                   repositories in batch mode); defaults to
+                                   the number of available processors
   -l, --list-file-types[=BOOL]   list all the file extensions available in the
                                    current branch of the repository
   -L, --localize-output[=BOOL]   localize the generated output to the selected
                                    system language if a translation is
                                    available
+      --manifest=FILE            a file listing the repositories to analyse in
+                                   batch mode, one per line
   -m  --metrics[=BOOL]           include checks for certain metrics during the
                                    analysis of commits
+      --metrics-trend=REVISIONS  show how metrics evolve over a comma separated
+                                   list of revisions (such as release tags)
+                                   or, if a number N is given, over every N:th
+                                   commit in the history of the repository
+      --mirror[=BOOL]            keep a mirror of repositories given as URLs
+                                   in the cache, updating it on later runs
+                                   instead of cloning them again
+      --output=TARGETS           write reports in several formats from a
+                                   single analysis; TARGETS is a comma
+                                   separated list of FORMAT:FILE pairs, such
+                                   as html:report.html,xml:report.xml
+      --record-transcript=FILE   record every git command run, along with its
+                                   output, exit status and timing, to FILE
+      --replay-transcript=FILE   replay the git commands recorded in FILE
+                                   instead of running git
   -r  --responsibilities[=BOOL]  show which files the different authors seem
                                    most responsible for
+      --serve=ADDRESS            keep the analysis in memory and serve reports
+                                   and queries over HTTP at ADDRESS, given as
+                                   [HOST:]PORT or unix:PATH; the analysis is
+                                   refreshed whenever HEAD moves
       --since=DATE               only show statistics for commits more recent
                                    than a specific date
+      --stats[=FILE]             write performance statistics of each stage of
+                                   the analysis as JSON to FILE (or to standard
+                                   error)
   -T, --timeline[=BOOL]          show commit timeline, including author names
+      --trace=FILE               record a trace of the git processes, stages,
+                                   workers, parsing, lock waits and rendering
+                                   in the Chrome trace event format to FILE
       --until=DATE               only show statistics for commits older than a
                                    specific date
   -w, --weeks[=BOOL]             show all statistical information in weeks
                                    instead of in months
+      --windows=WINDOWS          also show the changes made within each of a
+                                   comma separated list of time windows, such
+                                   as 2015-01-01..2015-03-31 (either end can
+                                   be left out), or within each of the last
+                                   N periods of the timeline, given as
+                                   PERIOD:N (such as quarter:4); the history
+                                   is only analysed once, and rows are blamed
+                                   at the end of the last window
   -x, --exclude=PATTERN          an exclusion pattern describing the file
                                    paths, revisions, revisions with certain
                                    commit messages, author names or author
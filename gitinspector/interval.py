@@ -18,38 +18,30 @@
 # along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import unicode_literals
+import session
 
 try:
 	from shlex import quote
 except ImportError:
 	from pipes import quote
 
-__since__ = ""
-
-__until__ = ""
-
-__ref__ = "HEAD"
-
 def has_interval():
-	return __since__ + __until__ != ""
+	return session.get().since + session.get().until != ""
 
 def get_since():
-	return __since__
+	return session.get().since
 
 def set_since(since):
-	global __since__
-	__since__ = "--since=" + quote(since)
+	session.get().since = "--since=" + quote(since)
 
 def get_until():
-	return __until__
+	return session.get().until
 
 def set_until(until):
-	global __until__
-	__until__ = "--until=" + quote(until)
+	session.get().until = "--until=" + quote(until)
 
 def get_ref():
-	return __ref__
+	return session.get().ref
 
 def set_ref(ref):
-	global __ref__
-	__ref__ = ref
+	session.get().ref = ref
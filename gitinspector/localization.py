@@ -25,26 +25,44 @@ try:
 except:
 	import gitinspector.basedir as basedir
 
-import gettext
-import locale
 import os
 import sys
 import time
 
+try:
+	import __builtin__ as builtins
+except ImportError:
+	import builtins
+
 __enabled__ = False
+__initialized__ = False
 __installed__ = False
+__translated__ = False
 __translation__ = None
 
 #Dummy function used to handle string constants
 def N_(message):
 	return message
 
-def init():
-	global __enabled__
+# Setting the locale and loading the message catalog is deferred until a message is first translated (or a date first
+# formatted). Most runs disable localization of the output before that happens, in which case neither is ever done.
+
+def __untranslated__(message):
+	return message
+
+def __translate__(message):
+	__load__()
+	return builtins._(message)
+
+def __load__():
 	global __installed__
+	global __translated__
 	global __translation__
 
 	if not __installed__:
+		import gettext
+		import locale
+
 		try:
 			locale.setlocale(locale.LC_ALL, "")
 		except locale.Error:
@@ -70,12 +88,28 @@ def init():
 				print("WARNING: Localization disabled because the system language could not be determined.", file=sys.stderr)
 				__translation__ = gettext.NullTranslations()
 
-		__enabled__ = True
 		__installed__ = True
-		__translation__.install(True)
+		__translated__ = isinstance(__translation__, gettext.GNUTranslations)
+
+		if __enabled__:
+			__translation__.install(True)
+		else:
+			builtins._ = __untranslated__
+
+def init():
+	global __enabled__
+	global __initialized__
+
+	if not __initialized__:
+		__enabled__ = True
+		__initialized__ = True
+		builtins._ = __translate__
 
 def get_date():
-	if __enabled__ and isinstance(__translation__, gettext.GNUTranslations):
+	if __enabled__:
+		__load__()
+
+	if __enabled__ and __translated__:
 		date = time.strftime("%x")
 
 		if hasattr(date, 'decode'):
@@ -86,7 +120,9 @@ def get_date():
 		return time.strftime("%Y/%m/%d")
 
 def enable():
-	if isinstance(__translation__, gettext.GNUTranslations):
+	__load__()
+
+	if __translated__:
 		__translation__.install(True)
 
 		global __enabled__
@@ -95,6 +131,4 @@ def enable():
 def disable():
 	global __enabled__
 	__enabled__ = False
-
-	if __installed__:
-		gettext.NullTranslations().install(True)
+	builtins._ = __untranslated__
@@ -22,11 +22,26 @@ from __future__ import unicode_literals
 from localization import N_
 from outputable import Outputable
 from changes import FileDiff
+from xml.sax.saxutils import escape
+import cache
 import comment
 import filtering
+import gitcommand
 import interval
+import io
+import multiprocessing
+import optval
+import os
 import re
+import records
+import session
+import stats
 import subprocess
+import terminal
+import textwrap
+import time
+import tracing
+import writer
 
 __metric_eloc__ = {"java": 500, "c": 500, "cpp": 500, "cs": 500, "h": 300, "hpp": 300, "php": 500, "py": 500, "glsl": 1000,
                    "rb": 500, "js": 500, "sql": 1000, "xml": 1000}
@@ -40,82 +55,234 @@ __metric_cc_tokens__ = [[["java", "js", "c", "cc", "cpp"], ["else", "for\s+\(.*\
                        [["py"], ["^\s+elif .*:$", "^\s+else:$", "^\s+for .*:", "^\s+if .*:$", "^\s+while .*:$"],
                                 ["^\s+assert", "break", "continue", "return"]]]
 
+# Every entry and exit token of a language is merged into a single pattern made up of optional lookaheads. Matching it at
+# the start of a line tells, in one call, which of the tokens occur anywhere in that line (the group of a token is set
+# if, and only if, re.search() of that token alone would have found it).
+
+__cc_tokens_by_extension__ = {}
+
+def __compile_cc_tokens__(entry_tokens, exit_tokens):
+	tokens = entry_tokens + exit_tokens
+	pattern = "".join("(?=(?:.*?({0}))?)".format(i) for i in tokens)
+	weights = [2] * len(entry_tokens) + [1] * len(exit_tokens)
+	return (re.compile(pattern, re.DOTALL), weights)
+
+def __get_cc_tokens__(extension):
+	try:
+		return __cc_tokens_by_extension__[extension]
+	except KeyError:
+		cc_tokens = None
+
+		for i in __metric_cc_tokens__:
+			if extension in i[0]:
+				cc_tokens = __compile_cc_tokens__(i[1], i[2])
+
+		__cc_tokens_by_extension__[extension] = cc_tokens
+		return cc_tokens
+
+def __get_cc_weight__(cc_tokens, string):
+	weight = 0
+
+	for i, group in enumerate(cc_tokens[0].match(string).groups()):
+		if group != None:
+			weight += cc_tokens[1][i]
+
+	return weight
+
 METRIC_CYCLOMATIC_COMPLEXITY_THRESHOLD = 50
 METRIC_CYCLOMATIC_COMPLEXITY_DENSITY_THRESHOLD = 0.75
 
+BLOBS_PER_TASK = 16
+
+# Must be increased whenever a change is made that affects the computed values, as it invalidates all cached metrics.
+METRICS_VERSION = 1
+
+__num_workers__ = multiprocessing.cpu_count()
+
+def get_num_workers():
+	return __num_workers__
+
+def set_num_workers(num_workers):
+	global __num_workers__
+	__num_workers__ = max(1, num_workers)
+
+# The blobs are read lazily, possibly by another thread than the one of the session; hence the explicit directory. The
+# git process is closed once the generator is, even if its consumer stops early or fails.
+
+def __read_blobs__(shas, directory):
+	if not shas:
+		return
+
+	cat_file = gitcommand.GitProcess(["cat-file", "--batch"], cwd=directory, stdin=subprocess.PIPE, bufsize=-1)
+
+	try:
+		for sha in shas:
+			cat_file.stdin.write(sha.encode("utf-8") + b"\n")
+			cat_file.stdin.flush()
+			header = cat_file.readline().split()
+			content = b""
+
+			if len(header) == 3:
+				content = cat_file.read(int(header[2]))
+				cat_file.read(1)
+
+			yield content
+	finally:
+		cat_file.close()
+
+def __compute_metrics__(blob):
+	(extension, content) = blob
+	return MetricsLogic.get_eloc_and_cyclomatic_complexity(io.BytesIO(content).readlines(), extension)
+
+# The metrics of a blob only depend on its content and extension. They are therefore computed once per (blob, extension)
+# pair, no matter how many paths that share the same content, and remembered between runs in the metrics cache.
+
+def __get_cache_key__(blob):
+	return "{0}:{1}:{2}".format(blob[0], blob[1], METRICS_VERSION)
+
+def get_blob_metrics(blobs):
+	if not blobs:
+		return {}
+
+	metrics_cache = cache.BlobCache("metrics") if cache.is_enabled() else None
+	results = {}
+	missing = []
+
+	for i in sorted(blobs):
+		value = metrics_cache.get(__get_cache_key__(i)) if metrics_cache else None
+
+		if value:
+			results[i] = tuple(value)
+		else:
+			missing.append(i)
+
+	contents = __read_blobs__([i[0] for i in missing], session.get().directory)
+
+	try:
+		computed = __map_blobs__(__compute_metrics__, ((i[1], next(contents)) for i in missing), len(missing))
+	finally:
+		contents.close()
+
+	for i, value in zip(missing, computed):
+		results[i] = value
+
+		if metrics_cache:
+			metrics_cache.put(__get_cache_key__(i), list(value))
+
+	if metrics_cache:
+		metrics_cache.save()
+
+	return results
+
+def __call_timed__(call):
+	start = time.time()
+	result = call[0](call[1])
+	return ((os.getpid(), start, time.time()), result)
+
+# Results are returned in the same order as the blobs were given, no matter how many workers that were used; which keeps
+# the computed metrics deterministic. When statistics are gathered (or tracing is enabled), the workers also report when
+# they were busy.
+
+def __map_blobs__(function, blobs, length):
+	if __num_workers__ <= 1 or length <= 1:
+		with stats.worker(stats.get_stage(), 1):
+			return [function(i) for i in blobs]
+
+	workers = min(__num_workers__, length)
+	pool = multiprocessing.Pool(workers)
+
+	try:
+		if not stats.is_enabled() and not tracing.is_enabled():
+			return list(pool.imap(function, blobs, BLOBS_PER_TASK))
+
+		results = list(pool.imap(__call_timed__, ((function, i) for i in blobs), BLOBS_PER_TASK))
+
+		if stats.is_enabled():
+			stats.add_worker_time(stats.get_stage(), workers, sum(i[0][2] - i[0][1] for i in results))
+		for ((pid, start, end), result) in results:
+			tracing.add_span("metrics", "worker", start, end, pid=pid, thread_id=1)
+
+		return [i[1] for i in results]
+	finally:
+		pool.close()
+		pool.join()
+
 class MetricsLogic:
-	def __init__(self):
+	def __init__(self, ref=None, blob_metrics=None):
 		self.eloc = {}
 		self.cyclomatic_complexity = {}
 		self.cyclomatic_complexity_density = {}
+		self.files = 0
+		self.total_eloc = 0
+		self.total_cyclomatic_complexity = 0
 
-		ls_tree_r = subprocess.Popen(["git", "ls-tree", "--name-only", "-r", interval.get_ref()], bufsize=1,
-		                             stdout=subprocess.PIPE).stdout
+		if blob_metrics == None:
+			blob_metrics = {}
 
-		for i in ls_tree_r.readlines():
-			i = i.strip().decode("unicode_escape", "ignore")
-			i = i.encode("latin-1", "replace")
-			i = i.decode("utf-8", "replace").strip("\"").strip("'").strip()
+		files = MetricsLogic.get_files(ref if ref else interval.get_ref())
+		blobs = set((i[1], i[2]) for i in files)
+		blob_metrics.update(get_blob_metrics(blobs.difference(blob_metrics)))
 
-			if FileDiff.is_valid_extension(i) and not filtering.set_filtered(FileDiff.get_filename(i)):
-				file_r = subprocess.Popen(["git", "show", interval.get_ref() + ":{0}".format(i.strip())],
-				                          bufsize=1, stdout=subprocess.PIPE).stdout.readlines()
+		for i in files:
+			(lines, cycc) = blob_metrics[(i[1], i[2])]
+			self.add_file_metrics(i[0], i[2], lines, cycc)
 
-				extension = FileDiff.get_extension(i)
-				lines = MetricsLogic.get_eloc(file_r, extension)
-				cycc = MetricsLogic.get_cyclomatic_complexity(file_r, extension)
+	def add_file_metrics(self, filename, extension, lines, cycc):
+		self.files += 1
+		self.total_eloc += lines
+		self.total_cyclomatic_complexity += max(cycc, 0)
 
-				if __metric_eloc__.get(extension, None) != None and __metric_eloc__[extension] < lines:
-					self.eloc[i.strip()] = lines
+		if __metric_eloc__.get(extension, None) != None and __metric_eloc__[extension] < lines:
+			self.eloc[filename] = lines
 
-				if METRIC_CYCLOMATIC_COMPLEXITY_THRESHOLD < cycc:
-					self.cyclomatic_complexity[i.strip()] = cycc
+		if METRIC_CYCLOMATIC_COMPLEXITY_THRESHOLD < cycc:
+			self.cyclomatic_complexity[filename] = cycc
 
-				if lines > 0 and METRIC_CYCLOMATIC_COMPLEXITY_DENSITY_THRESHOLD < cycc / float(lines):
-					self.cyclomatic_complexity_density[i.strip()] = cycc / float(lines)
+		if lines > 0 and METRIC_CYCLOMATIC_COMPLEXITY_DENSITY_THRESHOLD < cycc / float(lines):
+			self.cyclomatic_complexity_density[filename] = cycc / float(lines)
 
 	@staticmethod
-	def get_cyclomatic_complexity(file_r, extension):
-		is_inside_comment = False
-		cc_counter = 0
+	def get_files(ref):
+		files = []
 
-		entry_tokens = None
-		exit_tokens = None
+		for i in gitcommand.read_lines(["ls-tree", "-r", ref]):
+			(info, i) = i.split(b"\t", 1)
+			info = info.decode("utf-8", "replace").split(" ")
 
-		for i in __metric_cc_tokens__:
-			if extension in i[0]:
-				entry_tokens = i[1]
-				exit_tokens = i[2]
-
-		if entry_tokens or exit_tokens:
-			for i in file_r:
-				i = i.decode("utf-8", "replace")
-				(_, is_inside_comment) = comment.handle_comment_block(is_inside_comment, extension, i)
+			i = i.strip().decode("unicode_escape", "ignore")
+			i = i.encode("latin-1", "replace")
+			i = i.decode("utf-8", "replace").strip("\"").strip("'").strip()
 
-				if not is_inside_comment and not comment.is_comment(extension, i):
-					for j in entry_tokens:
-						if re.search(j, i, re.DOTALL):
-							cc_counter += 2
-					for j in exit_tokens:
-						if re.search(j, i, re.DOTALL):
-							cc_counter += 1
-			return cc_counter
+			if info[1] == "blob" and FileDiff.is_valid_extension(i) and not filtering.set_filtered(FileDiff.get_filename(i)):
+				files.append((i, info[2], FileDiff.get_extension(i)))
 
-		return -1
+		return files
 
 	@staticmethod
-	def get_eloc(file_r, extension):
-		is_inside_comment = False
+	def get_eloc_and_cyclomatic_complexity(file_r, extension):
 		eloc_counter = 0
+		cc_counter = 0
 
-		for i in file_r:
-			i = i.decode("utf-8", "replace")
-			(_, is_inside_comment) = comment.handle_comment_block(is_inside_comment, extension, i)
+		cc_tokens = __get_cc_tokens__(extension)
+		file_r = [i.decode("utf-8", "replace") for i in file_r]
+		flags = comment.classify_lines(extension, file_r)
 
-			if not is_inside_comment and not comment.is_comment(extension, i):
+		for i, line_flags in zip(file_r, flags):
+			if not line_flags & (comment.COMMENT | comment.INSIDE_COMMENT):
 				eloc_counter += 1
 
-		return eloc_counter
+				if cc_tokens:
+					cc_counter += __get_cc_weight__(cc_tokens, i)
+
+		return (eloc_counter, cc_counter if cc_tokens else -1)
+
+	@staticmethod
+	def get_cyclomatic_complexity(file_r, extension):
+		return MetricsLogic.get_eloc_and_cyclomatic_complexity(file_r, extension)[1]
+
+	@staticmethod
+	def get_eloc(file_r, extension):
+		return MetricsLogic.get_eloc_and_cyclomatic_complexity(file_r, extension)[0]
 
 ELOC_INFO_TEXT = N_("The following files are suspiciously big (in order of severity)")
 CYCLOMATIC_COMPLEXITY_TEXT = N_("The following files have an elevated cyclomatic complexity (in order of severity)")
@@ -123,6 +290,9 @@ CYCLOMATIC_COMPLEXITY_DENSITY_TEXT = N_("The following files have an elevated cy
                                         "(in order of severity)")
 METRICS_MISSING_INFO_TEXT = N_("No metrics violations were found in the repository")
 
+TREND_INFO_TEXT = N_("The following metrics were gathered from each of the selected revisions")
+INVALID_TREND_REFS_TEXT = N_("unable to resolve the revisions given to the metrics trend.")
+
 METRICS_VIOLATION_SCORES = [[1.0, "minimal"], [1.25, "minor"], [1.5, "medium"], [2.0, "bad"], [3.0, "severe"]]
 
 def __get_metrics_score__(ceiling, value):
@@ -131,88 +301,220 @@ def __get_metrics_score__(ceiling, value):
 			return i[1]
 
 class Metrics(Outputable):
+	def __init__(self, metrics_logic=None):
+		self.metrics_logic = metrics_logic if metrics_logic != None else MetricsLogic()
+		Outputable.__init__(self)
+
 	def output_text(self):
-		metrics_logic = MetricsLogic()
+		metrics_logic = self.metrics_logic
+		out = writer.get()
 
 		if not metrics_logic.eloc and not metrics_logic.cyclomatic_complexity and not metrics_logic.cyclomatic_complexity_density:
-			print("\n" + _(METRICS_MISSING_INFO_TEXT) + ".")
+			out.writeln("\n" + _(METRICS_MISSING_INFO_TEXT) + ".")
 
 		if metrics_logic.eloc:
-			print("\n" + _(ELOC_INFO_TEXT) + ":")
+			out.writeln("\n" + _(ELOC_INFO_TEXT) + ":")
 			for i in sorted(set([(j, i) for (i, j) in metrics_logic.eloc.items()]), reverse = True):
-				print(_("{0} ({1} estimated lines of code)").format(i[1], str(i[0])))
+				out.writeln(_("{0} ({1} estimated lines of code)").format(i[1], str(i[0])))
 
 		if metrics_logic.cyclomatic_complexity:
-			print("\n" + _(CYCLOMATIC_COMPLEXITY_TEXT) + ":")
+			out.writeln("\n" + _(CYCLOMATIC_COMPLEXITY_TEXT) + ":")
 			for i in sorted(set([(j, i) for (i, j) in metrics_logic.cyclomatic_complexity.items()]), reverse = True):
-				print(_("{0} ({1} in cyclomatic complexity)").format(i[1], str(i[0])))
+				out.writeln(_("{0} ({1} in cyclomatic complexity)").format(i[1], str(i[0])))
 
 		if metrics_logic.cyclomatic_complexity_density:
-			print("\n" + _(CYCLOMATIC_COMPLEXITY_DENSITY_TEXT) + ":")
+			out.writeln("\n" + _(CYCLOMATIC_COMPLEXITY_DENSITY_TEXT) + ":")
 			for i in sorted(set([(j, i) for (i, j) in metrics_logic.cyclomatic_complexity_density.items()]), reverse = True):
-				print(_("{0} ({1:.3f} in cyclomatic complexity density)").format(i[1], i[0]))
+				out.writeln(_("{0} ({1:.3f} in cyclomatic complexity density)").format(i[1], i[0]))
 
 	def output_html(self):
-		metrics_logic = MetricsLogic()
-		metrics_xml = "<div><div class=\"box\" id=\"metrics\">"
+		metrics_logic = self.metrics_logic
+		out = writer.get()
+		out.write("<div><div class=\"box\" id=\"metrics\">")
 
 		if not metrics_logic.eloc and not metrics_logic.cyclomatic_complexity and not metrics_logic.cyclomatic_complexity_density:
-			metrics_xml += "<p>" + _(METRICS_MISSING_INFO_TEXT) + ".</p>"
+			out.write("<p>" + _(METRICS_MISSING_INFO_TEXT) + ".</p>")
 
 		if metrics_logic.eloc:
-			metrics_xml += "<div><h4>" + _(ELOC_INFO_TEXT) + ".</h4>"
+			out.write("<div><h4>" + _(ELOC_INFO_TEXT) + ".</h4>")
 			for num, i in enumerate(sorted(set([(j, i) for (i, j) in metrics_logic.eloc.items()]), reverse = True)):
-				metrics_xml += "<div class=\"" + __get_metrics_score__(__metric_eloc__[FileDiff.get_extension(i[1])], i[0]) + \
-				               (" odd\">" if num % 2 == 1 else "\">") + \
-				               _("{0} ({1} estimated lines of code)").format(i[1], str(i[0])) + "</div>"
-			metrics_xml += "</div>"
+				out.write("<div class=\"" + __get_metrics_score__(__metric_eloc__[FileDiff.get_extension(i[1])], i[0]) +
+				          (" odd\">" if num % 2 == 1 else "\">") +
+				          _("{0} ({1} estimated lines of code)").format(i[1], str(i[0])) + "</div>")
+			out.write("</div>")
 
 		if metrics_logic.cyclomatic_complexity:
-			metrics_xml += "<div><h4>" +  _(CYCLOMATIC_COMPLEXITY_TEXT) + "</h4>"
+			out.write("<div><h4>" +  _(CYCLOMATIC_COMPLEXITY_TEXT) + "</h4>")
 			for num, i in enumerate(sorted(set([(j, i) for (i, j) in metrics_logic.cyclomatic_complexity.items()]), reverse = True)):
-				metrics_xml += "<div class=\"" + __get_metrics_score__(METRIC_CYCLOMATIC_COMPLEXITY_THRESHOLD, i[0]) + \
-				               (" odd\">" if num % 2 == 1 else "\">") + \
-				               _("{0} ({1} in cyclomatic complexity)").format(i[1], str(i[0])) + "</div>"
-			metrics_xml += "</div>"
+				out.write("<div class=\"" + __get_metrics_score__(METRIC_CYCLOMATIC_COMPLEXITY_THRESHOLD, i[0]) +
+				          (" odd\">" if num % 2 == 1 else "\">") +
+				          _("{0} ({1} in cyclomatic complexity)").format(i[1], str(i[0])) + "</div>")
+			out.write("</div>")
 
 		if metrics_logic.cyclomatic_complexity_density:
-			metrics_xml += "<div><h4>" +  _(CYCLOMATIC_COMPLEXITY_DENSITY_TEXT) + "</h4>"
+			out.write("<div><h4>" +  _(CYCLOMATIC_COMPLEXITY_DENSITY_TEXT) + "</h4>")
 			for num, i in enumerate(sorted(set([(j, i) for (i, j) in metrics_logic.cyclomatic_complexity_density.items()]), reverse = True)):
-				metrics_xml += "<div class=\"" + __get_metrics_score__(METRIC_CYCLOMATIC_COMPLEXITY_DENSITY_THRESHOLD, i[0]) + \
-				               (" odd\">" if num % 2 == 1 else "\">") + \
-				               _("{0} ({1:.3f} in cyclomatic complexity density)").format(i[1], i[0]) + "</div>"
-			metrics_xml += "</div>"
+				out.write("<div class=\"" + __get_metrics_score__(METRIC_CYCLOMATIC_COMPLEXITY_DENSITY_THRESHOLD, i[0]) +
+				          (" odd\">" if num % 2 == 1 else "\">") +
+				          _("{0} ({1:.3f} in cyclomatic complexity density)").format(i[1], i[0]) + "</div>")
+			out.write("</div>")
 
-		metrics_xml += "</div></div>"
-		print(metrics_xml)
+		out.writeln("</div></div>")
 
 	def output_xml(self):
-		metrics_logic = MetricsLogic()
+		metrics_logic = self.metrics_logic
+		out = writer.get()
 
 		if not metrics_logic.eloc and not metrics_logic.cyclomatic_complexity and not metrics_logic.cyclomatic_complexity_density:
-			print("\t<metrics>\n\t\t<message>" + _(METRICS_MISSING_INFO_TEXT) + "</message>\n\t</metrics>")
+			out.writeln("\t<metrics>\n\t\t<message>" + _(METRICS_MISSING_INFO_TEXT) + "</message>\n\t</metrics>")
 		else:
-			eloc_xml = ""
+			out.write("\t<metrics>\n\t\t<violations>\n")
 
 			if metrics_logic.eloc:
 				for i in sorted(set([(j, i) for (i, j) in metrics_logic.eloc.items()]), reverse = True):
-					eloc_xml += "\t\t\t<estimated-lines-of-code>\n"
-					eloc_xml += "\t\t\t\t<file-name>" + i[1] + "</file-name>\n"
-					eloc_xml += "\t\t\t\t<value>" + str(i[0]) + "</value>\n"
-					eloc_xml += "\t\t\t</estimated-lines-of-code>\n"
+					out.write("\t\t\t<estimated-lines-of-code>\n")
+					out.write("\t\t\t\t<file-name>" + i[1] + "</file-name>\n")
+					out.write("\t\t\t\t<value>" + str(i[0]) + "</value>\n")
+					out.write("\t\t\t</estimated-lines-of-code>\n")
 
 			if metrics_logic.cyclomatic_complexity:
 				for i in sorted(set([(j, i) for (i, j) in metrics_logic.cyclomatic_complexity.items()]), reverse = True):
-					eloc_xml += "\t\t\t<cyclomatic-complexity>\n"
-					eloc_xml += "\t\t\t\t<file-name>" + i[1] + "</file-name>\n"
-					eloc_xml += "\t\t\t\t<value>" + str(i[0]) + "</value>\n"
-					eloc_xml += "\t\t\t</cyclomatic-complexity>\n"
+					out.write("\t\t\t<cyclomatic-complexity>\n")
+					out.write("\t\t\t\t<file-name>" + i[1] + "</file-name>\n")
+					out.write("\t\t\t\t<value>" + str(i[0]) + "</value>\n")
+					out.write("\t\t\t</cyclomatic-complexity>\n")
 
 			if metrics_logic.cyclomatic_complexity_density:
 				for i in sorted(set([(j, i) for (i, j) in metrics_logic.cyclomatic_complexity_density.items()]), reverse = True):
-					eloc_xml += "\t\t\t<cyclomatic-complexity-density>\n"
-					eloc_xml += "\t\t\t\t<file-name>" + i[1] + "</file-name>\n"
-					eloc_xml += "\t\t\t\t<value>{0:.3f}</value>\n".format(i[0])
-					eloc_xml += "\t\t\t</cyclomatic-complexity-density>\n"
+					out.write("\t\t\t<cyclomatic-complexity-density>\n")
+					out.write("\t\t\t\t<file-name>" + i[1] + "</file-name>\n")
+					out.write("\t\t\t\t<value>{0:.3f}</value>\n".format(i[0]))
+					out.write("\t\t\t</cyclomatic-complexity-density>\n")
 
-			print("\t<metrics>\n\t\t<violations>\n" + eloc_xml + "\t\t</violations>\n\t</metrics>")
+			out.writeln("\t\t</violations>\n\t</metrics>")
+
+	def output_json(self):
+		metrics_logic = self.metrics_logic
+		records.begin("metrics")
+
+		for (violation, values) in [("estimated_lines_of_code", metrics_logic.eloc),
+		                            ("cyclomatic_complexity", metrics_logic.cyclomatic_complexity),
+		                            ("cyclomatic_complexity_density", metrics_logic.cyclomatic_complexity_density)]:
+			for i in sorted(set([(j, i) for (i, j) in values.items()]), reverse = True):
+				records.output({"type": violation, "file_name": i[1], "value": i[0]})
+
+		records.end()
+
+# Metrics computed for a series of revisions. The revisions are either given as a comma separated list of refs, or as a
+# number N, in which case every N:th commit along the first-parent history of HEAD is used (including the last one).
+# Metrics are only computed for blobs that have not already been seen in an earlier revision.
+
+class InvalidRevisionError(optval.InvalidOptionArgument):
+	pass
+
+class MetricsTrend:
+	def __init__(self, spec):
+		self.entries = []
+		blob_metrics = {}
+
+		for (name, sha) in MetricsTrend.get_revisions(spec):
+			self.entries.append((name, MetricsLogic(sha, blob_metrics)))
+
+	# Revisions are either every N:th commit of the first-parent history or a comma separated list of refs, all of which
+	# have to resolve to commits. The directory of the repository can be given, to check the refs before analysing it.
+
+	@staticmethod
+	def get_revisions(spec, directory=None):
+		if spec.strip().isdigit():
+			step = max(1, int(spec))
+			shas = gitcommand.read_lines(filter(None, ["rev-list", "--first-parent", "--reverse", interval.get_since(),
+			                             interval.get_until(), "HEAD"]), cwd=directory)
+			shas = [i.decode("utf-8", "replace").strip() for i in shas]
+
+			shas = [sha for i, sha in enumerate(shas) if i % step == step - 1 or i == len(shas) - 1]
+			return [(sha[0:7], sha) for sha in shas]
+
+		refs = [i.strip() for i in spec.split(",") if i.strip()]
+		(returncode, shas) = gitcommand.run(["rev-parse"] + [i + "^{commit}" for i in refs], cwd=directory, quiet=True)
+		shas = [i.strip() for i in shas.decode("utf-8", "replace").splitlines()]
+
+		if returncode != 0 or len(shas) != len(refs) or not refs:
+			raise InvalidRevisionError(_(INVALID_TREND_REFS_TEXT))
+
+		return list(zip(refs, shas))
+
+class MetricsTrendOutput(Outputable):
+	def __init__(self, spec, metrics_trend=None):
+		self.metrics_trend = metrics_trend if metrics_trend != None else MetricsTrend(spec)
+		Outputable.__init__(self)
+
+	def output_text(self):
+		out = writer.get()
+		out.writeln("\n" + textwrap.fill(_(TREND_INFO_TEXT) + ":", width=terminal.get_size()[0]) + "\n")
+		out.writeln(terminal.bold(terminal.ljust(_("Revision"), 21) + terminal.rjust(_("Files"), 7) +
+		                          terminal.rjust(_("ELOC"), 9) + terminal.rjust(_("Complexity"), 12) +
+		                          terminal.rjust(_("Big"), 6) + terminal.rjust(_("Complex"), 9) + terminal.rjust(_("Dense"), 7)))
+
+		for (name, logic) in self.metrics_trend.entries:
+			out.write(terminal.ljust(name, 20)[0:20 - terminal.get_excess_column_count(name)] + " ")
+			out.write(str(logic.files).rjust(7) + " ")
+			out.write(str(logic.total_eloc).rjust(8) + " ")
+			out.write(str(logic.total_cyclomatic_complexity).rjust(11) + " ")
+			out.write(str(len(logic.eloc)).rjust(5) + " ")
+			out.write(str(len(logic.cyclomatic_complexity)).rjust(8) + " ")
+			out.writeln(str(len(logic.cyclomatic_complexity_density)).rjust(6))
+
+	def output_html(self):
+		out = writer.get()
+		out.write("<div><div class=\"box\" id=\"metrics_trend\">")
+		out.write("<p>" + _(TREND_INFO_TEXT) + ".</p><div><table id=\"trend\" class=\"git\">")
+		out.write("<thead><tr> <th>{0}</th> <th>{1}</th> <th>{2}</th> <th>{3}</th> <th>{4}</th> <th>{5}</th> "
+		          "<th>{6}</th> </tr></thead><tbody>".format(_("Revision"), _("Files"), _("ELOC"), _("Complexity"),
+		          _("Big"), _("Complex"), _("Dense")))
+
+		for i, (name, logic) in enumerate(self.metrics_trend.entries):
+			out.write("<tr " + ("class=\"odd\">" if i % 2 == 1 else ">"))
+			out.write("<td>" + escape(name) + "</td>")
+			out.write("<td>" + str(logic.files) + "</td>")
+			out.write("<td>" + str(logic.total_eloc) + "</td>")
+			out.write("<td>" + str(logic.total_cyclomatic_complexity) + "</td>")
+			out.write("<td>" + str(len(logic.eloc)) + "</td>")
+			out.write("<td>" + str(len(logic.cyclomatic_complexity)) + "</td>")
+			out.write("<td>" + str(len(logic.cyclomatic_complexity_density)) + "</td>")
+			out.write("</tr>")
+
+		out.writeln("<tfoot><tr> <td colspan=\"7\">&nbsp;</td> </tr></tfoot></tbody></table></div></div></div>")
+
+	def output_xml(self):
+		out = writer.get()
+		out.write("\t<metrics-trend>\n\t\t<message>" + _(TREND_INFO_TEXT) + "</message>\n\t\t<revisions>\n")
+
+		for (name, logic) in self.metrics_trend.entries:
+			out.write("\t\t\t<revision>\n")
+			out.write("\t\t\t\t<name>" + escape(name) + "</name>\n")
+			out.write("\t\t\t\t<files>" + str(logic.files) + "</files>\n")
+			out.write("\t\t\t\t<estimated-lines-of-code>" + str(logic.total_eloc) + "</estimated-lines-of-code>\n")
+			out.write("\t\t\t\t<cyclomatic-complexity>" + str(logic.total_cyclomatic_complexity) +
+			          "</cyclomatic-complexity>\n")
+			out.write("\t\t\t\t<violations>\n")
+			out.write("\t\t\t\t\t<estimated-lines-of-code>" + str(len(logic.eloc)) + "</estimated-lines-of-code>\n")
+			out.write("\t\t\t\t\t<cyclomatic-complexity>" + str(len(logic.cyclomatic_complexity)) +
+			          "</cyclomatic-complexity>\n")
+			out.write("\t\t\t\t\t<cyclomatic-complexity-density>" + str(len(logic.cyclomatic_complexity_density)) +
+			          "</cyclomatic-complexity-density>\n")
+			out.write("\t\t\t\t</violations>\n")
+			out.write("\t\t\t</revision>\n")
+
+		out.writeln("\t\t</revisions>\n\t</metrics-trend>")
+
+	def output_json(self):
+		records.begin("metrics_trend")
+
+		for (name, logic) in self.metrics_trend.entries:
+			records.output({"name": name, "files": logic.files, "estimated_lines_of_code": logic.total_eloc,
+			                "cyclomatic_complexity": logic.total_cyclomatic_complexity,
+			                "violations": {"estimated_lines_of_code": len(logic.eloc),
+			                               "cyclomatic_complexity": len(logic.cyclomatic_complexity),
+			                               "cyclomatic_complexity_density": len(logic.cyclomatic_complexity_density)}})
+
+		records.end()
@@ -64,3 +64,14 @@ def get_boolean_argument(arg):
 		return True
 
 	raise InvalidOptionArgument(_("The given option argument is not a valid boolean."))
+
+def get_positive_integer_argument(arg):
+	try:
+		value = int(arg)
+	except (TypeError, ValueError):
+		value = 0
+
+	if value > 0:
+		return value
+
+	raise InvalidOptionArgument(_("The given option argument is not a valid positive integer."))
@@ -20,21 +20,32 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 import format
+import records
+import writer
 
 class Outputable(object):
 	def output_html(self):
-		print(_("HTML output not yet supported in") + " \"" + self.__class__.__name__ + "\".")
+		writer.get().writeln(_("HTML output not yet supported in") + " \"" + self.__class__.__name__ + "\".")
 
 	def output_text(self):
-		print(_("Text output not yet supported in") + " \"" + self.__class__.__name__ + "\".")
+		writer.get().writeln(_("Text output not yet supported in") + " \"" + self.__class__.__name__ + "\".")
 
 	def output_xml(self):
-		print(_("XML output not yet supported in") + " \"" + self.__class__.__name__ + "\".")
+		writer.get().writeln(_("XML output not yet supported in") + " \"" + self.__class__.__name__ + "\".")
+
+	def output_json(self):
+		records.begin(self.__class__.__name__.lower())
+		records.output({"message": _("JSON output not yet supported in") + " \"" + self.__class__.__name__ + "\"."})
+		records.end()
 
 def output(outputable):
 	if format.get_selected() == "html" or format.get_selected() == "htmlembedded":
 		outputable.output_html()
 	elif format.get_selected() == "text":
 		outputable.output_text()
+	elif records.is_record_format():
+		outputable.output_json()
 	else:
 		outputable.output_xml()
+
+	writer.get().flush()
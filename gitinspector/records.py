@@ -0,0 +1,67 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import format
+import json
+import session
+import writer
+
+# Records are written through the report writer as soon as they are produced, so that consumers can start processing
+# them before the run has finished. In the ndjson format every record is a line of its own, tagged with the section it
+# belongs to. In the json format the whole report is one object (opened by the header and closed by the footer), in
+# which every section is a list of records. The htmllite format embeds that same object into a page that renders it
+# client-side.
+
+def is_record_format():
+	return format.get_selected() in ["htmllite", "json", "ndjson"]
+
+def is_document_format():
+	return format.get_selected() == "htmllite" or format.get_selected() == "json"
+
+def dumps(value):
+	string = json.dumps(value, sort_keys=True)
+
+	# Keeps the payload from closing the script element it is embedded into.
+	if format.get_selected() == "htmllite":
+		string = string.replace("<", "\\u003c")
+
+	return string
+
+def begin(section):
+	session.get().record_section = section
+	session.get().record_count = 0
+
+	if is_document_format():
+		writer.get().write(",\n\t" + dumps(section) + ": [")
+
+def output(record):
+	if is_document_format():
+		writer.get().write(("," if session.get().record_count > 0 else "") + "\n\t\t" + dumps(record))
+	else:
+		record = dict(record)
+		record["section"] = session.get().record_section
+		writer.get().writeln(dumps(record))
+
+	session.get().record_count += 1
+
+def end():
+	if is_document_format():
+		writer.get().write("\n\t]" if session.get().record_count > 0 else "]")
@@ -25,8 +25,10 @@ import blame
 import changes
 import format
 import gravatar
+import records
 import terminal
 import textwrap
+import writer
 
 class ResponsibiltyEntry:
 	blames = {}
@@ -44,86 +46,111 @@ class Responsibilities:
 
 		return sorted(author_blames.items())
 
+	@staticmethod
+	def get_all(hard, useweeks):
+		author_blames = {}
+
+		for i in blame.get(hard, useweeks, changes.get(hard)).blames.items():
+			total_rows = i[1].rows - i[1].comments
+			if total_rows > 0:
+				author_blames.setdefault(i[0][0], {})[i[0][1]] = total_rows
+
+		return dict((author, sorted(files.items())) for (author, files) in author_blames.items())
+
 RESPONSIBILITIES_INFO_TEXT = N_("The following repsonsibilties, by author, were found in the current "
                                 "revision of the repository (comments are exluded from the line count, "
                                 "if possible)")
+RESPONSIBILITIES_REVISION_INFO_TEXT = N_("The following responsibilities, by author, were found in revision {0} of "
+                                         "the repository (comments are excluded from the line count, if possible)")
 MOSTLY_RESPONSIBLE_FOR_TEXT = N_("is mostly responsible for")
 
 class ResponsibilitiesOutput(Outputable):
-	def __init__(self, hard, useweeks):
+	def __init__(self, hard, useweeks, revision=None):
 		self.hard = hard
 		self.useweeks = useweeks
+		self.revision = revision
 		Outputable.__init__(self)
 		self.changes = changes.get(hard)
+		self.responsibilities = [(author, sorted(((i[1], i[0]) for i in files), reverse=True)[0:10]) for (author, files)
+		                         in sorted(Responsibilities.get_all(hard, useweeks).items())]
 
-	def output_text(self):
-		print("\n" + textwrap.fill(_(RESPONSIBILITIES_INFO_TEXT) + ":", width=terminal.get_size()[0]))
+	def __get_info_text__(self):
+		if self.revision == None:
+			return _(RESPONSIBILITIES_INFO_TEXT)
 
-		for i in sorted(set(i[0] for i in blame.get(self.hard, self.useweeks, self.changes).blames)):
-			responsibilities = sorted(((i[1], i[0]) for i in Responsibilities.get(self.hard, self.useweeks, i)), reverse=True)
-			if responsibilities:
-				print("\n" + i, _(MOSTLY_RESPONSIBLE_FOR_TEXT) + ":")
+		return _(RESPONSIBILITIES_REVISION_INFO_TEXT).format(self.revision)
 
-				for j, entry in enumerate(responsibilities):
-					(width, _unused) = terminal.get_size()
-					width -= 7
+	def output_text(self):
+		out = writer.get()
+		out.writeln("\n" + textwrap.fill(self.__get_info_text__() + ":", width=terminal.get_size()[0]))
 
-					print(str(entry[0]).rjust(6), end=" ")
-					print("...%s" % entry[1][-width+3:] if len(entry[1]) > width else entry[1])
+		for (i, responsibilities) in self.responsibilities:
+			out.writeln("\n" + i + " " + _(MOSTLY_RESPONSIBLE_FOR_TEXT) + ":")
 
-					if j >= 9:
-						break
+			for entry in responsibilities:
+				(width, _unused) = terminal.get_size()
+				width -= 7
+
+				out.write(str(entry[0]).rjust(6) + " ")
+				out.writeln("...%s" % entry[1][-width+3:] if len(entry[1]) > width else entry[1])
 
 	def output_html(self):
-		resp_xml = "<div><div class=\"box\" id=\"responsibilities\">"
-		resp_xml += "<p>" + _(RESPONSIBILITIES_INFO_TEXT) + ".</p>"
-
-		for i in sorted(set(i[0] for i in blame.get(self.hard, self.useweeks, self.changes).blames)):
-			responsibilities = sorted(((i[1], i[0]) for i in Responsibilities.get(self.hard, self.useweeks, i)), reverse=True)
-			if responsibilities:
-				resp_xml += "<div>"
-
-				if format.get_selected() == "html":
-					author_email = self.changes.get_latest_email_by_author(i)
-					resp_xml += "<h3><img src=\"{0}\"/>{1} {2}</h3>".format(gravatar.get_url(author_email, size=32),
-					            i, _(MOSTLY_RESPONSIBLE_FOR_TEXT))
-				else:
-					resp_xml += "<h3>{0} {1}</h3>".format(i, _(MOSTLY_RESPONSIBLE_FOR_TEXT))
-
-				for j, entry in enumerate(responsibilities):
-					resp_xml += "<div" + (" class=\"odd\">" if j % 2 == 1 else ">") + entry[1] + \
-					            " (" + str(entry[0]) + " eloc)</div>"
-					if j >= 9:
-						break
-
-				resp_xml += "</div>"
-		resp_xml += "</div></div>"
-		print(resp_xml)
+		out = writer.get()
+		out.write("<div><div class=\"box\" id=\"responsibilities\">")
+		out.write("<p>" + self.__get_info_text__() + ".</p>")
 
-	def output_xml(self):
-		message_xml = "\t\t<message>" + _(RESPONSIBILITIES_INFO_TEXT) + "</message>\n"
-		resp_xml = ""
+		for (i, responsibilities) in self.responsibilities:
+			out.write("<div>")
 
-		for i in sorted(set(i[0] for i in blame.get(self.hard, self.useweeks, self.changes).blames)):
-			responsibilities = sorted(((i[1], i[0]) for i in Responsibilities.get(self.hard, self.useweeks, i)), reverse=True)
-			if responsibilities:
+			if format.get_selected() == "html":
 				author_email = self.changes.get_latest_email_by_author(i)
+				out.write("<h3><img src=\"{0}\"/>{1} {2}</h3>".format(gravatar.get_url(author_email, size=32),
+				          i, _(MOSTLY_RESPONSIBLE_FOR_TEXT)))
+			else:
+				out.write("<h3>{0} {1}</h3>".format(i, _(MOSTLY_RESPONSIBLE_FOR_TEXT)))
+
+			for j, entry in enumerate(responsibilities):
+				out.write("<div" + (" class=\"odd\">" if j % 2 == 1 else ">") + entry[1] +
+				          " (" + str(entry[0]) + " eloc)</div>")
+
+			out.write("</div>")
+		out.writeln("</div></div>")
+
+	def output_xml(self):
+		out = writer.get()
+		out.write("\t<responsibilities>\n\t\t<message>" + self.__get_info_text__() + "</message>\n\t\t<authors>\n")
+
+		for (i, responsibilities) in self.responsibilities:
+			author_email = self.changes.get_latest_email_by_author(i)
+
+			out.write("\t\t\t<author>\n")
+			out.write("\t\t\t\t<name>" + i + "</name>\n")
+			out.write("\t\t\t\t<gravatar>" + gravatar.get_url(author_email) + "</gravatar>\n")
+			out.write("\t\t\t\t<files>\n")
+
+			for entry in responsibilities:
+				out.write("\t\t\t\t\t<file>\n")
+				out.write("\t\t\t\t\t\t<name>" + entry[1] + "</name>\n")
+				out.write("\t\t\t\t\t\t<rows>" + str(entry[0]) + "</rows>\n")
+				out.write("\t\t\t\t\t</file>\n")
+
+			out.write("\t\t\t\t</files>\n")
+			out.write("\t\t\t</author>\n")
+
+		out.writeln("\t\t</authors>\n\t</responsibilities>")
+
+	def output_json(self):
+		records.begin("responsibilities")
 
-				resp_xml += "\t\t\t<author>\n"
-				resp_xml += "\t\t\t\t<name>" + i + "</name>\n"
-				resp_xml += "\t\t\t\t<gravatar>" + gravatar.get_url(author_email) + "</gravatar>\n"
-				resp_xml += "\t\t\t\t<files>\n"
+		for (i, responsibilities) in self.responsibilities:
+			author_email = self.changes.get_latest_email_by_author(i)
 
-				for j, entry in enumerate(responsibilities):
-					resp_xml += "\t\t\t\t\t<file>\n"
-					resp_xml += "\t\t\t\t\t\t<name>" + entry[1] + "</name>\n"
-					resp_xml += "\t\t\t\t\t\t<rows>" + str(entry[0]) + "</rows>\n"
-					resp_xml += "\t\t\t\t\t</file>\n"
+			for entry in responsibilities:
+				record = {"name": i, "email": author_email, "file_name": entry[1], "rows": entry[0]}
 
-					if j >= 9:
-						break
+				if self.revision != None:
+					record["revision"] = self.revision
 
-				resp_xml += "\t\t\t\t</files>\n"
-				resp_xml += "\t\t\t</author>\n"
+				records.output(record)
 
-		print("\t<responsibilities>\n" + message_xml + "\t\t<authors>\n" + resp_xml + "\t\t</authors>\n\t</responsibilities>")
+		records.end()
@@ -0,0 +1,76 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import session
+import stats
+import threading
+
+# The work done by gitinspector is split into stages, each of which is run in a thread of its own as soon as the stages
+# it depends on have finished. Stages that are independent of each other (such as fetching the blame of every file and
+# parsing the history of the repository) thereby run concurrently. Any exception raised by a stage (including
+# SystemExit) is passed on to the thread asking for its result. Stages run in the analysis session of the thread that
+# added them, and their statistics are gathered under their names.
+
+class Stage(threading.Thread):
+	def __init__(self, name, function, dependencies):
+		threading.Thread.__init__(self)
+		self.daemon = True
+		self.name = name
+		self.function = function
+		self.dependencies = dependencies
+		self.result = None
+		self.exception = None
+		self.session = session.get()
+
+	def run(self):
+		try:
+			for i in self.dependencies:
+				i.get()
+
+			with self.session:
+				with stats.stage(self.name):
+					self.result = self.function()
+		except BaseException as exception:
+			self.exception = exception
+
+	def get(self):
+		self.join()
+
+		if self.exception != None:
+			raise self.exception
+
+		return self.result
+
+class Scheduler(object):
+	def __init__(self):
+		self.stages = {}
+
+	def add(self, name, function, dependencies=[]):
+		stage = Stage(name, function, [self.stages[i] for i in dependencies])
+		self.stages[name] = stage
+		stage.start()
+
+	def get(self, name):
+		return self.stages[name].get()
+
+	def wait(self):
+		for i in self.stages.values():
+			i.get()
@@ -0,0 +1,291 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from localization import N_
+import blame
+import changes
+import copy
+import datetime
+import extensions
+import filtering
+import format
+import gitcommand
+import interval
+import json
+import optval
+import os
+import session
+import stat
+import sys
+import threading
+
+try:
+	from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+	from SocketServer import ThreadingMixIn, UnixStreamServer
+	from StringIO import StringIO
+	from urlparse import parse_qs, urlparse
+except ImportError:
+	from http.server import BaseHTTPRequestHandler, HTTPServer
+	from socketserver import ThreadingMixIn, UnixStreamServer
+	from io import StringIO
+	from urllib.parse import parse_qs, urlparse
+
+CONTENT_TYPES = {"html": "text/html", "htmlembedded": "text/html", "htmllite": "text/html", "json": "application/json",
+                 "ndjson": "application/x-ndjson", "text": "text/plain", "xml": "application/xml"}
+
+SERVING_TEXT = N_("Serving the statistics of {0} at {1} (press Ctrl+C to stop)")
+
+# In server mode, the repository is analysed once and the results are kept in memory, where they are used to answer any
+# number of requests. Before a request is answered, HEAD is checked; if it has moved, the analysis is refreshed first.
+# When the new HEAD descends from the previous one, only the new commits are parsed and only the files they touched are
+# blamed once again. Requests are handled by threads of their own, but the analysis state is shared (and partly held in
+# the analysis session of the runner), so a single lock serializes the refreshing; no git work is ever repeated. Each
+# request is then answered from a snapshot of the analysis, which is rendered without holding the lock.
+
+class InvalidAddressError(optval.InvalidOptionArgument):
+	pass
+
+class InvalidQueryError(ValueError):
+	def __init__(self, msg):
+		super(InvalidQueryError, self).__init__(msg)
+		self.msg = msg
+
+# Parses a server address given as [HOST:]PORT or as unix:PATH. The host defaults to the loopback interface.
+
+def parse_address(address):
+	if address.startswith("unix:"):
+		return address[5:]
+
+	(host, _unused, port) = address.rpartition(":")
+
+	try:
+		port = int(port)
+	except ValueError:
+		raise InvalidAddressError(_("invalid server address specified"))
+
+	if port < 0 or port > 65535:
+		raise InvalidAddressError(_("invalid server address specified"))
+
+	return (host if host else "127.0.0.1", port)
+
+def __run_git__(command):
+	(returncode, output) = gitcommand.run(command, quiet=True)
+	return (returncode, output.decode("utf-8", "replace"))
+
+def __get_head__():
+	(returncode, output) = __run_git__(["rev-parse", "--verify", "-q", "HEAD"])
+	return output.strip() if returncode == 0 else None
+
+def __is_ancestor__(first_revision, second_revision):
+	return __run_git__(["merge-base", "--is-ancestor", first_revision, second_revision])[0] == 0
+
+def __get_changed_files__(first_revision, second_revision):
+	output = __run_git__(["diff", "--name-only", "--no-renames", "-z", first_revision, second_revision])[1]
+	return set(i for i in output.split("\0") if i)
+
+class Analysis:
+	def __init__(self, runner):
+		self.runner = runner
+		self.lock = threading.Lock()
+		self.default_format = format.get_selected()
+		self.head = None
+		self.outputables = None
+
+	# Should only be called while holding the lock.
+	def refresh(self):
+		head = __get_head__()
+
+		if head != self.head or self.outputables == None:
+			if self.head != None and head != None and __is_ancestor__(self.head, head) and \
+			   not interval.has_interval():
+				blame.reset(__get_changed_files__(self.head, head))
+				changes.update(self.runner.hard, self.head)
+			else:
+				blame.reset()
+				changes.reset()
+				extensions.reset_located()
+				filtering.reset_filtered()
+
+			self.outputables = self.runner.analyse()
+			self.head = head
+
+	# Refreshing replaces the results kept in the session rather than modifying them, apart from the located extensions and
+	# the filtered items; the snapshot holds copies of those, and a session of its own to render in.
+
+	def get_snapshot(self):
+		with self.lock:
+			with self.runner.session:
+				self.refresh()
+
+			snapshot = copy.copy(self)
+			snapshot.lock = None
+			snapshot.runner = copy.copy(self.runner)
+			snapshot.runner.session = copy.copy(self.runner.session)
+			snapshot.runner.session.filters = dict((i, [j[0], set(j[1]) if j[1] != None else None])
+			                                       for (i, j) in self.runner.session.filters.items())
+			snapshot.runner.session.located_extensions = set(self.runner.session.located_extensions)
+			snapshot.runner.session.writer = None
+
+		return snapshot
+
+	def get_changes(self):
+		return changes.get(self.runner.hard)
+
+	def get_blame(self):
+		return blame.get(self.runner.hard, self.runner.useweeks, self.get_changes())
+
+def __get_date_argument__(query, name):
+	if not name in query:
+		return None
+
+	try:
+		return datetime.datetime.strptime(query[name], "%Y-%m-%d").strftime("%Y-%m-%d")
+	except ValueError:
+		raise InvalidQueryError(_("invalid date specified; the expected format is YYYY-MM-DD"))
+
+def __get_status__(analysis, query):
+	return {"repository": os.path.basename(session.get().directory), "head": analysis.head}
+
+def __get_report__(analysis, query):
+	target_format = query.get("format", analysis.default_format)
+
+	if not target_format in CONTENT_TYPES:
+		raise InvalidQueryError(_("specified output format not supported."))
+
+	stream = StringIO()
+	analysis.runner.render(analysis.outputables, target_format, stream)
+	format.select(analysis.default_format)
+
+	return (CONTENT_TYPES[target_format], stream.getvalue())
+
+def __get_blame_summary__(analysis, query):
+	analysed_changes = analysis.get_changes()
+	summary = []
+
+	if analysed_changes.get_commits():
+		for (author, entry) in sorted(analysis.get_blame().get_summed_blames().items()):
+			summary.append({"name": author, "email": analysed_changes.get_latest_email_by_author(author),
+			                "rows": entry.rows, "stability": blame.Blame.get_stability(author, entry.rows, analysed_changes),
+			                "age": float(entry.skew) / entry.rows,
+			                "percentage_in_comments": 100.0 * entry.comments / entry.rows})
+
+	return {"head": analysis.head, "blame": summary}
+
+def __get_changes_summary__(analysis, query):
+	since = __get_date_argument__(query, "since")
+	until = __get_date_argument__(query, "until")
+	authors = {}
+
+	for commit in analysis.get_changes().get_commits():
+		if (since == None or commit.date >= since) and (until == None or commit.date <= until):
+			author = authors.setdefault(commit.author, {"name": commit.author, "email": commit.email, "commits": 0,
+			                                            "insertions": 0, "deletions": 0})
+			author["commits"] += 1 if commit.get_filediffs() else 0
+			author["insertions"] += commit.insertions
+			author["deletions"] += commit.deletions
+
+	return {"head": analysis.head, "since": since, "until": until, "changes": [authors[i] for i in sorted(authors)]}
+
+ROUTES = {"/blame": __get_blame_summary__, "/changes": __get_changes_summary__, "/report": __get_report__,
+          "/status": __get_status__}
+
+class RequestHandler(BaseHTTPRequestHandler):
+	def __respond__(self, status, content_type, body):
+		body = body.encode("utf-8")
+		self.send_response(status)
+		self.send_header("Content-Type", content_type + "; charset=utf-8")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def __respond_json__(self, status, value):
+		self.__respond__(status, "application/json", json.dumps(value, sort_keys=True, ensure_ascii=False) + "\n")
+
+	def do_GET(self):
+		url = urlparse(self.path)
+		route = ROUTES.get(url.path)
+		query = dict((i, j[-1]) for (i, j) in parse_qs(url.query).items())
+
+		if route == None:
+			self.__respond_json__(404, {"error": "not found"})
+			return
+
+		try:
+			snapshot = self.server.analysis.get_snapshot()
+
+			with snapshot.runner.session:
+				response = route(snapshot, query)
+		except InvalidQueryError as exception:
+			self.__respond_json__(400, {"error": exception.msg})
+			return
+		except Exception as exception:
+			self.__respond_json__(500, {"error": "{0}".format(exception)})
+			return
+
+		if isinstance(response, tuple):
+			self.__respond__(200, response[0], response[1])
+		else:
+			self.__respond_json__(200, response)
+
+	def log_message(self, *args):
+		pass
+
+class TCPServer(ThreadingMixIn, HTTPServer):
+	daemon_threads = True
+
+class UnixServer(ThreadingMixIn, UnixStreamServer):
+	daemon_threads = True
+
+# Creates a server for the repository of the runner, which is analysed on the first request.
+
+def create(runner, address):
+	address = parse_address(address)
+	runner.prepare()
+
+	if isinstance(address, tuple):
+		server = TCPServer(address, RequestHandler)
+	else:
+		if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+			os.remove(address)
+		server = UnixServer(address, RequestHandler)
+
+	server.analysis = Analysis(runner)
+	return server
+
+def serve(runner, address):
+	server = create(runner, address)
+
+	with server.analysis.lock:
+		with runner.session:
+			server.analysis.refresh()
+
+	print(_(SERVING_TEXT).format(runner.session.directory, address), file=sys.stderr)
+
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
+
+		if not isinstance(server.server_address, tuple):
+			os.remove(server.server_address)
@@ -0,0 +1,74 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import threading
+
+# An analysis session owns everything a single analysis depends on or produces: its configuration (the repository, the
+# interval, the file types and the exclusion patterns), the results of the analysis and the state of the report being
+# rendered. The modules of gitinspector keep their functional interface, but look this state up in the current session
+# rather than in globals of their own.
+#
+# The current session is kept per thread; a session is made current for a block of code by using it in a with
+# statement. Threads that work on behalf of a session bind themselves to the session of the thread that created them.
+# Any number of sessions can thereby be used in the same process, even concurrently. Sessions only share what is
+# independent of the repository being analysed: the (content addressed) cache, the way repositories given as URLs are
+# cloned and the git transcript being recorded or replayed. The statistics and the trace describe the process as a whole
+# and thereby cover all of its sessions; they are only meaningful for one analysis at a time.
+
+class AnalysisSession(object):
+	def __init__(self):
+		self.directory = None
+		self.head = None
+
+		self.extensions = None
+		self.filters = {"file": [set(), set()], "author": [set(), set()], "email": [set(), set()],
+		                "revision": [set(), set()], "message" : [set(), None]}
+		self.since = ""
+		self.until = ""
+		self.ref = "HEAD"
+
+		self.attributed = False
+		self.blame = None
+		self.changes = None
+		self.located_extensions = set()
+		self.reusable_blamechunks = {}
+
+		self.record_count = 0
+		self.record_section = None
+		self.selected_format = None
+		self.skip_escapes = False
+		self.writer = None
+
+		self.cloned_path = None
+
+	def __enter__(self):
+		__local__.previous_sessions = getattr(__local__, "previous_sessions", []) + [get()]
+		__local__.session = self
+		return self
+
+	def __exit__(self, *args):
+		__local__.session = __local__.previous_sessions.pop()
+
+__default_session__ = AnalysisSession()
+__local__ = threading.local()
+
+def get():
+	return getattr(__local__, "session", __default_session__)
@@ -0,0 +1,203 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import tracing
+
+try:
+	import resource
+except ImportError:
+	resource = None
+
+# Statistics about where the time of a run goes, gathered per stage of the analysis. Each thread has a current stage,
+# to which the git processes it spawns and the work it does are accounted; work done outside of any stage is accounted
+# to "other". Gathering the statistics only involves a few counters and timestamps per git process and stage, which
+# makes it cheap enough to leave enabled. The CPU time of a stage is the CPU time of the whole process while the stage
+# ran; stages running concurrently therefore share theirs. Stages and workers are also traced, when tracing is enabled.
+
+OTHER_STAGE = "other"
+
+__enabled__ = False
+__lock__ = threading.Lock()
+__local__ = threading.local()
+__stages__ = {}
+__start_time__ = None
+
+class StageStatistics(object):
+	def __init__(self):
+		self.wall_time = 0.0
+		self.cpu_time = 0.0
+		self.git_processes = 0
+		self.git_bytes_read = 0
+		self.git_cpu_time = 0.0
+		self.git_peak_rss = 0
+		self.lines_parsed = 0
+		self.workers = 0
+		self.worker_time = 0.0
+		self.peak_rss = 0
+
+	def get_worker_utilisation(self):
+		if self.workers == 0 or self.wall_time == 0:
+			return None
+
+		return min(1.0, self.worker_time / (self.workers * self.wall_time))
+
+	def to_dict(self):
+		return {"wall_time": round(self.wall_time, 6), "cpu_time": round(self.cpu_time, 6),
+		        "git_processes": self.git_processes, "git_bytes_read": self.git_bytes_read,
+		        "git_cpu_time": round(self.git_cpu_time, 6), "git_peak_rss_kb": self.git_peak_rss,
+		        "lines_parsed": self.lines_parsed, "workers": self.workers, "worker_time": round(self.worker_time, 6),
+		        "worker_utilisation": self.get_worker_utilisation(), "peak_rss_kb": self.peak_rss}
+
+def is_enabled():
+	return __enabled__
+
+def set_enabled(enabled):
+	global __enabled__
+	__enabled__ = enabled
+	reset()
+
+def reset():
+	global __start_time__
+
+	with __lock__:
+		__stages__.clear()
+		__start_time__ = (time.time(), __get_cpu_time__())
+
+def __get_cpu_time__():
+	times = os.times()
+	return times[0] + times[1]
+
+# ru_maxrss is given in kilobytes, except on OS X where it is given in bytes.
+
+def __normalise_rss__(rss):
+	return rss // 1024 if sys.platform == "darwin" else rss
+
+def get_peak_rss(who=None):
+	if resource == None:
+		return 0
+
+	return __normalise_rss__(resource.getrusage(resource.RUSAGE_SELF if who == None else who).ru_maxrss)
+
+def __get__(name):
+	statistics = __stages__.get(name, None)
+
+	if statistics == None:
+		statistics = __stages__[name] = StageStatistics()
+
+	return statistics
+
+def get_stage():
+	return getattr(__local__, "stage", OTHER_STAGE)
+
+def set_stage(name):
+	__local__.stage = name
+
+# Runs a stage in the calling thread, accounting its wall and CPU time.
+
+@contextlib.contextmanager
+def stage(name):
+	previous = get_stage()
+	set_stage(name)
+	start = (time.time(), __get_cpu_time__()) if __enabled__ or tracing.is_enabled() else None
+
+	try:
+		yield
+	finally:
+		set_stage(previous)
+
+		if start:
+			tracing.add_span(name, "stage", start[0], time.time())
+
+		if start and __enabled__:
+			with __lock__:
+				statistics = __get__(name)
+				statistics.wall_time += time.time() - start[0]
+				statistics.cpu_time += __get_cpu_time__() - start[1]
+				statistics.peak_rss = max(statistics.peak_rss, get_peak_rss())
+
+# Runs work on behalf of a stage in one of (at most) the given number of workers, accounting the time the worker was
+# busy. The worker utilisation of the stage is the busy time of its workers relative to the time they had available.
+
+@contextlib.contextmanager
+def worker(name, workers):
+	previous = get_stage()
+	set_stage(name)
+	start = time.time() if __enabled__ or tracing.is_enabled() else None
+
+	try:
+		yield
+	finally:
+		set_stage(previous)
+
+		if start:
+			tracing.add_span(name + " worker", "worker", start, time.time())
+
+		if start and __enabled__:
+			add_worker_time(name, workers, time.time() - start)
+
+def add_worker_time(name, workers, busy_time):
+	with __lock__:
+		statistics = __get__(name)
+		statistics.workers = max(statistics.workers, workers)
+		statistics.worker_time += busy_time
+
+def add_git_process(name, bytes_read, lines_read, rusage=None):
+	with __lock__:
+		statistics = __get__(name)
+		statistics.git_processes += 1
+		statistics.git_bytes_read += bytes_read
+		statistics.lines_parsed += lines_read
+
+		if rusage != None:
+			statistics.git_cpu_time += rusage.ru_utime + rusage.ru_stime
+			statistics.git_peak_rss = max(statistics.git_peak_rss, __normalise_rss__(rusage.ru_maxrss))
+
+def get():
+	with __lock__:
+		stages = dict((name, statistics.to_dict()) for (name, statistics) in __stages__.items())
+		total = {"wall_time": round(time.time() - __start_time__[0], 6),
+		         "cpu_time": round(__get_cpu_time__() - __start_time__[1], 6),
+		         "git_processes": sum(i.git_processes for i in __stages__.values()),
+		         "git_bytes_read": sum(i.git_bytes_read for i in __stages__.values()),
+		         "git_cpu_time": round(sum(i.git_cpu_time for i in __stages__.values()), 6),
+		         "lines_parsed": sum(i.lines_parsed for i in __stages__.values()),
+		         "peak_rss_kb": get_peak_rss()}
+
+		if resource != None:
+			total["children_peak_rss_kb"] = get_peak_rss(resource.RUSAGE_CHILDREN)
+
+		return {"stages": stages, "total": total}
+
+def output(file_name):
+	statistics = json.dumps(get(), indent=1, separators=(",", ": "), sort_keys=True)
+
+	if file_name == "-":
+		print(statistics, file=sys.stderr)
+	else:
+		with open(file_name, "w") as stats_file:
+			stats_file.write(statistics + "\n")
@@ -20,7 +20,7 @@
 from __future__ import print_function
 import codecs
 import os
-import platform
+import session
 import sys
 import unicodedata
 
@@ -79,21 +79,26 @@ def __get_size_linux__():
 def clear_row():
 	print("\b" * 200, end="")
 
+# Whether escape sequences are written depends on where the report of the current session goes.
+
 def skip_escapes(skip):
-	if skip:
-		global __bold__
-		global __normal__
-		__bold__ = ""
-		__normal__ = ""
+	session.get().skip_escapes = skip
+
+def bold(string):
+	if session.get().skip_escapes:
+		return string
+
+	return __bold__ + string + __normal__
 
 def printb(string):
-	print(__bold__ + string + __normal__)
+	print(bold(string))
 
 def get_size():
 	width = 0
 	height = 0
 
 	if sys.stdout.isatty():
+		import platform
 		current_os = platform.system()
 
 		if current_os == "Windows":
@@ -21,84 +21,167 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from localization import N_
 from outputable import Outputable
+import aggregation
 import datetime
 import format
 import gravatar
+import records
 import terminal
 import textwrap
+import writer
+
+GRANULARITIES = ["day", "week", "month", "quarter", "year"]
+
+def get_default_granularity(useweeks):
+	return "week" if useweeks else "month"
+
+# Commit dates (in the YYYY-MM-DD format) are converted to integers once per distinct date and grouped into buckets using
+# integer arithmetic only. The key of a bucket orders the periods, while the label is what is shown in the output. Week
+# buckets are keyed by the day ordinal of their Monday and labeled with the ISO year and week.
+
+def __get_bucket__(date, granularity, week_labels):
+	(year, month, day) = (int(date[0:4]), int(date[5:7]), int(date[8:10]))
+
+	if granularity == "day":
+		return ((year * 12 + month) * 31 + day, date[0:10])
+	elif granularity == "week":
+		ordinal = datetime.date(year, month, day).toordinal()
+		key = ordinal - (ordinal - 1) % 7
+		label = week_labels.get(key, None)
+
+		if label == None:
+			yearweek = datetime.date.fromordinal(key).isocalendar()
+			label = str(yearweek[0]) + "W" + "{0:02d}".format(yearweek[1])
+			week_labels[key] = label
+
+		return (key, label)
+	elif granularity == "quarter":
+		return (year * 4 + (month - 1) // 3, "{0:04d}Q{1}".format(year, (month - 1) // 3 + 1))
+	elif granularity == "year":
+		return (year, "{0:04d}".format(year))
+
+	return (year * 12 + month - 1, date[0:7])
+
+def get_buckets(dates, granularity):
+	week_labels = {}
+	return dict((date, __get_bucket__(date, granularity, week_labels)) for date in set(dates))
+
+# The timeline is stored as a dense matrix with one row per author and one column per period; insertions and deletions
+# are kept in separate matrices.
+#
+# The scaling of a period has always been found by stepping the multiplier by 0.25 while cycling through the authors of
+# the period, in the iteration order of a dictionary keyed by author and period. That order is kept, so that the rendered
+# timeline stays the same, but the step at which each author first exceeds the width is calculated directly.
 
 class TimelineData:
-	def __init__(self, changes, useweeks):
-		authordateinfo_list = sorted(changes.get_authordateinfo_list().items())
+	def __init__(self, changes, useweeks, granularity=None):
+		authordateinfo_list = list(changes.get_authordateinfo_list().items())
 		self.changes = changes
-		self.entries = {}
-		self.total_changes_by_period = {}
 		self.useweeks = useweeks
+		self.granularity = granularity if granularity else get_default_granularity(useweeks)
 
-		for i in authordateinfo_list:
-			key = None
+		buckets = get_buckets((i[0][0] for i in authordateinfo_list), self.granularity)
+		period_keys = dict(buckets[i[0][0]][::-1] for i in authordateinfo_list)
 
-			if useweeks:
-				yearweek = datetime.date(int(i[0][0][0:4]), int(i[0][0][5:7]), int(i[0][0][8:10])).isocalendar()
-				key = (i[0][1], str(yearweek[0]) + "W" + "{0:02d}".format(yearweek[1]))
-			else:
-				key = (i[0][1], i[0][0][0:7])
+		self.periods = sorted(period_keys, key=period_keys.get)
+		self.authors = sorted((i, changes.get_latest_email_by_author(i)) for i in set(i[0][1] for i in authordateinfo_list))
+		self.period_indices = dict((period, i) for i, period in enumerate(self.periods))
+		self.author_indices = dict((author[0], i) for i, author in enumerate(self.authors))
 
-			if self.entries.get(key, None) == None:
-				self.entries[key] = i[1]
-			else:
-				self.entries[key].insertions += i[1].insertions
-				self.entries[key].deletions += i[1].deletions
+		rows = [self.author_indices[i[0][1]] for i in authordateinfo_list]
+		columns = [self.period_indices[buckets[i[0][0]][1]] for i in authordateinfo_list]
+		shape = (len(self.authors), len(self.periods))
+
+		insertions = [i[1].insertions for i in authordateinfo_list]
+		deletions = [i[1].deletions for i in authordateinfo_list]
+		values = [insertions, deletions, [1] * len(rows), [i + j for (i, j) in zip(insertions, deletions)]]
+		(self.insertions, self.deletions, self.present, changes_matrix) = aggregation.sums_by_cell(rows, columns, values,
+		                                                                                           shape)
+
+		total_insertions = aggregation.column_sums(self.insertions, len(self.periods))
+		total_deletions = aggregation.column_sums(self.deletions, len(self.periods))
+		max_changes = aggregation.column_maxima(changes_matrix, len(self.periods))
+
+		self.total_changes_by_period = {}
+		self.max_changes_by_period = {}
+
+		for i, period in enumerate(self.periods):
+			self.total_changes_by_period[period] = (total_insertions[i], total_deletions[i],
+			                                        total_insertions[i] + total_deletions[i])
+			self.max_changes_by_period[period] = max_changes[i]
 
-		for period in self.get_periods():
-			total_insertions = 0
-			total_deletions = 0
+		entries = {}
 
-			for author in self.get_authors():
-				entry = self.entries.get((author[0], period), None)
-				if entry != None:
-					total_insertions += entry.insertions
-					total_deletions += entry.deletions
+		for (date, author) in sorted(i[0] for i in authordateinfo_list):
+			entries.setdefault((author, buckets[date][1]), None)
 
-			self.total_changes_by_period[period] = (total_insertions, total_deletions,
-			                                        total_insertions + total_deletions)
+		self.changes_by_period = dict((period, []) for period in self.periods)
+
+		for (author, period) in entries:
+			cell = changes_matrix[self.author_indices[author]][self.period_indices[period]]
+			self.changes_by_period[period].append(int(cell))
 
 	def get_periods(self):
-		return sorted(set([i[1] for i in self.entries]))
+		return self.periods
 
 	def get_total_changes_in_period(self, period):
 		return self.total_changes_by_period[period]
 
 	def get_authors(self):
-		return sorted(set([(i[0][0], self.changes.get_latest_email_by_author(i[0][0])) for i in self.entries.items()]))
+		return self.authors
 
 	def get_author_signs_in_period(self, author, period, multiplier):
-		authorinfo = self.entries.get((author, period), None)
-		total = float(self.total_changes_by_period[period][2])
+		author_index = self.author_indices.get(author, None)
+		period_index = self.period_indices.get(period, None)
+		total = float(self.total_changes_by_period[period][2]) if period_index != None else 0
 
-		if authorinfo:
-			i = multiplier * (self.entries[(author, period)].insertions / total)
-			j = multiplier * (self.entries[(author, period)].deletions / total)
+		if author_index != None and period_index != None and self.present[author_index][period_index] and total > 0:
+			i = multiplier * (self.insertions[author_index][period_index] / total)
+			j = multiplier * (self.deletions[author_index][period_index] / total)
 			return (int(i), int(j))
 		else:
 			return (0, 0)
 
+	def get_author_changes_in_period(self, author, period):
+		author_index = self.author_indices.get(author, None)
+		period_index = self.period_indices.get(period, None)
+
+		if author_index != None and period_index != None:
+			return (self.insertions[author_index][period_index], self.deletions[author_index][period_index])
+		else:
+			return (0, 0)
+
+	# Returns the multiplier at which the changes of an author of the period first exceed max_width, when the multiplier
+	# is raised by 0.25 for each author visited, in turn. The step of each author is estimated with integer arithmetic and
+	# then corrected using the same floating point comparison as the stepping, so that the result is exactly the same.
+
 	def get_multiplier(self, period, max_width):
-		multiplier = 0
+		if self.max_changes_by_period[period] == 0:
+			return 0
+
+		changes = self.changes_by_period[period]
+		total = float(self.total_changes_by_period[period][2])
+		exceeds = lambda step, entry_changes: (step * 0.25) * entry_changes / total > max_width
+		steps = []
 
-		while True:
-			for i in self.entries:
-				entry = self.entries.get(i)
+		for i, entry_changes in enumerate(changes):
+			if entry_changes > 0:
+				threshold = (4 * max_width * self.total_changes_by_period[period][2]) // entry_changes + 1
+				turn = max(0, (threshold - i + len(changes) - 1) // len(changes))
 
-				if period == i[1]:
-					changes_in_period = float(self.total_changes_by_period[i[1]][2])
-					if multiplier * (entry.insertions + entry.deletions) / changes_in_period > max_width:
-						return multiplier
+				while turn > 0 and exceeds(i + (turn - 1) * len(changes), entry_changes):
+					turn -= 1
+				while not exceeds(i + turn * len(changes), entry_changes):
+					turn += 1
 
-					multiplier += 0.25
+				steps.append(i + turn * len(changes))
+
+		return min(steps) * 0.25
 
 	def is_author_in_period(self, period, author):
-		return self.entries.get((author, period), None) != None
+		author_index = self.author_indices.get(author, None)
+		period_index = self.period_indices.get(period, None)
+		return author_index != None and period_index != None and self.present[author_index][period_index] > 0
 
 	def is_author_in_periods(self, periods, author):
 		for period in periods:
@@ -111,26 +194,27 @@ TIMELINE_INFO_TEXT = N_("The following history timeline has been gathered from t
 MODIFIED_ROWS_TEXT = N_("Modified Rows:")
 
 def __output_row__text__(timeline_data, periods, names):
-	print("\n" + terminal.__bold__ + terminal.ljust(_("Author"), 20), end=" ")
-	
+	out = writer.get()
+	header = terminal.ljust(_("Author"), 20) + " "
+
 	for period in periods:
-		print(terminal.rjust(period, 10), end=" ")
+		header += terminal.rjust(period, 10) + " "
 
-	print(terminal.__normal__)
+	out.writeln("\n" + terminal.bold(header))
+	multipliers = [timeline_data.get_multiplier(period, 9) for period in periods]
 
 	for name in names:
 		if timeline_data.is_author_in_periods(periods, name[0]):
-			print(terminal.ljust(name[0], 20)[0:20 - terminal.get_excess_column_count(name[0])], end=" ")
+			out.write(terminal.ljust(name[0], 20)[0:20 - terminal.get_excess_column_count(name[0])] + " ")
 
-			for period in periods:
-				multiplier = timeline_data.get_multiplier(period, 9)
+			for period, multiplier in zip(periods, multipliers):
 				signs = timeline_data.get_author_signs_in_period(name[0], period, multiplier)
 				signs_str = (signs[1] * "-" + signs[0] * "+")
-				print (("." if timeline_data.is_author_in_period(period, name[0]) and
-				               len(signs_str) == 0 else signs_str).rjust(10), end=" ")
-			print("")
+				out.write(("." if timeline_data.is_author_in_period(period, name[0]) and
+				           len(signs_str) == 0 else signs_str).rjust(10) + " ")
+			out.writeln()
 
-	print(terminal.__bold__  + terminal.ljust(_(MODIFIED_ROWS_TEXT), 20) + terminal.__normal__, end=" ")
+	out.write(terminal.bold(terminal.ljust(_(MODIFIED_ROWS_TEXT), 20)) + " ")
 
 	for period in periods:
 		total_changes = str(timeline_data.get_total_changes_in_period(period)[2])
@@ -138,58 +222,60 @@ def __output_row__text__(timeline_data, periods, names):
 		if hasattr(total_changes, 'decode'):
 			total_changes = total_changes.decode("utf-8", "replace")
 
-		print(terminal.rjust(total_changes, 10), end=" ")
+		out.write(terminal.rjust(total_changes, 10) + " ")
 
-	print("")
+	out.writeln()
 
 def __output_row__html__(timeline_data, periods, names):
-	timeline_xml = "<table class=\"git full\"><thead><tr><th>" + _("Author") + "</th>"
+	out = writer.get()
+	out.write("<table class=\"git full\"><thead><tr><th>" + _("Author") + "</th>")
 
 	for period in periods:
-		timeline_xml += "<th>" + str(period) + "</th>"
+		out.write("<th>" + str(period) + "</th>")
 
-	timeline_xml += "</tr></thead><tbody>"
+	out.write("</tr></thead><tbody>")
+	multipliers = [timeline_data.get_multiplier(period, 18) for period in periods]
 	i = 0
 
 	for name in names:
 		if timeline_data.is_author_in_periods(periods, name[0]):
-			timeline_xml += "<tr" + (" class=\"odd\">" if i % 2 == 1 else ">")
+			out.write("<tr" + (" class=\"odd\">" if i % 2 == 1 else ">"))
 
 			if format.get_selected() == "html":
-				timeline_xml += "<td><img src=\"{0}\"/>{1}</td>".format(gravatar.get_url(name[1]), name[0])
+				out.write("<td><img src=\"{0}\"/>{1}</td>".format(gravatar.get_url(name[1]), name[0]))
 			else:
-				timeline_xml += "<td>" + name[0] + "</td>"
+				out.write("<td>" + name[0] + "</td>")
 
-			for period in periods:
-				multiplier = timeline_data.get_multiplier(period, 18)
+			for period, multiplier in zip(periods, multipliers):
 				signs = timeline_data.get_author_signs_in_period(name[0], period, multiplier)
 				signs_str = (signs[1] * "<div class=\"remove\">&nbsp;</div>" + signs[0] * "<div class=\"insert\">&nbsp;</div>")
 
-				timeline_xml += "<td>" + ("." if timeline_data.is_author_in_period(period, name[0]) and len(signs_str) == 0 else signs_str)
-				timeline_xml += "</td>"
-			timeline_xml += "</tr>"
+				out.write("<td>" + ("." if timeline_data.is_author_in_period(period, name[0]) and len(signs_str) == 0 else signs_str))
+				out.write("</td>")
+			out.write("</tr>")
 			i = i + 1
 
-	timeline_xml += "<tfoot><tr><td><strong>" + _(MODIFIED_ROWS_TEXT) + "</strong></td>"
+	out.write("<tfoot><tr><td><strong>" + _(MODIFIED_ROWS_TEXT) + "</strong></td>")
 
 	for period in periods:
 		total_changes = timeline_data.get_total_changes_in_period(period)
-		timeline_xml += "<td>" + str(total_changes[2]) + "</td>"
+		out.write("<td>" + str(total_changes[2]) + "</td>")
 
-	timeline_xml += "</tr></tfoot></tbody></table>"
-	print(timeline_xml)
+	out.writeln("</tr></tfoot></tbody></table>")
 
 class Timeline(Outputable):
-	def __init__(self, changes, useweeks):
+	def __init__(self, changes, useweeks, granularity=None):
 		self.changes = changes
 		self.useweeks = useweeks
+		self.granularity = granularity if granularity else get_default_granularity(useweeks)
+		self.timeline_data = TimelineData(changes, useweeks, self.granularity) if changes.get_commits() else None
 		Outputable.__init__(self)
 
 	def output_text(self):
 		if self.changes.get_commits():
-			print("\n" + textwrap.fill(_(TIMELINE_INFO_TEXT) + ":", width=terminal.get_size()[0]))
+			writer.get().writeln("\n" + textwrap.fill(_(TIMELINE_INFO_TEXT) + ":", width=terminal.get_size()[0]))
 
-			timeline_data = TimelineData(self.changes, self.useweeks)
+			timeline_data = self.timeline_data
 			periods = timeline_data.get_periods()
 			names = timeline_data.get_authors()
 			(width, _unused) = terminal.get_size()
@@ -200,51 +286,64 @@ class Timeline(Outputable):
 
 	def output_html(self):
 		if self.changes.get_commits():
-			timeline_data = TimelineData(self.changes, self.useweeks)
+			timeline_data = self.timeline_data
 			periods = timeline_data.get_periods()
 			names = timeline_data.get_authors()
 			max_periods_per_row = 8
 
-			timeline_xml = "<div><div id=\"timeline\" class=\"box\">"
-			timeline_xml += "<p>" + _(TIMELINE_INFO_TEXT) + ".</p>"
-			print(timeline_xml)
+			out = writer.get()
+			out.writeln("<div><div id=\"timeline\" class=\"box\">" + "<p>" + _(TIMELINE_INFO_TEXT) + ".</p>")
 
 			for i in range(0, len(periods), max_periods_per_row):
 				__output_row__html__(timeline_data, periods[i:i+max_periods_per_row], names)
 
-			timeline_xml = "</div></div>"
-			print(timeline_xml)
+			out.writeln("</div></div>")
 
 	def output_xml(self):
 		if self.changes.get_commits():
-			message_xml = "\t\t<message>" + _(TIMELINE_INFO_TEXT) + "</message>\n"
-			timeline_xml = ""
-			periods_xml = "\t\t<periods length=\"{0}\">\n".format("week" if self.useweeks else "month")
+			out = writer.get()
+			out.write("\t<timeline>\n\t\t<message>" + _(TIMELINE_INFO_TEXT) + "</message>\n")
+			out.write("\t\t<periods length=\"{0}\">\n".format(self.granularity))
 
-			timeline_data = TimelineData(self.changes, self.useweeks)
+			timeline_data = self.timeline_data
 			periods = timeline_data.get_periods()
 			names = timeline_data.get_authors()
 
 			for period in periods:
-				name_xml = "\t\t\t\t<name>" + str(period) + "</name>\n"
-				authors_xml = "\t\t\t\t<authors>\n"
+				out.write("\t\t\t<period>\n")
+				out.write("\t\t\t\t<name>" + str(period) + "</name>\n")
+				out.write("\t\t\t\t<authors>\n")
+				multiplier = timeline_data.get_multiplier(period, 24)
 
 				for name in names:
 					if timeline_data.is_author_in_period(period, name[0]):
-						multiplier = timeline_data.get_multiplier(period, 24)
 						signs = timeline_data.get_author_signs_in_period(name[0], period, multiplier)
 						signs_str = (signs[1] * "-" + signs[0] * "+")
 
 						if len(signs_str) == 0:
 							signs_str = "."
 
-						authors_xml += "\t\t\t\t\t<author>\n\t\t\t\t\t\t<name>" + name[0] + "</name>\n"
-						authors_xml += "\t\t\t\t\t\t<gravatar>" + gravatar.get_url(name[1]) + "</gravatar>\n"
-						authors_xml += "\t\t\t\t\t\t<work>" + signs_str + "</work>\n\t\t\t\t\t</author>\n"
+						out.write("\t\t\t\t\t<author>\n\t\t\t\t\t\t<name>" + name[0] + "</name>\n")
+						out.write("\t\t\t\t\t\t<gravatar>" + gravatar.get_url(name[1]) + "</gravatar>\n")
+						out.write("\t\t\t\t\t\t<work>" + signs_str + "</work>\n\t\t\t\t\t</author>\n")
+
+				out.write("\t\t\t\t</authors>\n")
+				out.write("\t\t\t\t<modified_rows>" + str(timeline_data.get_total_changes_in_period(period)[2]) +
+				          "</modified_rows>\n")
+				out.write("\t\t\t</period>\n")
 
-				authors_xml += "\t\t\t\t</authors>\n"
-				modified_rows_xml = "\t\t\t\t<modified_rows>" + \
-				                    str(timeline_data.get_total_changes_in_period(period)[2]) + "</modified_rows>\n"
-				timeline_xml += "\t\t\t<period>\n" + name_xml + authors_xml + modified_rows_xml + "\t\t\t</period>\n"
+			out.writeln("\t\t</periods>\n\t</timeline>")
+
+	def output_json(self):
+		if self.changes.get_commits():
+			timeline_data = self.timeline_data
+			records.begin("timeline")
+
+			for period in timeline_data.get_periods():
+				for name in timeline_data.get_authors():
+					if timeline_data.is_author_in_period(period, name[0]):
+						(insertions, deletions) = timeline_data.get_author_changes_in_period(name[0], period)
+						records.output({"period": period, "length": self.granularity, "name": name[0], "email": name[1],
+						                "insertions": insertions, "deletions": deletions})
 
-			print("\t<timeline>\n" + message_xml + periods_xml + timeline_xml + "\t\t</periods>\n\t</timeline>")
+			records.end()
@@ -0,0 +1,112 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Records what ran when as spans in the Chrome trace event format, which can be loaded into chrome://tracing or Perfetto.
+# Spans are recorded for every git process, stage, worker, parse phase, lock wait and rendered section. Timestamps are
+# taken from the wall clock, so that spans recorded by other processes (such as the workers of batch mode) line up with
+# those of this one.
+
+__enabled__ = False
+__events__ = []
+__threads__ = {}
+__lock__ = threading.Lock()
+
+def is_enabled():
+	return __enabled__
+
+def set_enabled(enabled):
+	global __enabled__
+	__enabled__ = enabled
+	reset()
+
+def reset():
+	with __lock__:
+		del __events__[:]
+		__threads__.clear()
+
+def __get_thread_id__():
+	thread = threading.current_thread()
+
+	with __lock__:
+		thread_id = __threads__.get(thread.ident, None)
+
+		if thread_id == None:
+			thread_id = __threads__[thread.ident] = len(__threads__) + 1
+			__events__.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread_id,
+			                   "args": {"name": thread.name}})
+
+	return thread_id
+
+# The start and end of a span are given in seconds since the epoch, as returned by time.time().
+
+def add_span(name, category, start, end, args=None, pid=None, thread_id=None):
+	if not __enabled__:
+		return
+
+	event = {"name": name, "cat": category, "ph": "X", "ts": int(start * 1000000),
+	         "dur": max(0, int((end - start) * 1000000)), "pid": pid if pid else os.getpid(),
+	         "tid": thread_id if thread_id else __get_thread_id__()}
+
+	if args:
+		event["args"] = args
+
+	__events__.append(event)
+
+def add_events(events):
+	with __lock__:
+		__events__.extend(events)
+
+def get_events():
+	with __lock__:
+		return list(__events__)
+
+@contextlib.contextmanager
+def span(name, category, args=None):
+	if not __enabled__:
+		yield
+		return
+
+	start = time.time()
+
+	try:
+		yield
+	finally:
+		add_span(name, category, start, time.time(), args)
+
+def acquire(lock, name):
+	if not __enabled__:
+		lock.acquire()
+		return
+
+	start = time.time()
+	lock.acquire()
+	add_span(name, "lock", start, time.time())
+
+def output(file_name):
+	with open(file_name, "w") as trace_file:
+		trace_file.write(json.dumps({"traceEvents": get_events(), "displayTimeUnit": "ms"}, separators=(",", ":")))
+		trace_file.write("\n")
@@ -22,18 +22,18 @@ from __future__ import unicode_literals
 
 try:
 	import localization
-	localization.init()
 except:
-	import gitinspector.localization
-	gitinspector.localization.init()
+	import gitinspector.localization as localization
+
+localization.init()
 
 __version__ = "0.4.2dev"
 
-__doc__ = _("""Copyright © 2012-2015 Ejwa Software. All rights reserved.
+__doc__ = localization.N_("""Copyright © 2012-2015 Ejwa Software. All rights reserved.
 License GPLv3+: GNU GPL version 3 or later <http://gnu.org/licenses/gpl.html>.
 This is free software: you are free to change and redistribute it.
 There is NO WARRANTY, to the extent permitted by law.
 
 Written by Adam Waldenberg.""")
 def output():
-	print("gitinspector {0}\n".format(__version__) + __doc__)
+	print("gitinspector {0}\n".format(__version__) + _(__doc__))
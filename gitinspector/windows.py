@@ -0,0 +1,273 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from localization import N_
+from outputable import Outputable
+import datetime
+import format
+import gravatar
+import interval
+import optval
+import records
+import session
+import terminal
+import textwrap
+import timeline
+import writer
+
+# The changes can be split into several time windows, given either as a comma separated list of date ranges (such as
+# 2015-01-01..2015-03-31, where either end can be left out) or as a number of periods of one of the granularities of
+# the timeline, ending with the period of the last commit (such as quarter:4). Both ends of a window are inclusive, so
+# a window can not end before it starts.
+#
+# The history is only parsed once; the changes of each window are taken from the commits already parsed. The blame is
+# likewise only fetched once, for the last commit of the last window.
+
+PERIOD_DAYS = {"day": 1, "week": 7, "month": 31, "quarter": 92, "year": 366}
+
+class Window(object):
+	def __init__(self, label, since, until):
+		self.label = label
+		self.since = since
+		self.until = until
+		self.changes = None
+
+	def get_range(self):
+		return (self.since if self.since else "") + ".." + (self.until if self.until else "")
+
+	def get_title(self):
+		return self.label if self.label == self.get_range() else self.label + " (" + self.get_range() + ")"
+
+def __get_date__(string):
+	try:
+		return datetime.datetime.strptime(string, "%Y-%m-%d").date()
+	except ValueError:
+		return None
+
+def __get_period_start__(date, granularity):
+	if granularity == "day":
+		return date
+	elif granularity == "week":
+		return date - datetime.timedelta(days=date.weekday())
+	elif granularity == "quarter":
+		return datetime.date(date.year, 3 * ((date.month - 1) // 3) + 1, 1)
+	elif granularity == "year":
+		return datetime.date(date.year, 1, 1)
+
+	return datetime.date(date.year, date.month, 1)
+
+def __get_periods__(granularity, count, last_date):
+	starts = [__get_period_start__(last_date, granularity)]
+
+	for i in range(1, count):
+		starts.insert(0, __get_period_start__(starts[0] - datetime.timedelta(days=1), granularity))
+
+	starts.append(__get_period_start__(starts[-1] + datetime.timedelta(days=PERIOD_DAYS[granularity]), granularity))
+	windows = []
+
+	for (start, end) in zip(starts[:-1], starts[1:]):
+		since = start.isoformat()
+		windows.append(Window(timeline.get_buckets([since], granularity)[since][1], since,
+		                      (end - datetime.timedelta(days=1)).isoformat()))
+
+	return windows
+
+# Returns the windows described by spec; periods end with the one of last_date (today, unless given).
+
+def parse(spec, last_date=None):
+	if ":" in spec:
+		(granularity, count) = spec.split(":", 1)
+
+		if granularity in timeline.GRANULARITIES and count.isdigit() and int(count) > 0:
+			return __get_periods__(granularity, int(count), last_date if last_date else datetime.date.today())
+	else:
+		windows = []
+
+		for i in spec.split(","):
+			dates = i.strip().split("..")
+
+			if len(dates) != 2 or [j for j in dates if j and __get_date__(j) == None]:
+				break
+			elif dates[0] and dates[1] and __get_date__(dates[0]) > __get_date__(dates[1]):
+				break
+
+			windows.append(Window(i.strip(), dates[0] if dates[0] else None, dates[1] if dates[1] else None))
+		else:
+			return windows
+
+	raise optval.InvalidOptionArgument(_("specified time windows not valid."))
+
+# Splits the parsed changes into windows. When every window ends before the last commit, the revision to blame becomes
+# the last commit of the last window.
+
+def get(spec, changes):
+	commits = changes.get_commits()
+	windows = parse(spec, __get_date__(commits[-1].date) if commits else None)
+	until = get_until(windows)
+
+	for i in windows:
+		i.changes = changes.get_window(i.since, i.until)
+
+	if commits and until != None and commits[-1].date > until:
+		previous_commits = [i for i in commits if i.date <= until]
+
+		if previous_commits:
+			interval.set_ref(previous_commits[-1].sha)
+
+	return windows
+
+# Returns the end of the last window, or None if any of the windows is left open.
+
+def get_until(windows):
+	untils = [i.until for i in windows]
+	return None if None in untils else max(untils)
+
+def get_revision():
+	return interval.get_ref() if interval.get_ref() != "HEAD" else session.get().head
+
+WINDOWS_INFO_TEXT = N_("The following commit information, by author, was found in each of the time windows")
+NO_COMMITED_FILES_IN_WINDOW_TEXT = N_("No commited files with the specified extensions were found in this time window")
+
+def __get_percentage__(authorinfo, total_changes):
+	return 0 if total_changes == 0 else (authorinfo.insertions + authorinfo.deletions) / total_changes * 100
+
+class WindowsOutput(Outputable):
+	def __init__(self, windows):
+		self.windows = windows
+		Outputable.__init__(self)
+
+	def output_html(self):
+		out = writer.get()
+		out.write("<div><div class=\"box\" id=\"windows\">")
+		out.write("<p>" + _(WINDOWS_INFO_TEXT) + ".</p>")
+
+		for window in self.windows:
+			authorinfo_list = window.changes.get_authorinfo_list()
+			total_changes = float(window.changes.get_total_changes())
+			out.write("<h4>" + window.get_title() + "</h4>")
+
+			if not authorinfo_list:
+				out.write("<p>" + _(NO_COMMITED_FILES_IN_WINDOW_TEXT) + ".</p>")
+				continue
+
+			out.write("<div><table class=\"git\">")
+			out.write("<thead><tr> <th>{0}</th> <th>{1}</th> <th>{2}</th> <th>{3}</th> <th>{4}</th>".format(
+			          _("Author"), _("Commits"), _("Insertions"), _("Deletions"), _("% of changes")))
+			out.write("</tr></thead><tbody>")
+
+			for i, entry in enumerate(sorted(authorinfo_list)):
+				authorinfo = authorinfo_list.get(entry)
+				out.write("<tr " + ("class=\"odd\">" if i % 2 == 1 else ">"))
+
+				if format.get_selected() == "html":
+					out.write("<td><img src=\"{0}\"/>{1}</td>".format(
+					          gravatar.get_url(window.changes.get_latest_email_by_author(entry)), entry))
+				else:
+					out.write("<td>" + entry + "</td>")
+
+				out.write("<td>" + str(authorinfo.commits) + "</td>")
+				out.write("<td>" + str(authorinfo.insertions) + "</td>")
+				out.write("<td>" + str(authorinfo.deletions) + "</td>")
+				out.write("<td>" + "{0:.2f}".format(__get_percentage__(authorinfo, total_changes)) + "</td>")
+				out.write("</tr>")
+
+			out.write("<tfoot><tr> <td colspan=\"5\">&nbsp;</td> </tr></tfoot></tbody></table></div>")
+
+		out.writeln("</div></div>")
+
+	def output_text(self):
+		out = writer.get()
+		out.writeln()
+		out.writeln(textwrap.fill(_(WINDOWS_INFO_TEXT) + ":", width=terminal.get_size()[0]))
+
+		for window in self.windows:
+			authorinfo_list = window.changes.get_authorinfo_list()
+			total_changes = float(window.changes.get_total_changes())
+			out.writeln()
+			out.writeln(window.get_title() + ":")
+
+			if not authorinfo_list:
+				out.writeln(_(NO_COMMITED_FILES_IN_WINDOW_TEXT) + ".")
+				continue
+
+			out.writeln(terminal.bold(terminal.ljust(_("Author"), 21) + terminal.rjust(_("Commits"), 13) +
+			                          terminal.rjust(_("Insertions"), 14) + terminal.rjust(_("Deletions"), 15) +
+			                          terminal.rjust(_("% of changes"), 16)))
+
+			for i in sorted(authorinfo_list):
+				authorinfo = authorinfo_list.get(i)
+				out.write(terminal.ljust(i, 20)[0:20 - terminal.get_excess_column_count(i)] + " ")
+				out.write(str(authorinfo.commits).rjust(13) + " ")
+				out.write(str(authorinfo.insertions).rjust(13) + " ")
+				out.write(str(authorinfo.deletions).rjust(14) + " ")
+				out.writeln("{0:.2f}".format(__get_percentage__(authorinfo, total_changes)).rjust(15))
+
+	def output_xml(self):
+		out = writer.get()
+		out.write("\t<windows>\n\t\t<message>" + _(WINDOWS_INFO_TEXT) + "</message>\n")
+
+		for window in self.windows:
+			authorinfo_list = window.changes.get_authorinfo_list()
+			total_changes = float(window.changes.get_total_changes())
+			out.write("\t\t<window>\n\t\t\t<label>" + window.label + "</label>\n")
+			out.write("\t\t\t<since>" + window.since + "</since>\n" if window.since else "")
+			out.write("\t\t\t<until>" + window.until + "</until>\n" if window.until else "")
+			out.write("\t\t\t<authors>\n")
+
+			for i in sorted(authorinfo_list):
+				authorinfo = authorinfo_list.get(i)
+				out.write("\t\t\t\t<author>\n")
+				out.write("\t\t\t\t\t<name>" + i + "</name>\n")
+				out.write("\t\t\t\t\t<gravatar>" + gravatar.get_url(window.changes.get_latest_email_by_author(i)) +
+				          "</gravatar>\n")
+				out.write("\t\t\t\t\t<commits>" + str(authorinfo.commits) + "</commits>\n")
+				out.write("\t\t\t\t\t<insertions>" + str(authorinfo.insertions) + "</insertions>\n")
+				out.write("\t\t\t\t\t<deletions>" + str(authorinfo.deletions) + "</deletions>\n")
+				out.write("\t\t\t\t\t<percentage-of-changes>" + "{0:.2f}".format(__get_percentage__(authorinfo,
+				          total_changes)) + "</percentage-of-changes>\n")
+				out.write("\t\t\t\t</author>\n")
+
+			out.write("\t\t\t</authors>\n\t\t</window>\n")
+
+		out.writeln("\t</windows>")
+
+	# Windows without any commits are given a record of their own, without an author, so that they are still listed.
+
+	def output_json(self):
+		records.begin("windows")
+
+		for window in self.windows:
+			authorinfo_list = window.changes.get_authorinfo_list()
+			total_changes = float(window.changes.get_total_changes())
+
+			if not authorinfo_list:
+				records.output({"window": window.label, "since": window.since, "until": window.until, "name": None,
+				                "email": None, "commits": 0, "insertions": 0, "deletions": 0, "percentage_of_changes": 0})
+
+			for i in sorted(authorinfo_list):
+				authorinfo = authorinfo_list.get(i)
+				records.output({"window": window.label, "since": window.since, "until": window.until, "name": i,
+				                "email": window.changes.get_latest_email_by_author(i), "commits": authorinfo.commits,
+				                "insertions": authorinfo.insertions, "deletions": authorinfo.deletions,
+				                "percentage_of_changes": __get_percentage__(authorinfo, total_changes)})
+
+		records.end()
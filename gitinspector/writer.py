@@ -0,0 +1,64 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+import session
+import sys
+
+BUFFER_SIZE = 64 * 1024
+
+# Report sections are streamed through a writer as they are produced, rather than being concatenated into one string
+# and printed at the end. Written strings are collected in a list and joined, and written to the output stream, once
+# BUFFER_SIZE characters have accumulated (or when the writer is flushed). This keeps rendering linear in the size of the
+# output while only holding a small part of it in memory.
+
+class Writer(object):
+	def __init__(self, stream=None):
+		self.stream = stream
+		self.buffer = []
+		self.length = 0
+
+	def write(self, string):
+		self.buffer.append(string)
+		self.length += len(string)
+
+		if self.length >= BUFFER_SIZE:
+			self.flush()
+
+	def writeln(self, string=""):
+		self.write(string + "\n")
+
+	def flush(self):
+		if self.buffer:
+			# The stream is looked up when flushing, since sys.stdout might have been replaced after the writer was created.
+			print("".join(self.buffer), end="", file=self.stream if self.stream else sys.stdout)
+			self.buffer = []
+			self.length = 0
+
+def get():
+	if session.get().writer == None:
+		session.get().writer = Writer()
+
+	return session.get().writer
+
+def set_stream(stream):
+	get().flush()
+	get().stream = stream
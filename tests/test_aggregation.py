@@ -0,0 +1,90 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import unittest2
+import gitinspector.aggregation
+
+# Every test is run twice; once with the NumPy backend (if NumPy is installed) and once with the pure Python fallback.
+
+class AggregationTest(unittest2.TestCase):
+	def __backends__(self):
+		backends = [None]
+
+		if gitinspector.aggregation.has_numpy():
+			backends.append(gitinspector.aggregation.numpy)
+
+		return backends
+
+	def __run__(self, function, *args):
+		backends = self.__backends__()
+		numpy = gitinspector.aggregation.numpy
+		numpy_min_length = gitinspector.aggregation.NUMPY_MIN_LENGTH
+		results = []
+
+		try:
+			gitinspector.aggregation.NUMPY_MIN_LENGTH = 0
+
+			for backend in backends:
+				gitinspector.aggregation.numpy = backend
+				results.append(function(*args))
+		finally:
+			gitinspector.aggregation.numpy = numpy
+			gitinspector.aggregation.NUMPY_MIN_LENGTH = numpy_min_length
+
+		for result in results[1:]:
+			self.assertEqual(result, results[0])
+
+		return results[0]
+
+	def test_small_input_is_reduced_in_python(self):
+		self.assertEqual(gitinspector.aggregation.__get_numpy__(gitinspector.aggregation.NUMPY_MIN_LENGTH - 1), None)
+
+	def test_numpy_is_only_imported_for_large_input(self):
+		(numpy, numpy_imported) = (gitinspector.aggregation.numpy, gitinspector.aggregation.__numpy_imported__)
+
+		try:
+			gitinspector.aggregation.__numpy_imported__ = False
+			self.assertEqual(gitinspector.aggregation.__get_numpy__(gitinspector.aggregation.NUMPY_IMPORT_MIN_LENGTH - 1),
+			                 None)
+			self.assertFalse(gitinspector.aggregation.__numpy_imported__)
+		finally:
+			(gitinspector.aggregation.numpy, gitinspector.aggregation.__numpy_imported__) = (numpy, numpy_imported)
+
+	def test_index(self):
+		self.assertEqual(gitinspector.aggregation.index(["b", "a", "b", "c"]), (["b", "a", "c"], [0, 1, 0, 2]))
+
+	def test_sum_by_group(self):
+		self.assertEqual(self.__run__(gitinspector.aggregation.sum_by_group, [0, 2, 0, 2], [1, 2, 3, 4], 3), [4, 0, 6])
+		self.assertEqual(self.__run__(gitinspector.aggregation.sum_by_group, [], [], 2), [0, 0])
+
+	def test_sum_by_cell(self):
+		matrix = self.__run__(gitinspector.aggregation.sum_by_cell, [0, 1, 0], [1, 0, 1], [5, 6, 7], (2, 3))
+		self.assertEqual(matrix, [[0, 12, 0], [6, 0, 0]])
+		self.assertEqual(self.__run__(gitinspector.aggregation.column_sums, matrix, 3), [6, 12, 0])
+		self.assertEqual(self.__run__(gitinspector.aggregation.column_maxima, matrix, 3), [6, 12, 0])
+		self.assertEqual(self.__run__(gitinspector.aggregation.column_maxima, [], 2), [0, 0])
+
+	def test_several_columns(self):
+		self.assertEqual(self.__run__(gitinspector.aggregation.sums_by_group, [1, 0, 1], [[1, 2, 3], [4, 5, 6]], 2),
+		                 [[2, 4], [5, 10]])
+		self.assertEqual(self.__run__(gitinspector.aggregation.sums_by_cell, [0, 1, 0], [1, 0, 1], [[5, 6, 7], [1, 1, 1]],
+		                              (2, 2)), [[[0, 12], [6, 0]], [[0, 2], [1, 0]]])
+		self.assertEqual(self.__run__(gitinspector.aggregation.sums_by_cell, [], [], [[]], (0, 3)), [[]])
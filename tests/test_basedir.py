@@ -0,0 +1,73 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest2
+import gitinspector.basedir
+import gitinspector.config
+import gitinspector.localization
+
+class RepositoryInfoTest(unittest2.TestCase):
+	def setUp(self):
+		gitinspector.localization.init()
+		self.directory = os.path.realpath(tempfile.mkdtemp(suffix=".gitinspector"))
+		self.repository = os.path.join(self.directory, "repository")
+		subprocess.check_call(["git", "init", "-q", self.repository])
+
+	def tearDown(self):
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __commit__(self):
+		os.mkdir(os.path.join(self.repository, "subdirectory"))
+
+		with open(os.path.join(self.repository, "subdirectory", "file.py"), "w") as file_w:
+			file_w.write("a = 1\n")
+
+		subprocess.check_call(["git", "add", "."], cwd=self.repository)
+		subprocess.check_call(["git", "-c", "user.name=Alice", "-c", "user.email=alice@example.com", "commit", "-q", "-m",
+		                       "Commit"], cwd=self.repository)
+		return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=self.repository).decode("utf-8").strip()
+
+	def test_empty_repository(self):
+		self.assertEqual(gitinspector.basedir.get_repository_info(self.repository), (False, self.repository, None))
+
+	def test_subdirectory(self):
+		head = self.__commit__()
+		self.assertEqual(gitinspector.basedir.get_repository_info(os.path.join(self.repository, "subdirectory")),
+		                 (False, self.repository, head))
+
+	def test_bare_repository(self):
+		head = self.__commit__()
+		bare = os.path.join(self.directory, "bare.git")
+		subprocess.check_call(["git", "clone", "-q", "--bare", self.repository, bare])
+		self.assertEqual(gitinspector.basedir.get_repository_info(bare), (True, bare, head))
+
+	def test_read_git_config(self):
+		subprocess.check_call(["git", "config", "inspector.hard", "true"], cwd=self.repository)
+		subprocess.check_call(["git", "config", "inspector.file-types", "py,c"], cwd=self.repository)
+		subprocess.check_call(["git", "config", "inspector.since", ""], cwd=self.repository)
+		subprocess.check_call(["git", "config", "user.name", "Alice"], cwd=self.repository)
+
+		self.assertEqual(gitinspector.config.__read_git_config__(self.repository),
+		                 {"hard": "true", "file-types": "py,c", "since": ""})
@@ -0,0 +1,116 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import io
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest2
+import gitinspector.batch
+import gitinspector.blame
+import gitinspector.changes
+import gitinspector.gitinspector
+import gitinspector.metrics
+import gitinspector.session
+import gitinspector.stats
+import gitinspector.writer
+
+class BatchTest(unittest2.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+
+	def tearDown(self):
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def test_read_manifest(self):
+		manifest_file = io.open(os.path.join(self.directory, "manifest"), "w", encoding="utf-8")
+		manifest_file.write("# Repositories\n/srv/git/first.git\n\n  second  \n")
+		manifest_file.close()
+
+		self.assertEqual(gitinspector.batch.read_manifest(os.path.join(self.directory, "manifest")),
+		                 ["/srv/git/first.git", "second"])
+
+	def test_report_names_are_unique(self):
+		self.assertEqual(gitinspector.batch.__get_report_names__(["/a/first.git", "/b/first/", "second", "/c/first"]),
+		                 ["first", "first-2", "second", "first-3"])
+
+class BatchConfigurationTest(unittest2.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+		self.repositories = [self.__create_repository__("first", "author:Bob"), self.__create_repository__("second", None)]
+
+	def tearDown(self):
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __create_repository__(self, name, exclude):
+		repository = os.path.join(self.directory, name)
+		subprocess.check_call(["git", "init", "-q", repository])
+
+		if exclude:
+			subprocess.check_call(["git", "config", "inspector.exclude", exclude], cwd=repository)
+
+		for author in ["Alice", "Bob"]:
+			with open(os.path.join(repository, author + ".py"), "w") as file_w:
+				file_w.write("a = 1\n")
+
+			subprocess.check_call(["git", "add", "."], cwd=repository)
+			subprocess.check_call(["git", "-c", "user.name=" + author, "-c", "user.email=" + author + "@example.com",
+			                       "commit", "-q", "-m", author], cwd=repository)
+		return repository
+
+	def __run_batch__(self, options):
+		runner = gitinspector.gitinspector.Runner(gitinspector.session.AnalysisSession())
+		runner.options = options
+
+		with gitinspector.session.AnalysisSession():
+			gitinspector.writer.set_stream(io.StringIO())
+			return gitinspector.batch.run(runner, self.repositories, os.path.join(self.directory, "reports"))
+
+	def __run__(self, options):
+		return [(i["report"], i["authors"]) for i in self.__run_batch__(options)]
+
+	def test_each_repository_is_configured_on_its_own(self):
+		self.assertEqual(self.__run__([]), [("first", 1), ("second", 2)])
+
+	def test_options_override_configuration(self):
+		self.assertEqual(self.__run__([("-x", "author:Alice")]), [("first", 1), ("second", 1)])
+		self.assertEqual(self.__run__([("--exclude", "author:Nobody")]), [("first", 2), ("second", 2)])
+
+	def test_threads_are_capped_in_workers(self):
+		gitinspector.changes.set_num_threads(8)
+		gitinspector.blame.set_num_threads(8)
+		gitinspector.metrics.set_num_workers(2)
+		gitinspector.stats.set_enabled(True)
+
+		try:
+			summaries = self.__run_batch__([])
+		finally:
+			gitinspector.changes.set_num_threads(multiprocessing.cpu_count())
+			gitinspector.blame.set_num_threads(multiprocessing.cpu_count())
+			gitinspector.metrics.set_num_workers(multiprocessing.cpu_count())
+			gitinspector.stats.set_enabled(False)
+
+		# The workers share the processors out among their threads, rather than each using one thread per processor.
+		for summary in summaries:
+			self.assertEqual(summary["stats"]["stages"]["changes"]["workers"], max(1, multiprocessing.cpu_count() // 2))
+			self.assertEqual(summary["stats"]["stages"]["blame"]["workers"], max(1, multiprocessing.cpu_count() // 2))
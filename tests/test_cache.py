@@ -0,0 +1,172 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import unittest2
+import gitinspector.cache
+import gitinspector.metrics
+import gitinspector.session
+
+def __save_entries__(cache_dir, writer, start_event):
+	start_event.wait()
+
+	for i in range(25):
+		blob_cache = gitinspector.cache.BlobCache("metrics", cache_dir)
+		blob_cache.get("aa{0}-{1}:py:1".format(writer, i))
+		blob_cache.put("aa{0}-{1}:py:1".format(writer, i), [writer, i])
+		blob_cache.save()
+
+class BlobCacheTest(unittest2.TestCase):
+	def setUp(self):
+		self.cache_dir = tempfile.mkdtemp(suffix=".gitinspector")
+
+	def tearDown(self):
+		shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+	def test_persists_entries(self):
+		blob_cache = gitinspector.cache.BlobCache("metrics", self.cache_dir)
+		self.assertEqual(blob_cache.get("a1:py:1"), None)
+		blob_cache.put("a1:py:1", [10, 2])
+		blob_cache.save()
+
+		self.assertEqual(gitinspector.cache.BlobCache("metrics", self.cache_dir).get("a1:py:1"), [10, 2])
+
+	def test_entries_are_sharded(self):
+		blob_cache = gitinspector.cache.BlobCache("metrics", self.cache_dir)
+		blob_cache.put("a1:py:1", [10, 2])
+		blob_cache.put("b2:py:1", [20, 4])
+		blob_cache.save()
+
+		self.assertEqual(sorted(os.listdir(os.path.join(self.cache_dir, "metrics"))), ["a1.json", "b2.json"])
+
+	def test_least_recently_used_entries_are_evicted(self):
+		blob_cache = gitinspector.cache.BlobCache("metrics", self.cache_dir, max_entries=2)
+
+		for (i, key) in enumerate(["aa1:py:1", "aa2:py:1", "aa3:py:1"]):
+			blob_cache.put(key, [i, 0])
+			blob_cache.shards["aa"][key][1] -= 10 - i
+
+		blob_cache.save()
+		blob_cache = gitinspector.cache.BlobCache("metrics", self.cache_dir)
+		self.assertEqual([blob_cache.get(i) for i in ["aa1:py:1", "aa2:py:1", "aa3:py:1"]], [None, [1, 0], [2, 0]])
+
+	def test_save_waits_for_lock(self):
+		lock_path = os.path.join(self.cache_dir, "metrics", "aa.json.lock")
+		os.makedirs(os.path.dirname(lock_path))
+		open(lock_path, "w").close()
+
+		blob_cache = gitinspector.cache.BlobCache("metrics", self.cache_dir)
+		blob_cache.put("aa1:py:1", [10, 2])
+		thread = threading.Thread(target=blob_cache.save)
+		thread.start()
+
+		# Another writer saves its entry while holding the lock; the waiting writer has to merge with it.
+		time.sleep(0.1)
+		self.assertTrue(thread.is_alive())
+		with open(os.path.join(self.cache_dir, "metrics", "aa.json"), "wb") as shard_file:
+			shard_file.write(json.dumps({"aa2:py:1": [[20, 4], int(time.time())]}).encode("utf-8"))
+
+		os.remove(lock_path)
+		thread.join()
+
+		blob_cache = gitinspector.cache.BlobCache("metrics", self.cache_dir)
+		self.assertEqual((blob_cache.get("aa1:py:1"), blob_cache.get("aa2:py:1")), ([10, 2], [20, 4]))
+
+	def test_concurrent_writers(self):
+		start_event = multiprocessing.Event()
+		writers = [multiprocessing.Process(target=__save_entries__, args=(self.cache_dir, i, start_event))
+		           for i in range(4)]
+
+		for writer in writers:
+			writer.start()
+
+		start_event.set()
+
+		for writer in writers:
+			writer.join()
+
+		blob_cache = gitinspector.cache.BlobCache("metrics", self.cache_dir)
+		self.assertEqual(sorted(blob_cache.get("aa{0}-{1}:py:1".format(i, j)) for i in range(4) for j in range(25)),
+		                 [[i, j] for i in range(4) for j in range(25)])
+		self.assertEqual(os.listdir(os.path.join(self.cache_dir, "metrics")), ["aa.json"])
+
+	def test_ignores_corrupt_file(self):
+		os.makedirs(os.path.join(self.cache_dir, "metrics"))
+
+		with open(os.path.join(self.cache_dir, "metrics", "a1.json"), "wb") as cache_file:
+			cache_file.write(b"{not json")
+
+		self.assertEqual(gitinspector.cache.BlobCache("metrics", self.cache_dir).get("a1:py:1"), None)
+
+class MetricsCacheTest(unittest2.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+		self.cache_dir = os.environ.get("GITINSPECTOR_CACHE_DIR", None)
+		os.environ["GITINSPECTOR_CACHE_DIR"] = os.path.join(self.directory, "cache")
+		gitinspector.cache.set_enabled(True)
+		gitinspector.metrics.set_num_workers(1)
+
+		self.repository = os.path.join(self.directory, "repository")
+		subprocess.check_call(["git", "init", "-q", self.repository])
+
+		with open(os.path.join(self.repository, "file.py"), "w") as file_w:
+			file_w.write("a = 1\nb = 2\n")
+
+		subprocess.check_call(["git", "add", "."], cwd=self.repository)
+		subprocess.check_call(["git", "-c", "user.name=Alice", "-c", "user.email=alice@example.com", "commit", "-q", "-m",
+		                       "Commit"], cwd=self.repository)
+		self.blob = (subprocess.check_output(["git", "rev-parse", "HEAD:file.py"], cwd=self.repository).
+		             decode("utf-8").strip(), "py")
+
+	def tearDown(self):
+		gitinspector.metrics.set_num_workers(multiprocessing.cpu_count())
+
+		if self.cache_dir:
+			os.environ["GITINSPECTOR_CACHE_DIR"] = self.cache_dir
+		else:
+			del os.environ["GITINSPECTOR_CACHE_DIR"]
+
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __get_total_eloc__(self):
+		analysis_session = gitinspector.session.AnalysisSession()
+		analysis_session.directory = self.repository
+
+		with analysis_session:
+			return gitinspector.metrics.MetricsLogic("HEAD").total_eloc
+
+	def test_metrics_are_cached(self):
+		key = gitinspector.metrics.__get_cache_key__(self.blob)
+		self.assertEqual(self.__get_total_eloc__(), 2)
+		self.assertEqual(gitinspector.cache.BlobCache("metrics").get(key), [2, 0])
+
+		# The cached metrics are used instead of computing them again.
+		blob_cache = gitinspector.cache.BlobCache("metrics")
+		blob_cache.put(key, [1000, 0])
+		blob_cache.save()
+		self.assertEqual(self.__get_total_eloc__(), 1000)
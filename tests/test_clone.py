@@ -0,0 +1,107 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest2
+import gitinspector.clone
+import gitinspector.localization
+
+class CloneTest(unittest2.TestCase):
+	def setUp(self):
+		gitinspector.localization.init()
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+		self.cache_dir = os.environ.get("GITINSPECTOR_CACHE_DIR", None)
+		os.environ["GITINSPECTOR_CACHE_DIR"] = os.path.join(self.directory, "cache")
+
+		self.repository = os.path.join(self.directory, "repository")
+		self.url = "file://" + self.repository
+		subprocess.check_call(["git", "init", "-q", self.repository])
+		self.__git__(self.repository, "config", "uploadpack.allowFilter", "true")
+
+		for i in range(1, 6):
+			self.__commit__("2015-0{0}-10".format(i))
+
+	def tearDown(self):
+		gitinspector.clone.delete()
+		gitinspector.clone.set_mode("full")
+		gitinspector.clone.set_mirror(False)
+		gitinspector.clone.set_since(None)
+
+		if self.cache_dir:
+			os.environ["GITINSPECTOR_CACHE_DIR"] = self.cache_dir
+		else:
+			del os.environ["GITINSPECTOR_CACHE_DIR"]
+
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __git__(self, directory, *args):
+		return subprocess.check_output(["git"] + list(args), cwd=directory).decode("utf-8").strip()
+
+	def __commit__(self, date):
+		with open(os.path.join(self.repository, "file.py"), "a") as file_a:
+			file_a.write("a = '{0}'\n".format(date))
+
+		env = dict(os.environ, GIT_AUTHOR_NAME="Alice", GIT_AUTHOR_EMAIL="alice@example.com",
+		           GIT_COMMITTER_NAME="Alice", GIT_COMMITTER_EMAIL="alice@example.com",
+		           GIT_AUTHOR_DATE=date + "T12:00:00", GIT_COMMITTER_DATE=date + "T12:00:00")
+		subprocess.check_call(["git", "add", "file.py"], cwd=self.repository)
+		subprocess.check_call(["git", "commit", "-q", "-m", "Commit of " + date], cwd=self.repository, env=env)
+
+	def test_local_path_is_not_cloned(self):
+		self.assertEqual(gitinspector.clone.create(self.repository), self.repository)
+
+	def test_temporary_clone_is_deleted(self):
+		location = gitinspector.clone.create(self.url)
+		self.assertEqual(self.__git__(location, "rev-parse", "HEAD"), self.__git__(self.repository, "rev-parse", "HEAD"))
+
+		gitinspector.clone.delete()
+		self.assertFalse(os.path.exists(location))
+
+	def test_mirror_is_updated(self):
+		gitinspector.clone.set_mirror(True)
+		location = gitinspector.clone.create(self.url)
+		self.assertEqual(location, gitinspector.clone.get_mirror_path(self.url))
+		self.assertTrue(location.startswith(os.path.join(self.directory, "cache", "mirrors")))
+
+		self.__commit__("2015-06-10")
+		self.assertEqual(gitinspector.clone.create(self.url), location)
+		self.assertEqual(self.__git__(location, "rev-parse", "HEAD"), self.__git__(self.repository, "rev-parse", "HEAD"))
+
+		gitinspector.clone.delete()
+		self.assertTrue(os.path.isdir(location))
+
+	def test_partial_clone(self):
+		gitinspector.clone.set_mode("partial")
+		location = gitinspector.clone.create(self.url)
+		self.assertEqual(self.__git__(location, "config", "remote.origin.partialclonefilter"), "blob:none")
+		self.assertEqual(self.__git__(location, "show", "HEAD:file.py").count("\n"), 4)
+
+	def test_shallow_clone_includes_parents(self):
+		gitinspector.clone.set_mode("shallow")
+		gitinspector.clone.set_since("2015-03-01")
+		location = gitinspector.clone.create(self.url)
+
+		self.assertEqual(self.__git__(location, "rev-list", "--count", "HEAD"), "4")
+		self.assertEqual(self.__git__(location, "rev-list", "--count", "--since=2015-03-01", "HEAD"), "3")
+		self.assertEqual(self.__git__(location, "rev-parse", "--is-shallow-repository"), "true")
@@ -39,6 +39,15 @@ def __test_extension__(commented_file, extension):
 
 	return comment_counter
 
+def __test_extension_buffer__(commented_file, extension):
+	base = os.path.dirname(os.path.realpath(__file__))
+	tex_file = open(base + commented_file, "rb")
+	tex = tex_file.read()
+	tex_file.close()
+
+	flags = gitinspector.comment.classify(extension, tex)
+	return len([i for i in flags if i & (gitinspector.comment.COMMENT | gitinspector.comment.INSIDE_COMMENT)])
+
 class TexFileTest(unittest2.TestCase):
     def test(self):
 	comment_counter = __test_extension__("/resources/commented_file.tex", "tex")
@@ -48,3 +57,13 @@ class CppFileTest(unittest2.TestCase):
     def test(self):
 	comment_counter = __test_extension__("/resources/commented_file.cpp", "cpp")
 	self.assertEqual(comment_counter, 25)
+
+class TexBufferTest(unittest2.TestCase):
+    def test(self):
+	comment_counter = __test_extension_buffer__("/resources/commented_file.tex", "tex")
+	self.assertEqual(comment_counter, 30)
+
+class CppBufferTest(unittest2.TestCase):
+    def test(self):
+	comment_counter = __test_extension_buffer__("/resources/commented_file.cpp", "cpp")
+	self.assertEqual(comment_counter, 25)
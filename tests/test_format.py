@@ -0,0 +1,32 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import unittest2
+import gitinspector.format
+
+class TargetsTest(unittest2.TestCase):
+	def test_parse_targets(self):
+		self.assertEqual(gitinspector.format.parse_targets("html:report.html,xml:report.xml,text"),
+		                 [("html", "report.html"), ("xml", "report.xml"), ("text", None)])
+
+	def test_invalid_format(self):
+		with self.assertRaises(gitinspector.format.InvalidFormatError):
+			gitinspector.format.parse_targets("html:report.html,pdf:report.pdf")
@@ -0,0 +1,113 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest2
+import gitinspector.gitcommand
+import gitinspector.localization
+
+GITINSPECTOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gitinspector", "gitinspector.py")
+
+class GitCommandTest(unittest2.TestCase):
+	def setUp(self):
+		gitinspector.localization.init()
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+		self.transcript = os.path.join(self.directory, "transcript.jsonl")
+		self.repository = os.path.join(self.directory, "repository")
+		subprocess.check_call(["git", "init", "-q", self.repository])
+
+		with open(os.path.join(self.repository, "file.py"), "w") as file_w:
+			file_w.write("a = 1\n")
+
+		subprocess.check_call(["git", "add", "."], cwd=self.repository)
+		subprocess.check_call(["git", "-c", "user.name=Alice", "-c", "user.email=alice@example.com", "commit", "-q", "-m",
+		                       "Commit"], cwd=self.repository)
+
+	def tearDown(self):
+		gitinspector.gitcommand.record(None)
+		gitinspector.gitcommand.replay(None)
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __run__(self):
+		return (gitinspector.gitcommand.read_lines(["ls-tree", "--name-only", "-r", "HEAD"], cwd=self.repository),
+		        gitinspector.gitcommand.run(["rev-parse", "--verify", "-q", "nonexistent"], cwd=self.repository, quiet=True),
+		        gitinspector.gitcommand.read(["log", "--pretty=%aN"], cwd=self.repository))
+
+	def test_record_and_replay(self):
+		gitinspector.gitcommand.record(self.transcript)
+		recorded = self.__run__()
+		gitinspector.gitcommand.record(None)
+
+		shutil.rmtree(self.repository)
+		gitinspector.gitcommand.replay(self.transcript)
+
+		self.assertEqual(recorded, ([b"file.py\n"], (1, b""), b"Alice\n"))
+		self.assertEqual(self.__run__(), recorded)
+
+	def test_replayed_in_order(self):
+		gitinspector.gitcommand.record(self.transcript)
+		first = gitinspector.gitcommand.read(["rev-parse", "HEAD"], cwd=self.repository)
+		subprocess.check_call(["git", "-c", "user.name=Bob", "-c", "user.email=bob@example.com", "commit", "-q",
+		                       "--allow-empty", "-m", "Empty"], cwd=self.repository)
+		second = gitinspector.gitcommand.read(["rev-parse", "HEAD"], cwd=self.repository)
+		gitinspector.gitcommand.record(None)
+
+		gitinspector.gitcommand.replay(self.transcript)
+		self.assertEqual([gitinspector.gitcommand.read(["rev-parse", "HEAD"], cwd="elsewhere") for i in range(3)],
+		                 [first, second, second])
+
+	def test_queue_is_shared_by_both_keys(self):
+		gitinspector.gitcommand.record(self.transcript)
+		first = gitinspector.gitcommand.read(["rev-parse", "HEAD"], cwd=self.repository)
+		subprocess.check_call(["git", "-c", "user.name=Bob", "-c", "user.email=bob@example.com", "commit", "-q",
+		                       "--allow-empty", "-m", "Empty"], cwd=self.repository)
+		second = gitinspector.gitcommand.read(["rev-parse", "HEAD"], cwd=self.repository)
+		gitinspector.gitcommand.record(None)
+
+		gitinspector.gitcommand.replay(self.transcript)
+		self.assertEqual([gitinspector.gitcommand.read(["rev-parse", "HEAD"], cwd=i)
+		                  for i in [self.repository, "elsewhere", self.repository]], [first, second, second])
+
+	def test_missing_command(self):
+		open(self.transcript, "w").close()
+		gitinspector.gitcommand.replay(self.transcript)
+
+		with open(os.devnull, "w") as devnull:
+			stderr = os.dup(2)
+			os.dup2(devnull.fileno(), 2)
+
+			try:
+				self.assertEqual(gitinspector.gitcommand.run(["status"]), (128, b""))
+			finally:
+				os.dup2(stderr, 2)
+				os.close(stderr)
+
+		self.assertEqual(gitinspector.gitcommand.get_missing_count(), 1)
+
+	def test_replay_with_missing_commands_fails(self):
+		open(self.transcript, "w").close()
+		returncode = subprocess.call([sys.executable, GITINSPECTOR, "--replay-transcript=" + self.transcript,
+		                              self.repository], stdout=open(os.devnull, "w"), stderr=open(os.devnull, "w"))
+		self.assertNotEqual(returncode, 0)
@@ -0,0 +1,210 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import base64
+import io
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import unittest2
+import gitinspector.cache
+import gitinspector.gitcommand
+import gitinspector.gitinspector
+import gitinspector.interval
+import gitinspector.metrics
+import gitinspector.session
+import gitinspector.writer
+
+def __read_resource__(name):
+	base = os.path.dirname(os.path.realpath(__file__))
+	resource_file = open(base + name, "rb")
+	lines = resource_file.readlines()
+	resource_file.close()
+	return lines
+
+class CppFileTest(unittest2.TestCase):
+	def test(self):
+		lines = __read_resource__("/resources/commented_file.cpp")
+		self.assertEqual(gitinspector.metrics.MetricsLogic.get_eloc_and_cyclomatic_complexity(lines, "cpp"), (42, 1))
+
+class PythonTokensTest(unittest2.TestCase):
+	def test(self):
+		lines = [b"def f(x):\n", b"\tif x:\n", b"\t\treturn 1\n", b"\telif x < 0:\n", b"\t\treturn -1\n",
+		         b"\t# if x:\n", b"\twhile x: break\n"]
+		self.assertEqual(gitinspector.metrics.MetricsLogic.get_eloc_and_cyclomatic_complexity(lines, "py"), (6, 7))
+
+class UnknownExtensionTest(unittest2.TestCase):
+	def test(self):
+		lines = __read_resource__("/resources/commented_file.tex")
+		self.assertEqual(gitinspector.metrics.MetricsLogic.get_cyclomatic_complexity(lines, "tex"), -1)
+
+class ReadBlobsTest(unittest2.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+		subprocess.check_call(["git", "init", "-q", self.directory])
+		self.shas = [self.__add_blob__("a = 1\n"), self.__add_blob__("b = 2\n")]
+
+	def tearDown(self):
+		gitinspector.gitcommand.record(None)
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __add_blob__(self, content):
+		process = subprocess.Popen(["git", "hash-object", "-w", "--stdin"], cwd=self.directory, stdin=subprocess.PIPE,
+		                           stdout=subprocess.PIPE)
+		return process.communicate(content.encode("utf-8"))[0].decode("utf-8").strip()
+
+	def __get_recorded_commands__(self, transcript):
+		with open(transcript, "rb") as transcript_file:
+			return [json.loads(i.decode("utf-8"))["args"] for i in transcript_file]
+
+	def test_read_blobs(self):
+		self.assertEqual(list(gitinspector.metrics.__read_blobs__(self.shas, self.directory)), [b"a = 1\n", b"b = 2\n"])
+
+	def test_process_is_closed_when_stopping_early(self):
+		transcript = os.path.join(self.directory, "transcript.jsonl")
+		gitinspector.gitcommand.record(transcript)
+		contents = gitinspector.metrics.__read_blobs__(self.shas, self.directory)
+
+		self.assertEqual(next(contents), b"a = 1\n")
+		self.assertEqual(self.__get_recorded_commands__(transcript), [])
+
+		contents.close()
+		self.assertEqual(self.__get_recorded_commands__(transcript), [["cat-file", "--batch"]])
+
+class MetricsTrendTest(unittest2.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+		self.cache_enabled = gitinspector.cache.is_enabled()
+		gitinspector.cache.set_enabled(False)
+		gitinspector.metrics.set_num_workers(1)
+		subprocess.check_call(["git", "init", "-q", self.directory])
+
+		self.shas = []
+		self.__commit__("a.py", "a = 1\n")
+		self.__commit__("b.py", "b = 2\n")
+		self.__commit__("c.py", "c = 3\n")
+		self.__commit__("d.py", "d = 4\n")
+		self.__commit__("e.py", "e = 5\n")
+
+		self.session = gitinspector.session.AnalysisSession()
+		self.session.directory = self.directory
+
+	def tearDown(self):
+		gitinspector.gitcommand.record(None)
+		gitinspector.cache.set_enabled(self.cache_enabled)
+		gitinspector.metrics.set_num_workers(multiprocessing.cpu_count())
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __commit__(self, file_name, content):
+		with open(os.path.join(self.directory, file_name), "w") as file_w:
+			file_w.write(content)
+
+		subprocess.check_call(["git", "add", "."], cwd=self.directory)
+		subprocess.check_call(["git", "-c", "user.name=Alice", "-c", "user.email=alice@example.com", "commit", "-q", "-m",
+		                       file_name], cwd=self.directory)
+		self.shas.append(subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=self.directory).decode("utf-8").strip())
+		subprocess.check_call(["git", "tag", "v" + str(len(self.shas))], cwd=self.directory)
+
+	def test_stride(self):
+		with self.session:
+			revisions = gitinspector.metrics.MetricsTrend.get_revisions("2")
+
+		self.assertEqual(revisions, [(i[0:7], i) for i in [self.shas[1], self.shas[3], self.shas[4]]])
+
+	def test_refs(self):
+		revisions = gitinspector.metrics.MetricsTrend.get_revisions("v1, v3", self.directory)
+		self.assertEqual(revisions, [("v1", self.shas[0]), ("v3", self.shas[2])])
+
+	def test_invalid_refs(self):
+		for spec in ["v1,missing", ",", "v1..v3"]:
+			with self.assertRaises(gitinspector.metrics.InvalidRevisionError):
+				gitinspector.metrics.MetricsTrend.get_revisions(spec, self.directory)
+
+	def test_shared_blobs_are_measured_once(self):
+		transcript = os.path.join(self.directory, "transcript.jsonl")
+		gitinspector.gitcommand.record(transcript)
+
+		with self.session:
+			trend = gitinspector.metrics.MetricsTrend("v1,v2,v5")
+
+		gitinspector.gitcommand.record(None)
+		self.assertEqual([i[1].total_eloc for i in trend.entries], [1, 2, 5])
+
+		with open(transcript, "rb") as transcript_file:
+			entries = [json.loads(i.decode("utf-8")) for i in transcript_file]
+
+		output = b"".join(base64.b64decode(i["stdout"]) for i in entries if i["args"] == ["cat-file", "--batch"])
+		self.assertEqual(len(re.findall(b"^[0-9a-f]{40} blob ", output, re.MULTILINE)), 5)
+
+	def test_names_are_escaped(self):
+		subprocess.check_call(["git", "tag", "<b>&"], cwd=self.directory)
+		stream = io.StringIO()
+
+		with self.session:
+			gitinspector.writer.set_stream(stream)
+			output = gitinspector.metrics.MetricsTrendOutput("<b>&")
+			output.output_html()
+			output.output_xml()
+			gitinspector.writer.get().flush()
+
+		self.assertIn("<td>&lt;b&gt;&amp;</td>", stream.getvalue())
+		self.assertIn("<name>&lt;b&gt;&amp;</name>", stream.getvalue())
+		self.assertNotIn("<b>&", stream.getvalue())
+
+class MetricsIntervalTest(unittest2.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+		self.cache_enabled = gitinspector.cache.is_enabled()
+		gitinspector.cache.set_enabled(False)
+		subprocess.check_call(["git", "init", "-q", self.directory])
+		self.__commit__("a = 1\n", "2015-01-10")
+		self.__commit__("a = 1\nb = 2\nc = 3\n", "2016-01-10")
+
+	def tearDown(self):
+		gitinspector.cache.set_enabled(self.cache_enabled)
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __commit__(self, content, date):
+		with open(os.path.join(self.directory, "file.py"), "w") as file_w:
+			file_w.write(content)
+
+		env = dict(os.environ, GIT_AUTHOR_DATE=date + "T12:00:00", GIT_COMMITTER_DATE=date + "T12:00:00")
+		subprocess.check_call(["git", "add", "."], cwd=self.directory)
+		subprocess.check_call(["git", "-c", "user.name=Alice", "-c", "user.email=alice@example.com", "commit", "-q", "-m",
+		                       date], cwd=self.directory, env=env)
+
+	def test_metrics_of_the_interval(self):
+		runner = gitinspector.gitinspector.Runner(gitinspector.session.AnalysisSession())
+		runner.repo = self.directory
+		runner.include_metrics = True
+		runner.prepare()
+
+		with runner.session:
+			gitinspector.interval.set_until("2015-06-01")
+
+		# The metrics are computed for the last commit of the interval, rather than for HEAD.
+		outputables = runner.analyse()
+		metrics_output = [i for i in outputables if isinstance(i, gitinspector.metrics.Metrics)][0]
+		self.assertEqual(metrics_output.metrics_logic.total_eloc, 1)
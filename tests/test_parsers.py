@@ -0,0 +1,52 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import gzip
+import os
+import unittest2
+import gitinspector.blame
+import gitinspector.changes
+import gitinspector.session
+
+def __read_fixture__(name):
+	with gzip.open(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", name + ".gz"), "rb") as fixture:
+		return fixture.read().splitlines(True)
+
+class ParsersTest(unittest2.TestCase):
+	def test_parse_log(self):
+		lines = __read_fixture__("log-small")
+
+		with gitinspector.session.AnalysisSession():
+			(commits, emails_by_author, authors_by_email) = gitinspector.changes.parse_log(lines)
+
+		self.assertEqual(len(emails_by_author), 5)
+		self.assertEqual(sorted(authors_by_email), sorted(emails_by_author.values()))
+		self.assertGreater(len(commits), 150)
+		self.assertLessEqual(len(commits), len([i for i in lines if i.count(b"|") == 3]))
+		self.assertTrue(all(i.filediffs and i.email in authors_by_email for i in commits))
+
+	def test_parse_blame(self):
+		rows = __read_fixture__("blame-small")
+		blamechunks = gitinspector.blame.parse_blame(rows, "cpp")
+
+		self.assertEqual(len(blamechunks), len([i for i in rows if i.startswith(b"\t")]))
+		self.assertTrue(all(i[0].endswith("@example.com") and len(i[2]) == 40 for i in blamechunks))
+		self.assertGreater(sum(i[4] for i in blamechunks), 0)
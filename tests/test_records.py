@@ -0,0 +1,68 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import io
+import json
+import unittest2
+import gitinspector.format
+import gitinspector.records
+import gitinspector.writer
+
+class RecordsTest(unittest2.TestCase):
+	def setUp(self):
+		self.stream = io.StringIO()
+		gitinspector.writer.set_stream(self.stream)
+
+	def tearDown(self):
+		gitinspector.writer.set_stream(None)
+		gitinspector.format.select(gitinspector.format.DEFAULT_FORMAT)
+
+	def __output_sections__(self):
+		gitinspector.records.begin("changes")
+		gitinspector.records.output({"name": "Alice", "commits": 3})
+		gitinspector.records.output({"name": "Bob", "commits": 1})
+		gitinspector.records.end()
+		gitinspector.records.begin("blame")
+		gitinspector.records.end()
+		gitinspector.writer.get().flush()
+
+	def test_ndjson(self):
+		gitinspector.format.select("ndjson")
+		self.__output_sections__()
+
+		lines = [json.loads(i) for i in self.stream.getvalue().splitlines()]
+		self.assertEqual(lines, [{"section": "changes", "name": "Alice", "commits": 3},
+		                         {"section": "changes", "name": "Bob", "commits": 1}])
+
+	def test_json(self):
+		gitinspector.format.select("json")
+		self.stream.write("{\"version\": \"1\"")
+		self.__output_sections__()
+		self.stream.write("\n}")
+
+		report = json.loads(self.stream.getvalue())
+		self.assertEqual(report["changes"], [{"name": "Alice", "commits": 3}, {"name": "Bob", "commits": 1}])
+		self.assertEqual(report["blame"], [])
+
+	def test_htmllite_escapes_markup(self):
+		gitinspector.format.select("htmllite")
+		self.assertEqual(gitinspector.records.dumps({"name": "</script>"}), "{\"name\": \"\\u003c/script>\"}")
+		self.assertEqual(json.loads(gitinspector.records.dumps({"name": "</script>"})), {"name": "</script>"})
@@ -0,0 +1,58 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import threading
+import unittest2
+import gitinspector.scheduler
+
+class SchedulerTest(unittest2.TestCase):
+	def test_dependencies(self):
+		started = threading.Event()
+		order = []
+
+		def first():
+			started.wait(5)
+			order.append("first")
+			return 1
+
+		def second():
+			order.append("second")
+			return 2
+
+		stages = gitinspector.scheduler.Scheduler()
+		stages.add("first", first)
+		stages.add("second", second, ["first"])
+		started.set()
+
+		self.assertEqual(stages.get("second"), 2)
+		self.assertEqual(stages.get("first"), 1)
+		self.assertEqual(order, ["first", "second"])
+
+	def test_exceptions_are_passed_on(self):
+		stages = gitinspector.scheduler.Scheduler()
+		stages.add("failing", lambda: __import__("sys").exit("failed"))
+		stages.add("dependent", lambda: 1, ["failing"])
+
+		with self.assertRaises(SystemExit):
+			stages.get("dependent")
+
+		with self.assertRaises(SystemExit):
+			stages.wait()
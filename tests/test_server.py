@@ -0,0 +1,157 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest2
+import gitinspector.gitinspector
+import gitinspector.server
+import gitinspector.session
+
+try:
+	from urllib2 import HTTPError, urlopen
+except ImportError:
+	from urllib.error import HTTPError
+	from urllib.request import urlopen
+
+class AddressTest(unittest2.TestCase):
+	def test_parse_address(self):
+		self.assertEqual(gitinspector.server.parse_address("8080"), ("127.0.0.1", 8080))
+		self.assertEqual(gitinspector.server.parse_address("0.0.0.0:8080"), ("0.0.0.0", 8080))
+		self.assertEqual(gitinspector.server.parse_address("unix:/tmp/gitinspector.sock"), "/tmp/gitinspector.sock")
+
+	def test_invalid_address(self):
+		with self.assertRaises(gitinspector.server.InvalidAddressError):
+			gitinspector.server.parse_address("localhost:http")
+
+class ServerTest(unittest2.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+		self.__git__("init", "-q")
+		self.__commit__("first.py", "a = 1\nb = 2\n", "Alice", "2015-01-10")
+		self.__commit__("second.py", "c = 3\n", "Alice", "2015-02-10")
+
+		runner = gitinspector.gitinspector.Runner(gitinspector.session.AnalysisSession())
+		runner.repo = self.directory
+		self.server = gitinspector.server.create(runner, "127.0.0.1:0")
+		self.thread = threading.Thread(target=self.server.serve_forever)
+		self.thread.daemon = True
+		self.thread.start()
+
+	def tearDown(self):
+		self.server.shutdown()
+		self.server.server_close()
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __git__(self, *args, **kwargs):
+		subprocess.check_call(["git"] + list(args), cwd=self.directory, env=kwargs.get("env"))
+
+	def __commit__(self, file_name, content, author, date):
+		with open(os.path.join(self.directory, file_name), "w") as file_w:
+			file_w.write(content)
+
+		env = dict(os.environ, GIT_AUTHOR_NAME=author, GIT_AUTHOR_EMAIL=author.lower() + "@example.com",
+		           GIT_COMMITTER_NAME=author, GIT_COMMITTER_EMAIL=author.lower() + "@example.com",
+		           GIT_AUTHOR_DATE=date + "T12:00:00", GIT_COMMITTER_DATE=date + "T12:00:00")
+		self.__git__("add", file_name)
+		self.__git__("commit", "-q", "-m", "Update " + file_name, env=env)
+
+	def __get__(self, path):
+		response = urlopen("http://127.0.0.1:{0}{1}".format(self.server.server_address[1], path))
+		return response.read().decode("utf-8")
+
+	def test_queries(self):
+		status = json.loads(self.__get__("/status"))
+		self.assertEqual(len(status["head"]), 40)
+
+		blame = json.loads(self.__get__("/blame"))["blame"]
+		self.assertEqual([(i["name"], i["rows"]) for i in blame], [("Alice", 3)])
+
+		changes = json.loads(self.__get__("/changes?since=2015-02-01"))["changes"]
+		self.assertEqual([(i["name"], i["commits"], i["insertions"]) for i in changes], [("Alice", 1, 1)])
+
+		report = json.loads(self.__get__("/report?format=json"))
+		self.assertEqual(report["changes"][0]["name"], "Alice")
+
+	def test_invalid_requests(self):
+		with self.assertRaises(HTTPError) as context:
+			self.__get__("/changes?since=yesterday")
+
+		self.assertEqual(context.exception.code, 400)
+
+		with self.assertRaises(HTTPError) as context:
+			self.__get__("/unknown")
+
+		self.assertEqual(context.exception.code, 404)
+
+	def test_refresh(self):
+		head = json.loads(self.__get__("/status"))["head"]
+		self.__commit__("second.py", "c = 3\nd = 4\ne = 5\n", "Bob", "2015-03-10")
+
+		self.assertNotEqual(json.loads(self.__get__("/status"))["head"], head)
+
+		blame = json.loads(self.__get__("/blame"))["blame"]
+		self.assertEqual([(i["name"], i["rows"]) for i in blame], [("Alice", 3), ("Bob", 2)])
+
+		changes = json.loads(self.__get__("/changes"))["changes"]
+		self.assertEqual([(i["name"], i["commits"]) for i in changes], [("Alice", 2), ("Bob", 1)])
+
+	def test_internal_errors(self):
+		def __fail__(analysis, query):
+			raise KeyError("missing")
+
+		gitinspector.server.ROUTES["/failing"] = __fail__
+
+		try:
+			with self.assertRaises(HTTPError) as context:
+				self.__get__("/failing")
+
+			self.assertEqual(context.exception.code, 500)
+			self.assertIn("missing", json.loads(context.exception.read().decode("utf-8"))["error"])
+			self.assertEqual(json.loads(self.__get__("/blame"))["blame"][0]["rows"], 3)
+		finally:
+			del gitinspector.server.ROUTES["/failing"]
+
+	def test_snapshots(self):
+		snapshot = self.server.analysis.get_snapshot()
+		self.__commit__("second.py", "c = 3\nd = 4\ne = 5\n", "Bob", "2015-03-10")
+
+		# Requests are answered without holding the lock, from the snapshot taken when the analysis was last refreshed.
+		with self.server.analysis.lock:
+			with snapshot.runner.session:
+				changes = gitinspector.server.__get_changes_summary__(snapshot, {})["changes"]
+				report = gitinspector.server.__get_report__(snapshot, {"format": "text"})[1]
+
+		self.assertEqual([(i["name"], i["commits"]) for i in changes], [("Alice", 2)])
+		self.assertNotIn("Bob", report)
+
+		new_snapshot = self.server.analysis.get_snapshot()
+		self.assertNotEqual(new_snapshot.head, snapshot.head)
+
+		with snapshot.runner.session:
+			changes = gitinspector.server.__get_changes_summary__(snapshot, {})["changes"]
+
+		self.assertEqual([(i["name"], i["commits"]) for i in changes], [("Alice", 2)])
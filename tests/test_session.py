@@ -0,0 +1,160 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+from __future__ import unicode_literals
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest2
+import gitinspector.changes
+import gitinspector.clone
+import gitinspector.extensions
+import gitinspector.gitinspector
+import gitinspector.interval
+import gitinspector.session
+import gitinspector.terminal
+
+class SessionTest(unittest2.TestCase):
+	def setUp(self):
+		self.directories = []
+
+	def tearDown(self):
+		for directory in self.directories:
+			shutil.rmtree(directory, ignore_errors=True)
+
+	def __create_repository__(self, authors):
+		directory = tempfile.mkdtemp(suffix=".gitinspector")
+		self.directories.append(directory)
+		subprocess.check_call(["git", "init", "-q"], cwd=directory)
+
+		for i, author in enumerate(authors):
+			with open(os.path.join(directory, "file{0}.py".format(i)), "w") as file_w:
+				file_w.write("a = {0}\n".format(i))
+
+			env = dict(os.environ, GIT_AUTHOR_NAME=author, GIT_AUTHOR_EMAIL=author.lower() + "@example.com",
+			           GIT_COMMITTER_NAME=author, GIT_COMMITTER_EMAIL=author.lower() + "@example.com")
+			subprocess.check_call(["git", "add", "."], cwd=directory)
+			subprocess.check_call(["git", "commit", "-q", "-m", "Commit"], cwd=directory, env=env)
+
+		return directory
+
+	def test_current_session(self):
+		default_session = gitinspector.session.get()
+		first_session = gitinspector.session.AnalysisSession()
+		second_session = gitinspector.session.AnalysisSession()
+
+		with first_session:
+			self.assertIs(gitinspector.session.get(), first_session)
+
+			with second_session:
+				self.assertIs(gitinspector.session.get(), second_session)
+
+			self.assertIs(gitinspector.session.get(), first_session)
+
+		self.assertIs(gitinspector.session.get(), default_session)
+
+	def test_configuration_is_per_session(self):
+		with gitinspector.session.AnalysisSession():
+			gitinspector.interval.set_since("2015-01-01")
+			gitinspector.extensions.define("txt")
+
+		with gitinspector.session.AnalysisSession():
+			self.assertFalse(gitinspector.interval.has_interval())
+			self.assertEqual(gitinspector.extensions.get(), gitinspector.extensions.DEFAULT_EXTENSIONS)
+
+	def test_concurrent_analyses(self):
+		repositories = [self.__create_repository__(["Alice", "Bob"]), self.__create_repository__(["Carol"] * 3)]
+		runners = []
+
+		for repository in repositories:
+			runner = gitinspector.gitinspector.Runner(gitinspector.session.AnalysisSession())
+			runner.repo = repository
+			runner.prepare()
+			runners.append(runner)
+
+		threads = [threading.Thread(target=i.analyse) for i in runners]
+
+		for thread in threads:
+			thread.start()
+
+		for thread in threads:
+			thread.join()
+
+		for (runner, expected_authors) in zip(runners, [{"Alice": 1, "Bob": 1}, {"Carol": 3}]):
+			with runner.session:
+				authors = gitinspector.changes.get(runner.hard).get_authorinfo_list()
+				self.assertEqual(dict((i, j.commits) for (i, j) in authors.items()), expected_authors)
+
+	def test_escapes_are_per_session(self):
+		first_session = gitinspector.session.AnalysisSession()
+		second_session = gitinspector.session.AnalysisSession()
+
+		with first_session:
+			gitinspector.terminal.skip_escapes(True)
+
+			with second_session:
+				gitinspector.terminal.skip_escapes(False)
+				self.assertEqual(gitinspector.terminal.bold("a"), "\033[1ma\033[0;0m")
+
+			self.assertEqual(gitinspector.terminal.bold("a"), "a")
+
+	def test_concurrent_sessions_with_clones(self):
+		urls = ["file://" + self.__create_repository__(["Alice", "Bob"]), "file://" + self.__create_repository__(["Carol"])]
+		runners = [gitinspector.gitinspector.Runner(gitinspector.session.AnalysisSession()) for i in urls]
+		reports = {}
+
+		def __analyse__(runner, url):
+			with runner.session:
+				runner.repo = gitinspector.clone.create(url)
+				runner.prepare()
+				stream = io.StringIO()
+				runner.render(runner.analyse(), "text", stream)
+				reports[url] = stream.getvalue()
+
+		threads = [threading.Thread(target=__analyse__, args=i) for i in zip(runners, urls)]
+
+		for thread in threads:
+			thread.start()
+
+		for thread in threads:
+			thread.join()
+
+		self.assertIn("Bob", reports[urls[0]])
+		self.assertNotIn("Carol", reports[urls[0]])
+		self.assertIn("Carol", reports[urls[1]])
+		self.assertNotIn("\033", reports[urls[1]])
+
+		# Each session deletes its own clone, and only that.
+		locations = [i.session.cloned_path for i in runners]
+		self.assertEqual(len(set(locations)), 2)
+
+		with runners[0].session:
+			gitinspector.clone.delete()
+
+		self.assertEqual([os.path.isdir(i) for i in locations], [False, True])
+
+		with runners[1].session:
+			gitinspector.clone.delete()
+
+		self.assertFalse(os.path.isdir(locations[1]))
@@ -0,0 +1,75 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+from __future__ import unicode_literals
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest2
+
+GITINSPECTOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gitinspector", "gitinspector.py")
+
+# Runs gitinspector in a fresh interpreter and returns the names of all modules that were loaded by it.
+LIST_MODULES_SCRIPT = """
+import atexit, os, runpy, sys
+atexit.register(lambda: sys.stdout.write("\\n--modules--\\n" + " ".join(sorted(sys.modules)) + "\\n"))
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+# Modules that are expensive to import and only needed by some sections, formats or modes of operation.
+OPTIONAL_MODULES = ["BaseHTTPServer", "base64", "batch", "help", "http.server", "metrics", "numpy", "platform",
+                    "responsibilities", "server", "ssl", "timeline", "urllib", "version", "zipfile"]
+
+class StartupTest(unittest2.TestCase):
+	def __get_loaded_modules__(self, *args):
+		env = dict(os.environ, PYTHONIOENCODING="utf-8")
+		output = subprocess.Popen([sys.executable, "-c", LIST_MODULES_SCRIPT, GITINSPECTOR] + list(args),
+		                          stdout=subprocess.PIPE, stderr=open(os.devnull, "w"), env=env).communicate()[0]
+		return set(output.decode("utf-8").partition("--modules--")[2].split())
+
+	def test_version(self):
+		modules = self.__get_loaded_modules__("--version")
+		self.assertIn("version", modules)
+		self.assertEqual(modules.intersection(OPTIONAL_MODULES), set(["version"]))
+
+	def test_text_report(self):
+		directory = tempfile.mkdtemp(suffix=".gitinspector")
+
+		try:
+			env = dict(os.environ, GIT_AUTHOR_NAME="Alice", GIT_AUTHOR_EMAIL="alice@example.com",
+			           GIT_COMMITTER_NAME="Alice", GIT_COMMITTER_EMAIL="alice@example.com")
+			subprocess.check_call(["git", "init", "-q"], cwd=directory)
+
+			with open(os.path.join(directory, "file.py"), "w") as file_w:
+				file_w.write("a = 1\n")
+
+			subprocess.check_call(["git", "add", "."], cwd=directory)
+			subprocess.check_call(["git", "commit", "-q", "-m", "Commit"], cwd=directory, env=env)
+
+			modules = self.__get_loaded_modules__("--cache=false", directory)
+			self.assertIn("changes", modules)
+			self.assertEqual(modules.intersection(OPTIONAL_MODULES + ["gettext", "locale"]), set())
+		finally:
+			shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,72 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import unittest2
+import gitinspector.gitcommand
+import gitinspector.scheduler
+import gitinspector.stats
+
+class StatsTest(unittest2.TestCase):
+	def setUp(self):
+		gitinspector.stats.set_enabled(True)
+
+	def tearDown(self):
+		gitinspector.stats.set_enabled(False)
+
+	def test_git_processes(self):
+		with gitinspector.stats.stage("version"):
+			lines = gitinspector.gitcommand.read_lines(["--version"], cwd=".")
+
+		stage = gitinspector.stats.get()["stages"]["version"]
+		self.assertEqual(stage["git_processes"], 1)
+		self.assertEqual(stage["git_bytes_read"], len(lines[0]))
+		self.assertEqual(stage["lines_parsed"], 1)
+		self.assertGreaterEqual(stage["wall_time"], 0)
+		self.assertEqual(gitinspector.stats.get()["total"]["git_processes"], 1)
+
+	def test_other_stage(self):
+		gitinspector.gitcommand.read(["--version"], cwd=".")
+		self.assertEqual(gitinspector.stats.get()["stages"][gitinspector.stats.OTHER_STAGE]["git_processes"], 1)
+
+	def test_worker_utilisation(self):
+		with gitinspector.stats.stage("work"):
+			gitinspector.stats.add_worker_time("work", 4, 0.0)
+
+		gitinspector.stats.__stages__["work"].wall_time = 1.0
+		gitinspector.stats.add_worker_time("work", 4, 2.0)
+		stage = gitinspector.stats.get()["stages"]["work"]
+		self.assertEqual(stage["workers"], 4)
+		self.assertEqual(stage["worker_utilisation"], 0.5)
+
+	def test_scheduler_stages(self):
+		stages = gitinspector.scheduler.Scheduler()
+		stages.add("scheduled", gitinspector.stats.get_stage)
+
+		self.assertEqual(stages.get("scheduled"), "scheduled")
+		self.assertIn("scheduled", gitinspector.stats.get()["stages"])
+
+	def test_disabled(self):
+		gitinspector.stats.set_enabled(False)
+
+		with gitinspector.stats.stage("version"):
+			gitinspector.gitcommand.read(["--version"], cwd=".")
+
+		self.assertEqual(gitinspector.stats.get()["stages"], {})
@@ -0,0 +1,64 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest2
+import benchmarks.synthetic
+
+class SyntheticTest(unittest2.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+
+	def tearDown(self):
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __git__(self, directory, *args):
+		return subprocess.check_output(["git"] + list(args), cwd=directory).decode("utf-8").splitlines()
+
+	def test_generate(self):
+		directory = os.path.join(self.directory, "repository")
+		summary = benchmarks.synthetic.generate(directory, commits=60, files=10, authors=3, merges=0.2, renames=0.1)
+
+		self.assertEqual(summary["commits"], 60)
+		self.assertEqual(summary["files"], 10)
+		self.assertEqual(len(self.__git__(directory, "rev-list", "HEAD")), 60)
+		self.assertEqual(len(self.__git__(directory, "rev-list", "--merges", "HEAD")), summary["merge_commits"])
+		self.assertGreater(summary["merge_commits"], 0)
+		self.assertEqual(len(self.__git__(directory, "ls-files")), 10)
+		self.assertEqual(len(set(self.__git__(directory, "log", "--pretty=%aE"))), 3)
+		self.assertEqual(self.__git__(directory, "status", "--porcelain"), [])
+
+	def test_deterministic(self):
+		heads = []
+
+		for i in range(2):
+			directory = os.path.join(self.directory, str(i))
+			benchmarks.synthetic.generate(directory, commits=20, files=5)
+			heads.append(self.__git__(directory, "rev-parse", "HEAD"))
+
+		self.assertEqual(heads[0], heads[1])
+
+	def test_unknown_parameter(self):
+		with self.assertRaises(TypeError):
+			benchmarks.synthetic.generate(self.directory, branches=2)
@@ -0,0 +1,124 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import random
+import unittest2
+import gitinspector.timeline
+
+class AuthorInfo:
+	def __init__(self, insertions, deletions):
+		self.insertions = insertions
+		self.deletions = deletions
+
+class Changes:
+	def __init__(self, authordateinfo_list):
+		self.authordateinfo_list = authordateinfo_list
+
+	def get_authordateinfo_list(self):
+		return self.authordateinfo_list
+
+	def get_latest_email_by_author(self, author):
+		return author.lower() + "@example.com"
+
+def __create_timeline_data__(useweeks=False, granularity=None):
+	return gitinspector.timeline.TimelineData(Changes({("2014-01-02", "Alice"): AuthorInfo(30, 10),
+	                                                   ("2014-01-20", "Alice"): AuthorInfo(10, 0),
+	                                                   ("2014-01-21", "Bob"): AuthorInfo(5, 5),
+	                                                   ("2014-03-01", "Bob"): AuthorInfo(1, 0)}), useweeks, granularity)
+
+class TimelineDataTest(unittest2.TestCase):
+	def test_periods_and_authors(self):
+		timeline_data = __create_timeline_data__()
+		self.assertEqual(timeline_data.get_periods(), ["2014-01", "2014-03"])
+		self.assertEqual(timeline_data.get_authors(), [("Alice", "alice@example.com"), ("Bob", "bob@example.com")])
+		self.assertEqual(timeline_data.get_total_changes_in_period("2014-01"), (45, 15, 60))
+		self.assertTrue(timeline_data.is_author_in_periods(["2014-03"], "Bob"))
+		self.assertFalse(timeline_data.is_author_in_period("2014-03", "Alice"))
+
+	def test_weeks(self):
+		self.assertEqual(__create_timeline_data__(True).get_periods(), ["2014W01", "2014W04", "2014W09"])
+
+	def test_granularity(self):
+		self.assertEqual(__create_timeline_data__(granularity="day").get_periods(),
+		                 ["2014-01-02", "2014-01-20", "2014-01-21", "2014-03-01"])
+		self.assertEqual(__create_timeline_data__(granularity="quarter").get_periods(), ["2014Q1"])
+		self.assertEqual(__create_timeline_data__(granularity="year").get_total_changes_in_period("2014"), (46, 15, 61))
+
+	def test_week_buckets(self):
+		buckets = gitinspector.timeline.get_buckets(["2014-12-29", "2015-01-04", "2015-01-05"], "week")
+		self.assertEqual(buckets["2014-12-29"], buckets["2015-01-04"])
+		self.assertEqual(buckets["2014-12-29"][1], "2015W01")
+		self.assertEqual(buckets["2015-01-05"][1], "2015W02")
+
+	def test_multiplier(self):
+		timeline_data = __create_timeline_data__()
+		multiplier = timeline_data.get_multiplier("2014-01", 9)
+
+		self.assertEqual(multiplier, 11.0)
+		self.assertTrue(multiplier * 50 / 60.0 > 9)
+		self.assertFalse((multiplier - 0.25) * 50 / 60.0 > 9)
+		self.assertEqual(timeline_data.get_author_signs_in_period("Alice", "2014-01", multiplier), (7, 1))
+		self.assertEqual(timeline_data.get_author_signs_in_period("Alice", "2014-03", multiplier), (0, 0))
+
+	# The multiplier used to be found by stepping through a dictionary of entries keyed by author and period.
+
+	@staticmethod
+	def __get_stepped_multiplier__(authordateinfo_list, period, max_width):
+		entries = {}
+
+		for i in sorted(authordateinfo_list.items()):
+			if entries.get((i[0][1], i[0][0][0:7]), None) == None:
+				entries[(i[0][1], i[0][0][0:7])] = AuthorInfo(i[1].insertions, i[1].deletions)
+			else:
+				entries[(i[0][1], i[0][0][0:7])].insertions += i[1].insertions
+				entries[(i[0][1], i[0][0][0:7])].deletions += i[1].deletions
+
+		changes_in_period = float(sum(j.insertions + j.deletions for i, j in entries.items() if i[1] == period))
+		multiplier = 0
+
+		while True:
+			for i in entries:
+				entry = entries.get(i)
+
+				if period == i[1]:
+					if multiplier * (entry.insertions + entry.deletions) / changes_in_period > max_width:
+						return multiplier
+
+					multiplier += 0.25
+
+	def test_multiplier_matches_stepping(self):
+		generator = random.Random(4)
+
+		for i in range(0, 200):
+			authordateinfo_list = {}
+
+			for j in range(0, generator.randint(1, 12)):
+				date = "2014-{0:02d}-{1:02d}".format(generator.randint(1, 3), generator.randint(1, 28))
+				author = generator.choice(["Alice", "Bob", "Carol", "Dave", "Eve", "\u00c5sa"])
+				authordateinfo_list[(date, author)] = AuthorInfo(generator.randint(0, 400), generator.randint(0, 50))
+
+			timeline_data = gitinspector.timeline.TimelineData(Changes(authordateinfo_list), False)
+
+			for period in timeline_data.get_periods():
+				if timeline_data.get_total_changes_in_period(period)[2] > 0:
+					for max_width in [9, 18, 24]:
+						self.assertEqual(timeline_data.get_multiplier(period, max_width),
+						                 TimelineDataTest.__get_stepped_multiplier__(authordateinfo_list, period, max_width))
@@ -0,0 +1,83 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import json
+import os
+import tempfile
+import threading
+import unittest2
+import gitinspector.gitcommand
+import gitinspector.stats
+import gitinspector.tracing
+
+class TracingTest(unittest2.TestCase):
+	def setUp(self):
+		gitinspector.tracing.set_enabled(True)
+
+	def tearDown(self):
+		gitinspector.tracing.set_enabled(False)
+
+	def __get_spans__(self, category):
+		return [i for i in gitinspector.tracing.get_events() if i.get("cat", None) == category]
+
+	def test_git_processes(self):
+		gitinspector.gitcommand.read(["--version"], cwd=".")
+		spans = self.__get_spans__("git")
+
+		self.assertEqual(len(spans), 1)
+		self.assertEqual(spans[0]["name"], "git --version")
+		self.assertEqual(spans[0]["args"]["command"], "git --version")
+		self.assertEqual(spans[0]["args"]["returncode"], 0)
+		self.assertEqual(spans[0]["ph"], "X")
+
+	def test_stages_and_locks(self):
+		with gitinspector.stats.stage("analysis"):
+			gitinspector.tracing.acquire(threading.Lock(), "wait for lock")
+
+		self.assertEqual([i["name"] for i in self.__get_spans__("stage")], ["analysis"])
+		self.assertEqual([i["name"] for i in self.__get_spans__("lock")], ["wait for lock"])
+		self.assertEqual(self.__get_spans__("stage")[0]["tid"], self.__get_spans__("lock")[0]["tid"])
+
+	def test_output(self):
+		with gitinspector.tracing.span("span", "test", {"value": 1}):
+			pass
+
+		(handle, file_name) = tempfile.mkstemp(suffix=".json")
+		os.close(handle)
+
+		try:
+			gitinspector.tracing.output(file_name)
+
+			with open(file_name, "r") as trace_file:
+				events = json.load(trace_file)["traceEvents"]
+		finally:
+			os.remove(file_name)
+
+		self.assertEqual([i["name"] for i in events], ["thread_name", "span"])
+		self.assertEqual(events[1]["args"], {"value": 1})
+
+	def test_disabled(self):
+		gitinspector.tracing.set_enabled(False)
+
+		with gitinspector.tracing.span("span", "test"):
+			gitinspector.gitcommand.read(["--version"], cwd=".")
+
+		self.assertEqual(gitinspector.tracing.get_events(), [])
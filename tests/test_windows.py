@@ -0,0 +1,114 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import datetime
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest2
+import gitinspector.blame
+import gitinspector.gitinspector
+import gitinspector.interval
+import gitinspector.localization
+import gitinspector.optval
+import gitinspector.session
+import gitinspector.windows
+
+class ParseTest(unittest2.TestCase):
+	def setUp(self):
+		gitinspector.localization.init()
+
+	def test_date_ranges(self):
+		windows = gitinspector.windows.parse("2015-01-01..2015-03-31, 2015-04-01..,..2014-12-31")
+		self.assertEqual([(i.label, i.since, i.until) for i in windows],
+		                 [("2015-01-01..2015-03-31", "2015-01-01", "2015-03-31"), ("2015-04-01..", "2015-04-01", None),
+		                  ("..2014-12-31", None, "2014-12-31")])
+
+	def test_periods(self):
+		windows = gitinspector.windows.parse("quarter:3", datetime.date(2015, 2, 10))
+		self.assertEqual([(i.label, i.since, i.until) for i in windows],
+		                 [("2014Q3", "2014-07-01", "2014-09-30"), ("2014Q4", "2014-10-01", "2014-12-31"),
+		                  ("2015Q1", "2015-01-01", "2015-03-31")])
+
+		windows = gitinspector.windows.parse("week:2", datetime.date(2015, 1, 1))
+		self.assertEqual([(i.label, i.since, i.until) for i in windows],
+		                 [("2014W52", "2014-12-22", "2014-12-28"), ("2015W01", "2014-12-29", "2015-01-04")])
+
+	def test_invalid_windows(self):
+		for spec in ["quarter:0", "decade:2", "2015-01-01", "2015-13-01..", "2015-01-01..2015-02-01,month:2",
+		             "2015-01-01..2014-01-01", "2015-10-01..2015-9-30"]:
+			with self.assertRaises(gitinspector.optval.InvalidOptionArgument):
+				gitinspector.windows.parse(spec)
+
+class WindowsTest(unittest2.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp(suffix=".gitinspector")
+		subprocess.check_call(["git", "init", "-q"], cwd=self.directory)
+		self.revisions = [self.__commit__(author, date) for (author, date) in
+		                  [("Alice", "2015-01-10"), ("Bob", "2015-02-10"), ("Alice", "2015-03-10"), ("Bob", "2015-04-10")]]
+
+	def tearDown(self):
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def __commit__(self, author, date):
+		with open(os.path.join(self.directory, "file-" + date + ".py"), "w") as file_w:
+			file_w.write("a = 1\n")
+
+		env = dict(os.environ, GIT_AUTHOR_NAME=author, GIT_AUTHOR_EMAIL=author.lower() + "@example.com",
+		           GIT_COMMITTER_NAME=author, GIT_COMMITTER_EMAIL=author.lower() + "@example.com",
+		           GIT_AUTHOR_DATE=date + "T12:00:00", GIT_COMMITTER_DATE=date + "T12:00:00")
+		subprocess.check_call(["git", "add", "."], cwd=self.directory)
+		subprocess.check_call(["git", "commit", "-q", "-m", "Commit"], cwd=self.directory, env=env)
+		return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=self.directory).decode("utf-8").strip()
+
+	def test_windows_share_the_history(self):
+		runner = gitinspector.gitinspector.Runner(gitinspector.session.AnalysisSession())
+		runner.repo = self.directory
+		runner.windows = "2015-01-01..2015-02-28,2015-03-01..2015-03-31"
+		runner.prepare()
+		outputables = runner.analyse()
+
+		with runner.session:
+			windows = [i for i in outputables if isinstance(i, gitinspector.windows.WindowsOutput)][0].windows
+			self.assertEqual([dict((j, k.commits) for (j, k) in i.changes.get_authorinfo_list().items()) for i in windows],
+			                 [{"Alice": 1, "Bob": 1}, {"Alice": 1}])
+
+			# The rows are blamed at the last commit of the last window.
+			blame_output = [i for i in outputables if isinstance(i, gitinspector.blame.BlameOutput)][0]
+			self.assertEqual(gitinspector.interval.get_ref(), self.revisions[2])
+			self.assertEqual(blame_output.revision, self.revisions[2])
+			self.assertEqual(dict((i, j.rows) for (i, j) in blame_output.blame.get_summed_blames().items()),
+			                 {"Alice": 2, "Bob": 1})
+
+	def test_empty_windows_are_output(self):
+		runner = gitinspector.gitinspector.Runner(gitinspector.session.AnalysisSession())
+		runner.repo = self.directory
+		runner.windows = "2014-01-01..2014-12-31,2015-01-01..2015-01-31"
+		runner.prepare()
+		stream = io.StringIO()
+		runner.render(runner.analyse(), "json", stream)
+
+		records = json.loads(stream.getvalue())["windows"]
+		self.assertEqual([(i["window"], i["name"], i["commits"]) for i in records],
+		                 [("2014-01-01..2014-12-31", None, 0), ("2015-01-01..2015-01-31", "Alice", 1)])
@@ -0,0 +1,44 @@
+# coding: utf-8
+#
+# Copyright © 2015 Ejwa Software. All rights reserved.
+#
+# This file is part of gitinspector.
+#
+# gitinspector is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# gitinspector is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with gitinspector. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import unicode_literals
+import io
+import unittest2
+import gitinspector.writer
+
+class WriterTest(unittest2.TestCase):
+	def test_buffers_until_flushed(self):
+		stream = io.StringIO()
+		out = gitinspector.writer.Writer(stream)
+		out.write("<a>")
+		out.writeln("</a>")
+		self.assertEqual(stream.getvalue(), "")
+		out.flush()
+		self.assertEqual(stream.getvalue(), "<a></a>\n")
+
+	def test_flushes_when_full(self):
+		stream = io.StringIO()
+		out = gitinspector.writer.Writer(stream)
+
+		for i in range(0, gitinspector.writer.BUFFER_SIZE // 8):
+			out.write("12345678")
+
+		self.assertEqual(len(stream.getvalue()), gitinspector.writer.BUFFER_SIZE)
+		self.assertEqual(out.buffer, [])